@@ -0,0 +1,377 @@
+# benchmark.py
+"""
+Бенчмарки гарячих шляхів GUI на синтетичних результатах: без мережі, без прав
+адміністратора, з offscreen-платформою Qt (вікна не показуються й не малюються).
+
+    python -m benchmark                          # 1k/10k/100k, порівняння з benchmark_baseline.json
+    python -m benchmark --sizes 1000 --only IPTestTab
+    python -m benchmark --save-baseline          # записати поточні числа як базові (решта ключів лишається)
+
+Для кожного бенчмарку та розміру: затримка виклику (mean/p50/p95/max), пропускна
+здатність (елементів за секунду) і пік пам'яті. Пам'ять міряється окремим проходом
+через tracemalloc (алокації Python та NumPy; пам'ять Qt на C++ не враховується),
+щоб трасування не спотворювало час. Код виходу 1, якщо є регресії понад поріг.
+"""
+import os
+
+# До першого імпорту PyQt6: без дисплея і без вікон
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PyQt6.QtCore import QT_VERSION_STR
+from PyQt6.QtWidgets import QApplication, QCompleter, QFileDialog
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Регресія - медіанний виклик повільніший за базовий більш ніж на стільки відсотків
+# (медіана, а не середнє: поодинокі паузи GC чи планувальника її не зсувають)
+DEFAULT_THRESHOLD = 25
+# Скільки разів перераховується статистика вкладки Ping для ряду заданої довжини
+UPDATE_STATS_CALLS = 100
+# Розмір пакета для update_rows (приблизно стільки результатів збирає один тік таймера)
+UPDATE_ROWS_BATCH = 500
+# Скільки чекати на фоновий імпорт хостів (с)
+_IMPORT_TIMEOUT = 120
+
+_SEED = 1234
+_BENCHMARKS = []
+
+
+def _benchmark(name):
+    def register(func):
+        _BENCHMARKS.append((name, func))
+        return func
+    return register
+
+
+class Timer:
+    """Міряє кожен виклик окремо; бенчмарк обгортає ним лише виклики точки входу."""
+
+    def __init__(self):
+        self.samples_ns = []
+
+    def call(self, func, *args):
+        start = time.perf_counter_ns()
+        result = func(*args)
+        self.samples_ns.append(time.perf_counter_ns() - start)
+        return result
+
+
+class MemoryTimer(Timer):
+    """Прохід для пам'яті: пік рахується від першого виміряного виклику, без підготовки."""
+
+    def __init__(self):
+        super().__init__()
+        self.base = None
+
+    def call(self, func, *args):
+        if self.base is None:
+            self.base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        return func(*args)
+
+    def peak_bytes(self):
+        if self.base is None:
+            return 0
+        return max(0, tracemalloc.get_traced_memory()[1] - self.base)
+
+
+# --- Синтетичні дані ---
+def _addresses(count):
+    return [f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}" for index in range(count)]
+
+
+def _probe_results(addresses, rng):
+    """Результати у форматі AsyncProbeEngine + BackoffScheduler: ~90% живих."""
+    now = time.time()
+    results = []
+    for address in addresses:
+        alive = rng.random() < 0.9
+        results.append({
+            "address": address,
+            "rtt": rng.lognormvariate(3, 0.5) if alive else 0,
+            "is_alive": alive,
+            "status_text": "Success" if alive else "Failed",
+            "next_probe_at": now + 2,
+            "backoff": None if alive else 4,
+        })
+    return results
+
+
+def _ping_results(count, rng, host="bench.local"):
+    """Результати у форматі вкладки Ping (PingWorker); ~2% втрат."""
+    now_ns = time.time_ns()
+    results = []
+    for seq in range(count):
+        failed = rng.random() < 0.02
+        results.append({
+            "seq": seq,
+            "host": host,
+            "time": "12:00:00",
+            "timestamp_ns": now_ns + seq * 1_000_000_000,
+            "lateness_ms": 0.0,
+            "delay": -1 if failed else round(rng.lognormvariate(3, 0.3), 1),
+            "status": "Failed" if failed else "Success",
+            "error_message": "",
+        })
+    return results
+
+
+def _dispose(widget):
+    widget.deleteLater()
+    QApplication.processEvents()
+
+
+def _ip_test_tab():
+    from ip_test_tab import IPTestTab
+    return IPTestTab(lambda items: None, QCompleter(), db_path=None)
+
+
+# --- Бенчмарки: func(size, timer) -> кількість оброблених елементів ---
+@_benchmark("IPTestTab._add_row")
+def bench_add_row(size, timer):
+    tab = _ip_test_tab()
+    for address in _addresses(size):
+        timer.call(tab._add_row, address)
+    _dispose(tab)
+    return size
+
+
+@_benchmark("IPTestTab.update_row")
+def bench_update_row(size, timer):
+    tab = _ip_test_tab()
+    addresses = _addresses(size)
+    tab.ui.model.add_hosts(addresses)
+    tab.host_stats.add(addresses)
+    for result in _probe_results(addresses, random.Random(_SEED)):
+        timer.call(tab.update_row, result)
+    _dispose(tab)
+    return size
+
+
+@_benchmark("IPTestTab.update_rows")
+def bench_update_rows(size, timer):
+    tab = _ip_test_tab()
+    addresses = _addresses(size)
+    tab.ui.model.add_hosts(addresses)
+    tab.host_stats.add(addresses)
+    results = _probe_results(addresses, random.Random(_SEED))
+    for start in range(0, size, UPDATE_ROWS_BATCH):
+        timer.call(tab.update_rows, results[start:start + UPDATE_ROWS_BATCH])
+    _dispose(tab)
+    return size
+
+
+@_benchmark("IPTestTab.import_hosts")
+def bench_import_hosts(size, timer):
+    import ip_test_tab
+    tab = _ip_test_tab()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "hosts.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(_addresses(size)))
+
+        def import_file():
+            tab.import_hosts()
+            deadline = time.monotonic() + _IMPORT_TIMEOUT
+            while tab.ui.model.rowCount() < size and time.monotonic() < deadline:
+                QApplication.processEvents()
+                time.sleep(0.001)
+            tab.import_worker.wait()
+
+        # Діалоги вибору файлу та зведення імпорту замінюються на час виміру
+        open_dialog, show_info = QFileDialog.getOpenFileName, ip_test_tab.CustomMessageBox.show_info
+        QFileDialog.getOpenFileName = staticmethod(lambda *args, **kwargs: (path, ""))
+        ip_test_tab.CustomMessageBox.show_info = staticmethod(lambda *args, **kwargs: None)
+        try:
+            timer.call(import_file)
+        finally:
+            QFileDialog.getOpenFileName = open_dialog
+            ip_test_tab.CustomMessageBox.show_info = show_info
+    if tab.ui.model.rowCount() != size:
+        raise RuntimeError(f"imported {tab.ui.model.rowCount()} of {size} hosts")
+    _dispose(tab)
+    return size
+
+
+@_benchmark("TableTab.add_ping_result")
+def bench_add_ping_result(size, timer):
+    from table_tab import TableTab
+    tab = TableTab()
+    for result in _ping_results(size, random.Random(_SEED)):
+        timer.call(tab.add_ping_result, result)
+    _dispose(tab)
+    return size
+
+
+@_benchmark("PingTab.update_stats")
+def bench_update_stats(size, timer):
+    from ping_tab import PingTab
+    tab = PingTab(lambda items: None, QCompleter())
+    tab.reset_stats(["bench.local"])
+    tab.is_running = True
+    results = _ping_results(size, random.Random(_SEED))
+    series = next(iter(tab.traces.values())).series
+    latency = np.array([result["delay"] if result["status"] == "Success" else np.nan for result in results],
+                       dtype=np.float32)
+    series.extend(np.array([result["timestamp_ns"] for result in results], dtype=np.int64),
+                  latency, np.zeros(size, dtype=np.float32))
+    for _ in range(UPDATE_STATS_CALLS):
+        timer.call(tab.update_stats)
+    tab.is_running = False
+    _dispose(tab)
+    return UPDATE_STATS_CALLS
+
+
+@_benchmark("MainWindow.add_to_history")
+def bench_add_to_history(size, timer):
+    from main import MainWindow
+    window = MainWindow()
+    for address in _addresses(size):
+        timer.call(window.add_to_history, address)
+    window.ip_test_widget.close_database()
+    _dispose(window)
+    return size
+
+
+# --- Запуск і звіт ---
+def run_benchmark(func, size, memory=True):
+    gc.collect()
+    timer = Timer()
+    started = time.perf_counter()
+    items = func(size, timer)
+    elapsed = time.perf_counter() - started
+    samples_us = np.array(timer.samples_ns, dtype=np.float64) / 1000
+    measured_s = samples_us.sum() / 1e6
+    result = {
+        "calls": len(samples_us),
+        "items": items,
+        "mean_us": round(float(samples_us.mean()), 2),
+        "p50_us": round(float(np.percentile(samples_us, 50)), 2),
+        "p95_us": round(float(np.percentile(samples_us, 95)), 2),
+        "max_us": round(float(samples_us.max()), 2),
+        "items_per_s": round(items / measured_s, 1) if measured_s else None,
+        "wall_s": round(elapsed, 3),
+        "peak_mb": None,
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            memory_timer = MemoryTimer()
+            func(size, memory_timer)
+            result["peak_mb"] = round(memory_timer.peak_bytes() / 2 ** 20, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, threshold):
+    """{ключ: зміна медіанного виклику у %}; регресії - ключі, що повільніші за поріг."""
+    changes, regressions = {}, []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous or not previous.get("p50_us"):
+            continue
+        change = (result["p50_us"] / previous["p50_us"] - 1) * 100
+        changes[key] = change
+        if change > threshold:
+            regressions.append(key)
+    return changes, regressions
+
+
+def _format_row(key, result, change):
+    peak = f"{result['peak_mb']:.1f}" if result["peak_mb"] is not None else "-"
+    rate = f"{result['items_per_s']:.0f}" if result["items_per_s"] is not None else "-"
+    diff = f"{change:+.0f}%" if change is not None else "-"
+    return (f"{key:<36} {result['calls']:>7} {result['mean_us']:>10.1f} {result['p50_us']:>10.1f} {result['p95_us']:>10.1f} "
+            f"{result['max_us']:>10.1f} {rate:>11} {peak:>8} {diff:>9}")
+
+
+def _write_report(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Benchmark the GUI hot paths with synthetic results (offscreen, no network).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="numbers of hosts / samples (default: 1000 10000 100000)")
+    parser.add_argument("--only", action="append", default=[],
+                        help="run only benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown of the median call, in percent, reported as a regression (default: 25)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("-o", "--output", help="also write the results to this JSON file")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if any(size <= 0 for size in args.sizes):
+        parser.error("--sizes must be positive")
+    selected = [(name, func) for name, func in _BENCHMARKS
+                if not args.only or any(text in name for text in args.only)]
+    if not selected:
+        parser.error("no benchmarks match --only")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    print(f"{'benchmark':<36} {'calls':>7} {'mean us':>10} {'p50 us':>10} {'p95 us':>10} {'max us':>10} "
+          f"{'items/s':>11} {'peak MB':>8} {'baseline':>9}")
+    results = {}
+    for name, func in selected:
+        for size in args.sizes:
+            key = f"{name}@{size}"
+            results[key] = run_benchmark(func, size, memory=not args.no_memory)
+            changes, _ = compare({key: results[key]}, baseline, args.threshold)
+            print(_format_row(key, results[key], changes.get(key)), flush=True)
+    app.processEvents()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        _write_report(args.output, report)
+    if args.save_baseline:
+        # Лише виміряні ключі замінюються: --only не стирає решту базових чисел
+        _write_report(args.baseline, dict(report, results=dict(baseline, **results)))
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    _, regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nSlower than baseline by more than {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
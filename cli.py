@@ -0,0 +1,216 @@
+# cli.py
+"""
+Безголовий режим: той самий рушій пінгу, але без GUI.
+Ніколи не імпортує PyQt6, pyqtgraph чи qtawesome, тож стартує миттєво
+і працює на серверах без дисплея.
+
+    python -m cli 8.8.8.8 1.1.1.1                 # пінг за фіксованим розкладом (як вкладка Ping)
+    python -m cli -f hosts.txt --mode test        # раунди по списку (як вкладка IP Test)
+    python -m cli gw.local -i 200 -c 50 --format csv -o ping.csv
+    python -m cli -f hosts.txt --mode test --backend simulated:seed=42,loss=0.05   # без мережі й root
+"""
+import argparse
+import asyncio
+import csv
+import json
+import signal
+import sys
+import time
+
+from probe_engine import (AsyncProbeEngine, AdaptiveConcurrency, FixedRateScheduler, TokenBucket,
+                          BACKEND_ENV, backend_from_spec, set_backend, ping_record, DEFAULT_CONCURRENCY, DEFAULT_MAX_PPS, DEFAULT_TIMEOUT,
+                          DEFAULT_MIN_TIMEOUT, DEFAULT_MAX_TIMEOUT)
+
+PING_FIELDS = ["seq", "host", "time", "timestamp_ns", "lateness_ms", "delay", "status", "error_message"]
+TEST_FIELDS = ["round", "timestamp_ns", "address", "rtt", "is_alive", "status_text"]
+
+# Код виходу, якщо ICMP-сокет не вдалося відкрити через брак прав
+EXIT_PERMISSION = 2
+
+
+class _PermissionDenied(Exception):
+    pass
+
+
+class RecordWriter:
+    """Пише записи рядок за рядком (NDJSON або CSV), одразу скидаючи їх у потік."""
+
+    def __init__(self, stream, fmt, fields, header=True):
+        self.stream = stream
+        self.fields = fields
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=fields, delimiter=';', extrasaction='ignore')
+            if header:
+                self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self.stream.write(json.dumps({key: record.get(key) for key in self.fields}) + "\n")
+
+
+def read_hosts(path):
+    """Хости з файлу: по одному в рядку, порожні рядки та коментарі (#) пропускаються."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+async def run_ping(hosts, writer, args, is_running):
+    """Кожен хост - власний FixedRateScheduler на спільному рушії (як у PingWorker)."""
+    denied = []
+
+    def on_result(host, seq, result, sent_at_ns, lateness_ms):
+        if result["status_text"] == "Permission Error":
+            denied.append(host)
+            return
+        writer.write(ping_record(host, seq, result, sent_at_ns, lateness_ms, args.interval))
+
+    def running():
+        return is_running() and not denied
+
+    async with AsyncProbeEngine(timeout=args.timeout, min_timeout=args.min_timeout,
+                                max_timeout=args.max_timeout) as engine:
+        await engine.prepare(hosts)
+        schedulers = [
+            FixedRateScheduler(engine, host, args.interval / 1000,
+                               lambda *result, host=host: on_result(host, *result),
+                               running, count=args.count or None)
+            for host in hosts
+        ]
+        await asyncio.gather(*(scheduler.run() for scheduler in schedulers))
+    if denied:
+        raise _PermissionDenied()
+
+
+async def run_test(hosts, writer, args, is_running):
+    """Раунди по всьому списку з обмеженою паралельністю (як у IPTestWorker)."""
+    rate_limiter = TokenBucket(args.rate) if args.rate else None
+    adaptive = AdaptiveConcurrency(args.concurrency)
+    spread = max(args.interval / 1000 - args.timeout, 0)
+    async with AsyncProbeEngine(concurrency=args.concurrency, timeout=args.timeout,
+                                rate_limiter=rate_limiter, min_timeout=args.min_timeout,
+                                max_timeout=args.max_timeout) as engine:
+        await engine.prepare(hosts)
+        round_number = 0
+        while is_running() and (not args.count or round_number < args.count):
+            round_number += 1
+            round_started = time.monotonic()
+            async for result in engine.probe_many(hosts, spread=spread):
+                if not is_running():
+                    break
+                if result["status_text"] == "Permission Error":
+                    raise _PermissionDenied()
+                adaptive.record(result)
+                writer.write(dict(result, round=round_number, timestamp_ns=time.time_ns()))
+            engine.concurrency = adaptive.end_round()
+            # Наступний раунд - не раніше ніж через інтервал від початку попереднього
+            pause = args.interval / 1000 - (time.monotonic() - round_started)
+            while pause > 0 and is_running():
+                await asyncio.sleep(min(pause, 0.1))
+                pause = args.interval / 1000 - (time.monotonic() - round_started)
+
+
+async def _main(hosts, writer, args):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    if sys.platform != "win32":
+        # Для режиму демона: SIGTERM завершує роботу так само, як Ctrl+C
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+    def is_running():
+        return not stop.is_set()
+
+    runner = run_test if args.mode == "test" else run_ping
+    await runner(hosts, writer, args, is_running)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Headless Ping Tool: streams probe results as NDJSON or CSV.")
+    parser.add_argument("hosts", nargs="*", help="hosts or IP addresses to probe")
+    parser.add_argument("-f", "--hosts-file", help="file with one host per line")
+    parser.add_argument("--mode", choices=["ping", "test"], default="ping",
+                        help="ping: fixed-rate probing per host (Ping tab); "
+                             "test: rounds over the whole list (IP Test tab)")
+    parser.add_argument("-i", "--interval", type=float, default=1000,
+                        help="ms between probes (ping) or between round starts (test); default 1000")
+    parser.add_argument("-c", "--count", type=int, default=0,
+                        help="probes per host (ping) or rounds (test); 0 = until interrupted")
+    parser.add_argument("-t", "--timeout", type=float, default=None,
+                        help="initial reply timeout in seconds (default: 2 for ping, 1 for test); "
+                             "after the first reply each host gets SRTT + 4*RTTVAR")
+    parser.add_argument("--min-timeout", type=float, default=DEFAULT_MIN_TIMEOUT,
+                        help="floor for the per-host timeout in seconds (default %(default)s)")
+    parser.add_argument("--max-timeout", type=float, default=DEFAULT_MAX_TIMEOUT,
+                        help="ceiling for the per-host timeout in seconds (default %(default)s); "
+                             "set both to -t for a fixed timeout")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="probes in flight in test mode (default %(default)s); "
+                             "lowered automatically when losses look like local drops")
+    parser.add_argument("--rate", type=float, default=DEFAULT_MAX_PPS,
+                        help="max probes per second in test mode, 0 = unlimited (default %(default)s)")
+    parser.add_argument("--backend", default=None,
+                        help=f"probe backend: icmp or simulated[:seed=N,loss=P,...] "
+                             f"(default: ${BACKEND_ENV} or icmp)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("-o", "--output", help="append results to this file instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.interval < 10:
+        parser.error("--interval must be at least 10 ms")
+    if args.timeout is None:
+        args.timeout = DEFAULT_TIMEOUT if args.mode == "test" else 2
+    if not 0 < args.min_timeout <= args.max_timeout:
+        parser.error("--min-timeout must be positive and not greater than --max-timeout")
+    if args.backend is not None:
+        try:
+            set_backend(backend_from_spec(args.backend))
+        except ValueError as e:
+            parser.error(f"--backend: {e}")
+
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        try:
+            hosts += read_hosts(args.hosts_file)
+        except OSError as e:
+            parser.error(f"cannot read hosts file: {e}")
+    hosts = list(dict.fromkeys(hosts))
+    if not hosts:
+        parser.error("no hosts given")
+
+    if args.output:
+        stream = open(args.output, 'a', newline='', encoding='utf-8', buffering=1)
+    else:
+        stream = sys.stdout
+        stream.reconfigure(line_buffering=True)
+    # При дописуванні в існуючий файл заголовок CSV не повторюємо
+    header = stream is sys.stdout or stream.tell() == 0
+    writer = RecordWriter(stream, args.format, TEST_FIELDS if args.mode == "test" else PING_FIELDS, header)
+
+    try:
+        asyncio.run(_main(hosts, writer, args))
+    except _PermissionDenied:
+        print("ICMP ping requires administrator privileges (on Linux you can allow unprivileged "
+              "ICMP via net.ipv4.ping_group_range).", file=sys.stderr)
+        return EXIT_PERMISSION
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # Напр. `python -m cli host | head`
+        pass
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,124 @@
+# dns_cache.py
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Скільки секунд вважати запис свіжим (системний резолвер не повертає TTL)
+DEFAULT_DNS_TTL = 300
+# Скільки пам'ятати, що ім'я НЕ розв'язалося
+NEGATIVE_DNS_TTL = 30
+# Скільки імен розв'язується паралельно
+DEFAULT_RESOLVE_CONCURRENCY = 64
+
+
+def parse_ip(address):
+    """Повертає (family, ip), якщо address - IP-літерал, інакше None."""
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return None
+    return (socket.AF_INET6 if ip.version == 6 else socket.AF_INET), str(ip)
+
+
+class DNSCache:
+    """
+    Спільний для обох вкладок кеш DNS: ім'я -> (family, ip).
+    Прострочений запис віддається одразу, а оновлюється у фоні,
+    тож цикл пінгу ніколи не чекає на резолвер після першого розв'язання.
+    Потокобезпечний: ним користуються воркери з різних потоків/циклів asyncio.
+    """
+
+    def __init__(self, ttl=DEFAULT_DNS_TTL, negative_ttl=NEGATIVE_DNS_TTL,
+                 concurrency=DEFAULT_RESOLVE_CONCURRENCY):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.concurrency = concurrency
+        # name -> (expires_at, family, ip, error)
+        self._entries = {}
+        self._refreshing = set()
+        self._background = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="dns")
+
+    def _get(self, name):
+        with self._lock:
+            return self._entries.get(name)
+
+    def _store(self, name, family=None, ip=None, error=None):
+        ttl = self.negative_ttl if error else self.ttl
+        with self._lock:
+            self._entries[name] = (time.monotonic() + ttl, family, ip, error)
+            self._refreshing.discard(name)
+
+    async def _lookup(self, name):
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.run_in_executor(self._executor, socket.getaddrinfo, name, None, 0, socket.SOCK_DGRAM)
+        except (socket.gaierror, UnicodeError) as e:
+            self._store(name, error=str(e))
+            raise socket.gaierror(str(e))
+        family, _, _, _, sockaddr = infos[0]
+        self._store(name, family, sockaddr[0])
+        return family, sockaddr[0]
+
+    async def _refresh(self, name):
+        try:
+            await self._lookup(name)
+        except socket.gaierror:
+            pass
+        finally:
+            # Навіть якщо цикл воркера зупинився посеред оновлення
+            with self._lock:
+                self._refreshing.discard(name)
+
+    async def resolve(self, name):
+        """Повертає (family, ip) або кидає socket.gaierror."""
+        literal = parse_ip(name)
+        if literal is not None:
+            return literal
+
+        entry = self._get(name)
+        if entry is None:
+            return await self._lookup(name)
+
+        expires_at, family, ip, error = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                start_refresh = name not in self._refreshing
+                self._refreshing.add(name)
+            if start_refresh:
+                task = asyncio.get_running_loop().create_task(self._refresh(name))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+        if error:
+            raise socket.gaierror(error)
+        return family, ip
+
+    async def resolve_many(self, names):
+        """Розв'язує всі імена паралельно (з обмеженням); помилки кешуються."""
+        names = {name for name in names if parse_ip(name) is None and self._get(name) is None}
+        if not names:
+            return
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def resolve_one(name):
+            async with semaphore:
+                try:
+                    await self._lookup(name)
+                except socket.gaierror:
+                    pass
+
+        await asyncio.gather(*(resolve_one(name) for name in names))
+
+    def prefetch(self, names):
+        """Запускає розв'язання імен у фоновому потоці (для виклику з GUI)."""
+        names = [name for name in names if parse_ip(name) is None]
+        if names:
+            threading.Thread(target=asyncio.run, args=(self.resolve_many(names),), daemon=True).start()
+
+
+# Один кеш на весь процес
+shared_dns_cache = DNSCache()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# export_worker.py
+import csv
+import os
+from itertools import islice
+from PyQt6.QtWidgets import QProgressDialog
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+from custom_dialogs import CustomMessageBox
+
+# Скільки рядків записується між перевірками скасування та оновленнями прогресу
+EXPORT_CHUNK_ROWS = 5000
+
+
+class CsvExportWorker(QThread):
+    """
+    Пише CSV у фоновому потоці. rows - ітератор по знімку даних, зробленому
+    в GUI-потоці, тож пінг і графік не зупиняються на час експорту.
+    Скасований експорт видаляє недописаний файл.
+    """
+    progress = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, header, rows, chunk_size=EXPORT_CHUNK_ROWS):
+        super().__init__()
+        self.path = path
+        self.header = header
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self._cancelled = False
+
+    def run(self):
+        try:
+            with open(self.path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f, delimiter=';')
+                writer.writerow(self.header)
+                rows = iter(self.rows)
+                written = 0
+                while not self._cancelled:
+                    chunk = list(islice(rows, self.chunk_size))
+                    if not chunk:
+                        break
+                    writer.writerows(chunk)
+                    written += len(chunk)
+                    self.progress.emit(written)
+            if self._cancelled:
+                os.remove(self.path)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
+
+
+def start_csv_export(parent, path, header, rows, total):
+    """Запускає експорт із вікном прогресу (немодальним) і повертає воркер."""
+    worker = CsvExportWorker(path, header, rows)
+
+    dialog = QProgressDialog("Exporting...", "Cancel", 0, max(total, 1), parent)
+    dialog.setWindowTitle("Export")
+    dialog.setWindowModality(Qt.WindowModality.NonModal)
+    dialog.setMinimumDuration(500)  # Короткі експорти вікна не показують
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    dialog.setValue(0)
+
+    worker.progress.connect(dialog.setValue)
+    dialog.canceled.connect(worker.cancel)
+    worker.failed.connect(lambda message: CustomMessageBox.show_critical(
+        parent, "Export Error", f"Could not save file: {message}"))
+    worker.finished.connect(dialog.close)
+    worker.finished.connect(dialog.deleteLater)
+    worker.start()
+    return worker
\ No newline at end of file
@@ -0,0 +1,129 @@
+# history_model.py
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+# Скільки останніх пакетів зберігає вкладка History
+DEFAULT_HISTORY_ROWS = 100_000
+
+COLUMNS = ["#", "Time", "Host", "Status", "Delay (ms)"]
+COL_SEQ, COL_TIME, COL_HOST, COL_STATUS, COL_DELAY = range(len(COLUMNS))
+
+_SUCCESS_COLOR = QColor("#1D672D")
+_FAILED_COLOR = QColor("#B3261E")
+
+
+def record_cell_text(record, col):
+    """Текст клітинки запису; не звертається до моделі, тож годиться і для потоку експорту."""
+    if col == COL_DELAY:
+        return f"{record[COL_DELAY]:.1f}" if record[COL_STATUS] == "Success" else "—"
+    return str(record[col])
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    Модель історії пакетів над кільцевим буфером фіксованої місткості.
+    Рядок 0 - найновіший; додавання на початок коштує O(1), найстаріші
+    рядки витісняються. Текст клітинок формується лише під час відображення.
+    """
+
+    def __init__(self, max_rows=DEFAULT_HISTORY_ROWS, parent=None):
+        super().__init__(parent)
+        self._capacity = max(1, int(max_rows))
+        self._buffer = [None] * self._capacity
+        self._head = 0   # Куди буде записано наступний рядок
+        self._count = 0
+
+    # --- Інтерфейс QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.cell_text(index.row(), index.column())
+        if role == Qt.ItemDataRole.ForegroundRole and index.column() == COL_STATUS:
+            return _SUCCESS_COLOR if self._record(index.row())[COL_STATUS] == "Success" else _FAILED_COLOR
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    # --- Доступ до даних ---
+    def _record(self, row):
+        return self._buffer[(self._head - 1 - row) % self._capacity]
+
+    def cell_text(self, row, col):
+        return record_cell_text(self._record(row), col)
+
+    def row_text(self, row):
+        return [self.cell_text(row, col) for col in range(len(COLUMNS))]
+
+    def rows_text(self):
+        """Усі рядки від найновішого до найстарішого (для експорту)."""
+        for row in range(self._count):
+            yield self.row_text(row)
+
+    def snapshot(self):
+        """Записи від найновішого до найстарішого: лише копія списку, без форматування."""
+        start = self._head - self._count
+        if start >= 0:
+            records = self._buffer[start:self._head]
+        else:
+            records = self._buffer[start:] + self._buffer[:self._head]
+        records.reverse()
+        return records
+
+    @property
+    def max_rows(self):
+        return self._capacity
+
+    # --- Зміна даних ---
+    def add_results(self, results):
+        """Додає пакет результатів (від старого до нового) на початок таблиці."""
+        results = results[-self._capacity:]
+        added = len(results)
+        if not added:
+            return
+
+        # Спершу витісняємо найстаріші рядки, що не вмістяться
+        overflow = self._count + added - self._capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), self._count - overflow, self._count - 1)
+            self._count -= overflow
+            self.endRemoveRows()
+
+        self.beginInsertRows(QModelIndex(), 0, added - 1)
+        for data in results:
+            self._buffer[self._head] = (data.get("seq", ""), data.get("time", ""), data.get("host", ""),
+                                        data.get("status", ""), data.get("delay", ""))
+            self._head = (self._head + 1) % self._capacity
+        self._count += added
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._buffer = [None] * self._capacity
+        self._head = 0
+        self._count = 0
+        self.endResetModel()
+
+    def set_max_rows(self, max_rows):
+        """Змінює місткість, зберігаючи найновіші рядки."""
+        max_rows = max(1, int(max_rows))
+        kept = [self._record(row) for row in range(min(self._count, max_rows))]
+        self.beginResetModel()
+        self._capacity = max_rows
+        self._buffer = [None] * max_rows
+        for index, record in enumerate(reversed(kept)):
+            self._buffer[index] = record
+        self._count = len(kept)
+        self._head = self._count % max_rows
+        self.endResetModel()
\ No newline at end of file
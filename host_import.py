@@ -0,0 +1,130 @@
+# host_import.py
+import ipaddress
+import re
+
+# Найбільший блок (CIDR чи діапазон), який розгортається у список хостів
+MAX_EXPANSION = 65536
+# Найбільша підмережа для режиму сканування (адреси не зберігаються у списку)
+MAX_SWEEP_HOSTS = 1 << 20
+# Скільки прикладів відхилених рядків показувати у зведенні
+MAX_INVALID_EXAMPLES = 5
+
+_SEPARATORS = re.compile(r"[,;\s]+")
+_NUMERIC = re.compile(r"^[\d.]+$")
+_HOSTNAME = re.compile(r"^(?=.{1,253}$)[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?"
+                       r"(?:\.[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?)*\.?$")
+
+
+class ImportResult:
+    """Підсумок імпорту: нові хости (у порядку файлу), дублікати та відхилені записи."""
+
+    def __init__(self):
+        self.hosts = []
+        self.duplicates = 0
+        self.invalid = []
+
+    def summary(self):
+        lines = [f"Imported {len(self.hosts)} hosts."]
+        if self.duplicates:
+            lines.append(f"Skipped {self.duplicates} duplicates.")
+        if self.invalid:
+            examples = ", ".join(entry for entry, _ in self.invalid[:MAX_INVALID_EXAMPLES])
+            more = "..." if len(self.invalid) > MAX_INVALID_EXAMPLES else ""
+            lines.append(f"Rejected {len(self.invalid)} invalid entries: {examples}{more}")
+        return "\n".join(lines)
+
+
+def _is_ip(text):
+    try:
+        ipaddress.ip_address(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _ip_range(entry):
+    """a.b.c.d-e або a.b.c.d-a.b.c.e -> ліниво розгорнутий діапазон адрес."""
+    left, right = entry.split("-", 1)
+    first = ipaddress.ip_address(left)
+    if right.isdigit() and first.version == 4:
+        last = ipaddress.ip_address(left.rsplit(".", 1)[0] + "." + right)
+    else:
+        last = ipaddress.ip_address(right)
+    if last.version != first.version or last < first:
+        raise ValueError("invalid range")
+    count = int(last) - int(first) + 1
+    if count > MAX_EXPANSION:
+        raise ValueError("range too large")
+    return (str(first + offset) for offset in range(count))
+
+
+def _network(entry):
+    network = ipaddress.ip_network(entry, strict=False)
+    if network.num_addresses > MAX_EXPANSION:
+        raise ValueError("range too large")
+    # /32 та /31 (і IPv6-аналоги) hosts() повертає повністю
+    return (str(ip) for ip in network.hosts()) if network.num_addresses > 1 else iter([str(network.network_address)])
+
+
+def sweep_targets(cidr):
+    """
+    Підмережа для сканування -> (кількість адрес, генератор адрес).
+    Адреси генеруються ліниво, тож /16 не займає пам'яті. Кидає ValueError.
+    """
+    network = ipaddress.ip_network(cidr.strip(), strict=False)
+    if network.num_addresses > MAX_SWEEP_HOSTS:
+        raise ValueError(f"Network is too large to sweep (max {MAX_SWEEP_HOSTS} addresses)")
+    if network.num_addresses <= 2:
+        return network.num_addresses, (str(ip) for ip in network)
+    # hosts() пропускає адресу мережі та broadcast в IPv4, а в IPv6 - лише
+    # anycast-адресу Subnet-Router (перша адреса мережі)
+    excluded = 2 if network.version == 4 else 1
+    return network.num_addresses - excluded, (str(ip) for ip in network.hosts())
+
+
+def expand_entry(entry):
+    """
+    Один запис файлу -> ітератор нормалізованих хостів.
+    Підтримує IP, імена, CIDR (10.0.0.0/24) та діапазони (10.0.0.1-50). Кидає ValueError.
+    """
+    if "/" in entry:
+        return _network(entry)
+    if "-" in entry and _is_ip(entry.split("-", 1)[0]):
+        return _ip_range(entry)
+    try:
+        return iter([str(ipaddress.ip_address(entry))])
+    except ValueError:
+        pass
+    name = entry.lower()
+    if _NUMERIC.match(name):
+        raise ValueError("invalid address")  # Напр. 300.1.1.1 - не IP і не ім'я
+    if not _HOSTNAME.match(name):
+        raise ValueError("invalid host")
+    return iter([name.rstrip(".")])
+
+
+def parse_host_lines(lines, existing=()):
+    """
+    Розбирає рядки (кілька записів у рядку - через кому/пробіл, # - коментар),
+    розгортає діапазони та відкидає дублікати й хости, що вже є в `existing`.
+    """
+    result = ImportResult()
+    seen = set(existing)
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        for entry in _SEPARATORS.split(line):
+            if not entry:
+                continue
+            try:
+                hosts = expand_entry(entry)
+                for host in hosts:
+                    if host in seen:
+                        result.duplicates += 1
+                    else:
+                        seen.add(host)
+                        result.hosts.append(host)
+            except ValueError as e:
+                result.invalid.append((entry, str(e)))
+    return result
\ No newline at end of file
@@ -0,0 +1,278 @@
+# host_stats.py
+import numpy as np
+from latency_stats import LatencyStats, DEFAULT_RELATIVE_ACCURACY
+
+# Початкова кількість рядків таблиці (зростає вдвічі за потреби)
+INITIAL_CAPACITY = 1024
+# Скільки останніх перевірок хоста пам'ятає бітова історія
+HISTORY_PROBES = 64
+# Вікно "недавніх" втрат за замовчуванням (перевірок)
+DEFAULT_RECENT_PROBES = 10
+
+# Джитер RFC 3550, 6.4.1: J += (|D| - J) / 16 (як у LatencyStats)
+_JITTER_GAIN = 1 / 16
+
+# Один рядок - 49 байт на хост; історія: біт 0 - остання перевірка, 1 - втрата
+HOST_STATS_DTYPE = np.dtype([
+    ("sent", "<u4"),
+    ("received", "<u4"),
+    ("consecutive_failures", "<u4"),
+    ("rtt_min", "<f4"),      # NaN, поки не було відповідей
+    ("rtt_max", "<f4"),
+    ("rtt_last", "<f4"),     # NaN, якщо остання перевірка невдала
+    ("rtt_last_ok", "<f4"),  # RTT останньої відповіді (для джитера)
+    ("jitter", "<f4"),
+    ("rtt_sum", "<f8"),
+    ("history", "<u8"),
+    ("active", "?"),
+])
+
+
+def _empty_rows(count):
+    rows = np.zeros(count, dtype=HOST_STATS_DTYPE)
+    for field in ("rtt_min", "rtt_max", "rtt_last", "rtt_last_ok"):
+        rows[field] = np.nan
+    return rows
+
+
+def _popcount(values):
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _occurrence_ranks(ids):
+    """Для кожного елемента - скільки разів цей самий id траплявся в пакеті раніше."""
+    order = np.argsort(ids, kind="stable")
+    ordered = ids[order]
+    positions = np.arange(len(ids))
+    group_starts = np.maximum.accumulate(
+        np.where(np.concatenate(([True], ordered[1:] != ordered[:-1])), positions, 0))
+    ranks = np.empty(len(ids), dtype=np.int64)
+    ranks[order] = positions - group_starts
+    return ranks
+
+
+class HostStatsTable:
+    """
+    Статистика хостів IP Test у стовпцях NumPy (структурований масив), рядок - id хоста.
+    Пакет результатів застосовується векторно (разом із джитером), а вибірки на кшталт
+    "хости з втратами понад 5% за останні 10 перевірок" рахуються без циклу Python по хостах.
+    Перцентилі вимкнені за замовчуванням: enable_percentiles() заводить LatencyStats
+    (об'єкт Python з кошиками, сотні байт) на кожен хост, що відповів, і цикл по
+    відповідях у record(). Без них на хост припадає рядок масиву (HOST_STATS_DTYPE)
+    плюс адреса в словнику id.
+    id видаленого хоста перевикористовується для наступного нового.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY, percentile_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                 percentiles=False):
+        self.percentile_accuracy = percentile_accuracy
+        self.percentiles_enabled = percentiles
+        self._rows = _empty_rows(max(1, capacity))
+        self._addresses = []  # id -> адреса (None - вільний id)
+        self._ids = {}
+        self._free = []
+        self._latency = {}  # id -> LatencyStats
+
+    # --- Хости ---
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, address):
+        return address in self._ids
+
+    def _reserve(self, size):
+        if size > len(self._rows):
+            capacity = len(self._rows)
+            while capacity < size:
+                capacity *= 2
+            grown = _empty_rows(capacity)
+            grown[:len(self._addresses)] = self._rows[:len(self._addresses)]
+            self._rows = grown
+
+    def add(self, addresses):
+        """Додає нові хости з нульовою статистикою; наявні не змінюються. Повертає реально додані."""
+        added = []
+        for address in addresses:
+            if address in self._ids:
+                continue
+            if self._free:
+                host_id = self._free.pop()
+                self._addresses[host_id] = address
+            else:
+                host_id = len(self._addresses)
+                self._reserve(host_id + 1)
+                self._addresses.append(address)
+            self._ids[address] = host_id
+            added.append(host_id)
+        if added:
+            self._rows[added] = _empty_rows(len(added))
+            self._rows["active"][added] = True
+        return [self._addresses[host_id] for host_id in added]
+
+    def remove(self, addresses):
+        for address in addresses:
+            host_id = self._ids.pop(address, None)
+            if host_id is None:
+                continue
+            self._rows["active"][host_id] = False
+            self._addresses[host_id] = None
+            self._latency.pop(host_id, None)
+            self._free.append(host_id)
+
+    def clear(self):
+        self._rows = _empty_rows(len(self._rows))
+        self._addresses = []
+        self._ids = {}
+        self._free = []
+        self._latency = {}
+
+    def ids(self, addresses):
+        """Масив id для адрес; -1 для невідомих (напр. видалених, поки воркер ще працював)."""
+        get = self._ids.get
+        return np.fromiter((get(address, -1) for address in addresses), dtype=np.int64, count=len(addresses))
+
+    def address(self, host_id):
+        return self._addresses[host_id]
+
+    def enable_percentiles(self, enabled=True):
+        """Вмикає перцентилі (рахуються з наступних відповідей) або вимикає й звільняє їх."""
+        self.percentiles_enabled = enabled
+        if not enabled:
+            self._latency = {}
+
+    # --- Запис ---
+    def record(self, ids, alive, rtt):
+        """
+        Застосовує пакет результатів: ids - id хостів (-1 пропускається), alive - bool,
+        rtt - мс (ігнорується для невдалих). Той самий хост може траплятися в пакеті
+        кілька разів - такі результати застосовуються по черзі.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        alive = np.asarray(alive, dtype=bool)
+        rtt = np.asarray(rtt, dtype=np.float64)
+        known = ids >= 0
+        if not known.all():
+            ids, alive, rtt = ids[known], alive[known], rtt[known]
+        if not len(ids):
+            return
+        ranks = _occurrence_ranks(ids)
+        for rank in range(int(ranks.max()) + 1):
+            selected = ranks == rank
+            if rank == 0 and selected.all():
+                self._record_unique(ids, alive, rtt)
+            else:
+                self._record_unique(ids[selected], alive[selected], rtt[selected])
+
+        if not self.percentiles_enabled:
+            return
+        sketches = self._latency
+        for host_id, latency in zip(ids[alive].tolist(), rtt[alive].tolist()):
+            sketch = sketches.get(host_id)
+            if sketch is None:
+                sketch = sketches[host_id] = LatencyStats(self.percentile_accuracy)
+            sketch.record(latency)
+
+    def _record_unique(self, ids, alive, rtt):
+        rows = self._rows[ids]
+        rows["sent"] += 1
+        rows["received"] += alive
+        rows["consecutive_failures"] = np.where(alive, 0, rows["consecutive_failures"] + 1)
+        rows["history"] = (rows["history"] << np.uint64(1)) | (~alive).astype(np.uint64)
+        ok_rtt = np.where(alive, rtt, np.nan)
+        # fmin/fmax ігнорують NaN: невдала перевірка не змінює min/max
+        rows["rtt_min"] = np.fmin(rows["rtt_min"], ok_rtt)
+        rows["rtt_max"] = np.fmax(rows["rtt_max"], ok_rtt)
+        rows["rtt_last"] = ok_rtt
+        # Джитер - за різницею з попередньою відповіддю, як у LatencyStats
+        previous = rows["rtt_last_ok"]
+        with np.errstate(invalid="ignore"):
+            difference = np.abs(ok_rtt - previous)
+        has_previous = alive & ~np.isnan(previous)
+        rows["jitter"] = np.where(has_previous, rows["jitter"] + (difference - rows["jitter"]) * _JITTER_GAIN,
+                                  rows["jitter"])
+        rows["rtt_last_ok"] = np.where(alive, rtt, previous)
+        rows["rtt_sum"] += np.where(alive, rtt, 0.0)
+        self._rows[ids] = rows
+
+    # --- Запити (ids=None - усі рядки, зокрема вільні) ---
+    def _column(self, field, ids):
+        column = self._rows[field][:len(self._addresses)]
+        return column if ids is None else column[ids]
+
+    def sent(self, ids=None):
+        return self._column("sent", ids)
+
+    def received(self, ids=None):
+        return self._column("received", ids)
+
+    def consecutive_failures(self, ids=None):
+        return self._column("consecutive_failures", ids)
+
+    def jitter(self, ids=None):
+        """Джитер RFC 3550 (мс); 0, поки не було двох відповідей."""
+        return self._column("jitter", ids)
+
+    def loss_percent(self, ids=None):
+        """Втрати за весь тест (%); NaN, якщо перевірок ще не було."""
+        sent = self._column("sent", ids).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(sent > 0, (1 - self._column("received", ids) / sent) * 100, np.nan)
+
+    def recent_loss_percent(self, probes=DEFAULT_RECENT_PROBES, ids=None):
+        """Втрати за останні probes перевірок кожного хоста (%, probes <= HISTORY_PROBES)."""
+        probes = min(probes, HISTORY_PROBES)
+        mask = np.uint64((1 << probes) - 1)
+        lost = _popcount(self._column("history", ids) & mask).astype(np.float64)
+        counted = np.minimum(self._column("sent", ids), probes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counted > 0, lost / counted * 100, np.nan)
+
+    def rtt_summary(self, ids=None):
+        """(min, avg, max) RTT у мс; NaN для хостів без відповідей."""
+        received = self._column("received", ids)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = np.where(received > 0, self._column("rtt_sum", ids) / received, np.nan)
+        return self._column("rtt_min", ids), average, self._column("rtt_max", ids)
+
+    def latency_stats(self, host_id):
+        """LatencyStats хоста або None, якщо перцентилі вимкнено чи відповідей ще не було."""
+        return self._latency.get(host_id)
+
+    def _addresses_where(self, mask):
+        mask = mask & self._column("active", None)
+        return [self._addresses[host_id] for host_id in np.flatnonzero(mask).tolist()]
+
+    def hosts_with_loss(self, min_percent, probes=DEFAULT_RECENT_PROBES):
+        """Адреси хостів, у яких втрати за останні probes перевірок перевищують min_percent."""
+        return self._addresses_where(self.recent_loss_percent(probes) > min_percent)
+
+    def failing_hosts(self, min_consecutive=1):
+        """Адреси хостів, що не відповіли на min_consecutive останніх перевірок поспіль."""
+        return self._addresses_where(self.consecutive_failures() >= min_consecutive)
+
+    def summary(self, address):
+        """Зведення по хосту за поточний тест, або None, якщо хоста немає чи перевірок не було."""
+        host_id = self._ids.get(address)
+        if host_id is None or not self._rows["sent"][host_id]:
+            return None
+        row = self._rows[host_id]
+        ids = np.array([host_id])
+        rtt_min, rtt_avg, rtt_max = (float(values[0]) for values in self.rtt_summary(ids))
+        sketch = self._latency.get(host_id)
+        p50, p95, p99 = sketch.percentiles((50, 95, 99)) if sketch is not None else (None, None, None)
+        return {
+            "sent": int(row["sent"]),
+            "received": int(row["received"]),
+            "loss_percent": float(self.loss_percent(ids)[0]),
+            "recent_loss_percent": float(self.recent_loss_percent(ids=ids)[0]),
+            "consecutive_failures": int(row["consecutive_failures"]),
+            "min_rtt": rtt_min,
+            "avg_rtt": rtt_avg,
+            "max_rtt": rtt_max,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "jitter": float(row["jitter"]),
+        }
\ No newline at end of file
@@ -0,0 +1,305 @@
+# ip_test_model.py
+import time
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractItemModel, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+from perf_monitor import perf
+
+COLUMNS = ["Host", "Status", "Latency (ms)", "Loss (%)", "Next Probe", "Backoff",
+           "P50 (ms)", "P95 (ms)", "P99 (ms)", "Jitter (ms)"]
+(COL_HOST, COL_STATUS, COL_LATENCY, COL_LOSS, COL_NEXT_PROBE, COL_BACKOFF,
+ COL_P50, COL_P95, COL_P99, COL_JITTER) = range(len(COLUMNS))
+# Колонки, що сортуються як числа (None - у кінці); усі після Status, у порядку таблиці
+_NUMERIC_COLUMNS = tuple(range(COL_LATENCY, len(COLUMNS)))
+# Колонки, приховані за замовчуванням (вмикаються з контекстного меню заголовка)
+OPTIONAL_COLUMNS = (COL_P50, COL_P95, COL_P99, COL_JITTER)
+
+
+def _latency_text(latency):
+    return f"{latency:.2f}" if latency is not None else "-"
+
+
+def _loss_text(loss):
+    return f"{loss:.1f}" if loss is not None else "-"
+
+
+def _next_probe_text(next_probe_at):
+    return time.strftime("%H:%M:%S", time.localtime(next_probe_at)) if next_probe_at is not None else "-"
+
+
+def _backoff_text(backoff):
+    return f"{backoff:g} s" if backoff is not None else "-"
+
+
+_FORMATTERS = {COL_LATENCY: _latency_text, COL_LOSS: _loss_text, COL_NEXT_PROBE: _next_probe_text,
+               COL_BACKOFF: _backoff_text, COL_P50: _latency_text, COL_P95: _latency_text,
+               COL_P99: _latency_text, COL_JITTER: _latency_text}
+
+
+def _sort_value(values, col):
+    """Ключ сортування рядка знімка - той самий, що й у IPTestTableModel.resort()."""
+    value = values[col]
+    if col in _NUMERIC_COLUMNS:
+        return value if value is not None else float('inf')
+    return value
+
+
+def snapshot_rows_text(snapshot, sort_column=-1, descending=False):
+    """
+    Рядки знімка snapshot() у порядку таблиці, вже як текст.
+    Сортує сам (стабільно, як модель), тож його можна виконувати у фоновому потоці.
+    """
+    if sort_column >= 0:
+        snapshot = sorted(snapshot, key=lambda values: _sort_value(values, sort_column), reverse=descending)
+    for host, status, *values in snapshot:
+        yield [host, status] + [_FORMATTERS[col](value) for col, value in zip(_NUMERIC_COLUMNS, values)]
+
+
+_SUCCESS_COLOR = QColor("#1D672D")
+_FAILED_COLOR = QColor("#B3261E")
+
+
+class IPTestTableModel(QAbstractTableModel):
+    """
+    Модель таблиці IP Test: дані зберігаються по колонках (запис - хост у порядку
+    додавання), а словник address -> запис дає пошук за O(1).
+    Сортує сама себе (QTableView викликає sort() при кліку на заголовок): ключі
+    впорядковує NumPy, без порівнянь у Python, а пересортування змінює лише
+    відображення рядок -> запис, не переставляючи самих колонок. Оновлення та
+    вставки лише позначають порядок застарілим (sort_dirty) - вкладка викликає
+    resort() за таймером (RESORT_INTERVAL_MS), а не на кожен dataChanged.
+    Рядки в публічних методах (cell_text, row_text, row_of) - рядки таблиці.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hosts = []
+        self._status = []
+        self._alive = []
+        # Числові колонки: останній RTT, втрати, час наступної перевірки (с epoch),
+        # подовжений інтервал мертвого хоста (с), P50/P95/P99 і джитер RTT
+        self._values = {col: [] for col in _NUMERIC_COLUMNS}
+        self._index = {}
+        # Рядок таблиці -> запис і навпаки
+        self._order = []
+        self._rows = []
+        # Поточне сортування (-1 - без сортування) і чи застарів порядок рядків
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.sort_dirty = False
+
+    # --- Інтерфейс QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def index(self, row, column, parent=QModelIndex()):
+        # Без базового hasIndex(): той викликає ще rowCount/columnCount у Python,
+        # а представлення створює індекси на кожну видиму клітинку
+        if parent.isValid() or not (0 <= row < len(self._order) and 0 <= column < len(COLUMNS)):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record, col = self._order[index.row()], index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._cell_text(record, col)
+        if role == Qt.ItemDataRole.ForegroundRole and col == COL_STATUS and self._alive[record] is not None:
+            return _SUCCESS_COLOR if self._alive[record] else _FAILED_COLOR
+        if role == Qt.ItemDataRole.TextAlignmentRole and col > COL_HOST:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    # --- Доступ до даних ---
+    def _cell_text(self, record, col):
+        if col == COL_HOST:
+            return self._hosts[record]
+        if col == COL_STATUS:
+            return self._status[record]
+        return _FORMATTERS[col](self._values[col][record])
+
+    def cell_text(self, row, col):
+        return self._cell_text(self._order[row], col)
+
+    def row_text(self, row):
+        record = self._order[row]
+        return [self._cell_text(record, col) for col in range(len(COLUMNS))]
+
+    def hosts(self):
+        return list(self._hosts)
+
+    def snapshot(self):
+        """Сирі значення (host, status, latency, loss, next_probe_at, backoff, p50, p95, p99, jitter)
+        усіх рядків у порядку додавання (порядок таблиці відтворює snapshot_rows_text)."""
+        return list(zip(self._hosts, self._status, *(self._values[col] for col in _NUMERIC_COLUMNS)))
+
+    def row_of(self, address):
+        record = self._index.get(address)
+        return None if record is None else self._rows[record]
+
+    def __contains__(self, address):
+        return address in self._index
+
+    # --- Зміна даних ---
+    @perf.timed("ip_test.model_insert")
+    def add_hosts(self, addresses):
+        """Додає нові хости одним пакетом. Повертає список реально доданих."""
+        new_hosts = []
+        seen = set()
+        for address in addresses:
+            if address not in self._index and address not in seen:
+                seen.add(address)
+                new_hosts.append(address)
+        if not new_hosts:
+            return []
+
+        # Записи і рядки завжди однакової кількості, тож нові записи - нові рядки в кінці
+        first = len(self._hosts)
+        new_records = range(first, first + len(new_hosts))
+        self.beginInsertRows(QModelIndex(), first, first + len(new_hosts) - 1)
+        self._index.update(zip(new_hosts, new_records))
+        self._hosts.extend(new_hosts)
+        self._status.extend(["-"] * len(new_hosts))
+        self._alive.extend([None] * len(new_hosts))
+        for values in self._values.values():
+            values.extend([None] * len(new_hosts))
+        self._order.extend(new_records)
+        self._rows.extend(new_records)
+        self.endInsertRows()
+        # На місце нові рядки поставить наступний resort()
+        self.sort_dirty = self.sort_column >= 0
+        return new_hosts
+
+    def update_host(self, address, status_text, is_alive, *values):
+        """Оновлює рядок хоста; dataChanged лише для змінених клітинок."""
+        self.update_hosts([(address, status_text, is_alive) + values])
+
+    @perf.timed("ip_test.model_update")
+    def update_hosts(self, updates):
+        """
+        Застосовує пакет оновлень (address, status_text, is_alive, latency, loss, next_probe_at, backoff,
+        p50, p95, p99, jitter) і надсилає dataChanged лише для змінених рядків - по одному на кожен
+        суцільний блок. Пропущені з кінця числові значення лишаються None.
+        Один сигнал на весь діапазон змусив би представлення перемалювати та перечитати
+        УСІ рядки між першим і останнім зміненим, а це вся таблиця.
+        """
+        changed_rows = []
+        first_col = last_col = None
+        columns = [(col, self._values[col]) for col in _NUMERIC_COLUMNS]
+        for address, status_text, is_alive, *values in updates:
+            record = self._index.get(address)
+            if record is None:
+                continue
+            changed = []
+            if self._status[record] != status_text or self._alive[record] != is_alive:
+                self._status[record] = status_text
+                self._alive[record] = is_alive
+                changed.append(COL_STATUS)
+            values.extend([None] * (len(columns) - len(values)))
+            for (col, column), value in zip(columns, values):
+                if column[record] != value:
+                    column[record] = value
+                    changed.append(col)
+            if not changed:
+                continue
+            if self.sort_column in changed:
+                self.sort_dirty = True
+            changed_rows.append(self._rows[record])
+            if first_col is None:
+                first_col, last_col = changed[0], changed[-1]
+            else:
+                first_col, last_col = min(first_col, changed[0]), max(last_col, changed[-1])
+        if not changed_rows:
+            return
+        changed_rows.sort()
+        start = end = changed_rows[0]
+        for row in changed_rows[1:] + [None]:
+            if row is not None and row <= end + 1:
+                end = row
+                continue
+            self.dataChanged.emit(self.index(start, first_col), self.index(end, last_col))
+            if row is not None:
+                start = end = row
+
+    def remove_hosts(self, addresses):
+        rows = sorted({self._rows[self._index[a]] for a in addresses if a in self._index}, reverse=True)
+        if not rows:
+            return
+
+        # Видаляємо суцільними блоками рядків з кінця, щоб індекси не зсувалися
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self._order[start:end + 1]
+            self.endRemoveRows()
+            if row is not None:
+                start = end = row
+
+        # Записи, що лишилися, ущільнюються в порядку таблиці - рядок знову дорівнює запису
+        records = self._order
+        self._hosts = [self._hosts[record] for record in records]
+        self._status = [self._status[record] for record in records]
+        self._alive = [self._alive[record] for record in records]
+        for col in _NUMERIC_COLUMNS:
+            values = self._values[col]
+            self._values[col] = [values[record] for record in records]
+        self._index = {address: record for record, address in enumerate(self._hosts)}
+        self._order = list(range(len(self._hosts)))
+        self._rows = list(self._order)
+
+    # --- Сортування ---
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.resort()
+
+    @perf.timed("ip_test.model_resort")
+    def resort(self):
+        """
+        Впорядковує рядки за поточним сортуванням (стабільно за порядком додавання;
+        None у числових колонках - як нескінченність, як і в snapshot_rows_text).
+        Вибрані рядки лишаються вибраними.
+        """
+        self.sort_dirty = False
+        column = self.sort_column
+        count = len(self._hosts)
+        if column < 0 or count < 2:
+            return
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        if column in _NUMERIC_COLUMNS:
+            keys = np.fromiter((float('inf') if value is None else value for value in self._values[column]),
+                               dtype=np.float64, count=count)
+            # Стабільне сортування за -keys зберігає порядок рівних, як sorted(reverse=True)
+            order = np.argsort(-keys if descending else keys, kind="stable")
+        else:
+            texts = self._hosts if column == COL_HOST else self._status
+            order = np.array(sorted(range(count), key=texts.__getitem__, reverse=descending), dtype=np.int64)
+        new_order = order.tolist()
+        if new_order == self._order:
+            return
+
+        hint = QAbstractItemModel.LayoutChangeHint.VerticalSortHint
+        self.layoutAboutToBeChanged.emit([], hint)
+        new_rows = np.empty(count, dtype=np.int64)
+        new_rows[order] = np.arange(count)
+        new_rows = new_rows.tolist()
+        # Постійні індекси (виділення, поточна клітинка) переходять за своїми записами
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_rows[self._order[index.row()]], index.column()) for index in persistent])
+        self._order = new_order
+        self._rows = new_rows
+        self.layoutChanged.emit([], hint)
\ No newline at end of file
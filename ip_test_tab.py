@@ -1,108 +1,275 @@
 # ip_test_tab.py
-import csv
-import socket
+import asyncio
 import time
-from PyQt6.QtWidgets import (
-    QWidget, QTableWidgetItem, QFileDialog, QApplication
-)
-from PyQt6.QtGui import QFont, QColor
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QFileDialog, QApplication, QMenu
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 import qtawesome as qta
-# --- Змінено імпорт ---
-from icmplib import ping, exceptions as icmp_exceptions
+from probe_engine import (AsyncProbeEngine, AdaptiveConcurrency, BackoffScheduler, TokenBucket,
+                          current_backend, DEFAULT_CONCURRENCY, DEFAULT_MAX_PPS, DEFAULT_TIMEOUT,
+                          DEFAULT_MIN_TIMEOUT, DEFAULT_MAX_TIMEOUT, DEFAULT_MAX_BACKOFF)
+from ip_test_model import COLUMNS, COL_P50, COL_P95, COL_P99, snapshot_rows_text
+from host_stats import HostStatsTable, DEFAULT_RECENT_PROBES
+from result_queue import ResultQueue, DEFAULT_REFRESH_HZ, DEFAULT_DRAIN_LIMIT
+from result_db import ResultDatabase, DEFAULT_DB_PATH
+from perf_monitor import perf
+from probe_pool import ShardedProbePool
+from custom_dialogs import CustomMessageBox
+from export_worker import start_csv_export
+from host_import import parse_host_lines, sweep_targets
 
 # --- Новий імпорт ---
 from ui import Ui_IPTestTab
 
-
-# --- Логічні класи (без змін) ---
-class NumericTableWidgetItem(QTableWidgetItem):
-    def __lt__(self, other):
-        try:
-            self_val = float(self.text())
-        except:
-            self_val = float('inf')
-        try:
-            other_val = float(other.text())
-        except:
-            other_val = float('inf')
-        return self_val < other_val
-
-
-class IPStat:
-    def __init__(self):
-        self.sent = 0
-        self.received = 0
-
-
+# Як часто перевіряється кожен живий хост (с); мертві - рідше, до DEFAULT_MAX_BACKOFF
+DEFAULT_PROBE_INTERVAL = 2
+# Процеси для перевірок: 1 - усе в потоці воркера, N > 1 - шардинг по N процесах,
+# 0 - по процесу на ядро (для списків на сотні тисяч хостів)
+DEFAULT_PROBE_PROCESSES = 1
+# Як часто потік воркера перевіряє зупинку, чекаючи на пакети від шардів (с)
+_POOL_POLL = 0.1
+# Як часто сканування перевіряє, чи GUI розібрав переповнену чергу результатів (с)
+_QUEUE_FULL_POLL = 0.05
+# Сканування підмережі: скільки запитів одночасно і скільки чекати відповіді (с)
+DEFAULT_SWEEP_CONCURRENCY = 1024
+SWEEP_TIMEOUT = 1
+# Скільки результатів сканування пишеться в історію одним пакетом
+SWEEP_DB_BATCH = 1000
+# Відносна похибка перцентилів IP Test: грубші кошики, бо хостів можуть бути сотні тисяч
+IP_TEST_PERCENTILE_ACCURACY = 0.05
+# Як часто таблиця пересортовується, якщо змінилися значення колонки сортування (мс)
+RESORT_INTERVAL_MS = 1000
+
+
+# --- Логічні класи ---
 class IPTestWorker(QThread):
+    """
+    Безперервна перевірка списку: BackoffScheduler тримає купу хостів за часом
+    наступної перевірки, тож мертві хости поступово перевіряються рідше
+    і не забирають час у живих.
+    processes != 1 - список шардиться по процесах (ShardedProbePool), а цей
+    потік лише приймає від них пакети результатів.
+    """
     result_ready = pyqtSignal(dict)
     finished = pyqtSignal()
 
-    def __init__(self, addresses_to_test):
+    def __init__(self, addresses_to_test, concurrency=DEFAULT_CONCURRENCY, batched=False, database=None,
+                 max_pps=DEFAULT_MAX_PPS, probe_interval=DEFAULT_PROBE_INTERVAL,
+                 min_timeout=DEFAULT_MIN_TIMEOUT, max_timeout=DEFAULT_MAX_TIMEOUT,
+                 max_backoff=DEFAULT_MAX_BACKOFF, processes=DEFAULT_PROBE_PROCESSES):
         super().__init__()
-        self.addresses = addresses_to_test
+        self.initial_addresses = list(addresses_to_test)
+        self.concurrency = concurrency
+        # Таймаут кожного хоста - з його RTT у цих межах (DEFAULT_TIMEOUT - до першої відповіді)
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        # Спільний бюджет пакетів на секунду (0 - без обмеження)
+        self.max_pps = max_pps
+        self.probe_interval = probe_interval
+        self.pool = None
+        self.scheduler = None
+        if processes != 1:
+            self.pool = ShardedProbePool(self.initial_addresses, processes, concurrency, max_pps, probe_interval,
+                                         DEFAULT_TIMEOUT, min_timeout, max_timeout, max_backoff)
+        else:
+            self.scheduler = BackoffScheduler(probe_interval, max_backoff=max_backoff)
+            self.scheduler.add(self.initial_addresses)
+        # Результати йдуть в історію пакетами раз на probe_interval (запис - у потоці бази)
+        self.database = database
+        self.run_id = time.time_ns()
+        self._rows = []
+        self._adaptive = AdaptiveConcurrency(concurrency)
+        # У пакетному режимі результати складаються в чергу замість сигналів
+        self.results = ResultQueue() if batched else None
         self._is_running = True
 
-    # --- ОНОВЛЕНИЙ МЕТОД RUN З КРАЩИМИ ВИНЯТКАМИ ---
-    def run(self):
-        while self._is_running:
-            for address in self.addresses:
-                if not self._is_running:
-                    break
-
-                result = {}  # Створюємо порожній словник
-
-                try:
-                    host_stats = ping(address, count=1, timeout=1)
-                    result = {
-                        "address": address,
-                        "rtt": host_stats.avg_rtt if host_stats.is_alive else 0,
-                        "is_alive": host_stats.is_alive,
-                        "status_text": "Success" if host_stats.is_alive else "Failed"
-                    }
+    # --- Хости можна додавати й видаляти під час тесту (з GUI-потоку) ---
+    def add_addresses(self, addresses):
+        (self.pool or self.scheduler).add(addresses)
 
-                # --- Покращена обробка винятків ---
+    def remove_addresses(self, addresses):
+        (self.pool or self.scheduler).remove(addresses)
 
-                # Конкретна помилка: немає прав
-                except (icmp_exceptions.SocketPermissionError, PermissionError):
-                    result = {"address": address, "is_alive": False, "status_text": "Permission Error"}
-                    self._is_running = False  # Зупиняємо весь тест
+    def run(self):
+        if self.pool is not None:
+            self._run_pool()
+        else:
+            asyncio.run(self._run())
+        self.finished.emit()
 
-                # Конкретна помилка: хост не знайдено (DNS)
-                except icmp_exceptions.NameLookupError:
-                    result = {"address": address, "is_alive": False, "status_text": "Host not found"}
+    def _run_pool(self):
+        self.pool.start()
+        try:
+            last_flush = time.monotonic()
+            while self._is_running and self.pool.alive():
+                if self._results_backlogged():
+                    # Пакети не забираються і не підтверджуються - шарди пригальмують самі
+                    time.sleep(_POOL_POLL)
+                else:
+                    for result, probe_number in self.pool.receive(_POOL_POLL):
+                        self._on_result(result, probe_number)
+                if time.monotonic() - last_flush >= self.probe_interval:
+                    last_flush = time.monotonic()
+                    self._flush_rows()
+        finally:
+            self.pool.stop()
+            self._flush_rows()
+
+    async def _run(self):
+        rate_limiter = TokenBucket(self.max_pps) if self.max_pps else None
+        async with AsyncProbeEngine(concurrency=self.concurrency, timeout=DEFAULT_TIMEOUT,
+                                    rate_limiter=rate_limiter, min_timeout=self.min_timeout,
+                                    max_timeout=self.max_timeout) as engine:
+            # Усі імена - паралельно і наперед; далі перевірки працюють з IP з кешу
+            await engine.prepare(self.initial_addresses)
+            housekeeping = asyncio.get_running_loop().create_task(self._housekeeping(engine))
+            try:
+                await self.scheduler.run(engine, self._on_scheduled_result, lambda: self._is_running,
+                                         self._results_backlogged)
+            finally:
+                housekeeping.cancel()
+                self._flush_rows()
+
+    async def _housekeeping(self, engine):
+        """Раз на probe_interval: пакет в історію та корекція паралельності."""
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            self._flush_rows()
+            # Втрати, схожі на локальні (буфери, rate limit), - менше запитів у польоті
+            engine.concurrency = self._adaptive.end_round()
+
+    def _results_backlogged(self):
+        return self.results is not None and self.results.full()
+
+    def _on_scheduled_result(self, result, probe_number):
+        self._adaptive.record(result)
+        self._on_result(result, probe_number)
+
+    def _on_result(self, result, probe_number):
+        self._publish(result)
+        if result["status_text"] == "Permission Error":
+            self._is_running = False  # Зупиняємо весь тест
+            return
+        self._rows.append((self.run_id, probe_number, result["address"], time.time_ns(),
+                           result.get("rtt") if result["is_alive"] else None, result["status_text"]))
 
-                # Конкретна помилка: неправильний формат адреси
-                except icmp_exceptions.SocketAddressError:
-                    result = {"address": address, "is_alive": False, "status_text": "Invalid address"}
+    def _flush_rows(self):
+        if self.database is not None and self._rows:
+            self.database.add_round(self._rows)
+        self._rows = []
 
-                # Інші відомі помилки бібліотеки icmplib
-                except icmp_exceptions.ICMPLibError as e:
-                    result = {"address": address, "is_alive": False, "status_text": f"ICMP Error"}
-                    print(f"[IPTestWorker ICMP Error] Host: {address}, Error: {e}")
+    def _publish(self, result):
+        if self.results is not None:
+            self.results.put(result)
+        else:
+            self.result_ready.emit(result)
 
-                # Загальний обробник для НЕОЧІКУВАНИХ помилок
-                except Exception as e:
-                    result = {"address": address, "is_alive": False, "status_text": "Unexpected Error"}
-                    print(f"[IPTestWorker Error] Host: {address}, Error: {e}")
+    def stop(self):
+        self._is_running = False
 
-                # --- Кінець обробки ---
 
-                self.result_ready.emit(result)
+class SubnetSweepWorker(QThread):
+    """
+    Один прохід по всіх адресах підмережі. Адреси беруться з генератора
+    по мірі звільнення слотів (probe_many), тож навіть /16 не займає пам'яті,
+    а результати - і живі, і мертві хости - одразу йдуть у чергу для таблиці.
+    """
+    finished = pyqtSignal()
 
-            if self._is_running:
-                time.sleep(1)
+    def __init__(self, network, targets, total, concurrency=DEFAULT_SWEEP_CONCURRENCY, database=None,
+                 max_pps=DEFAULT_MAX_PPS):
+        super().__init__()
+        self.network = network
+        self.targets = targets
+        self.total = total
+        self.concurrency = concurrency
+        self.max_pps = max_pps
+        self.database = database
+        self.run_id = time.time_ns()
+        self.results = ResultQueue()
+        # Лічильники читає GUI-потік для рядка прогресу
+        self.probed = 0
+        self.alive = 0
+        self.started_at = None
+        self.permission_denied = False
+        self._is_running = True
 
+    def run(self):
+        asyncio.run(self._sweep())
         self.finished.emit()
 
+    async def _sweep(self):
+        self.started_at = time.monotonic()
+        rows = []
+        rate_limiter = TokenBucket(self.max_pps) if self.max_pps else None
+        # Кожна адреса пробується один раз - адаптивні таймаути тут лише
+        # тримали б стан на кожну з 65 тис. адрес
+        async with AsyncProbeEngine(concurrency=self.concurrency, timeout=SWEEP_TIMEOUT,
+                                    rate_limiter=rate_limiter, adaptive_timeout=False) as engine:
+            async for result in engine.probe_many(self.targets):
+                if not self._is_running:
+                    break
+                if result["status_text"] == "Permission Error":
+                    self.permission_denied = True
+                    break
+                self.probed += 1
+                if result["is_alive"]:
+                    self.alive += 1
+                self.results.put(result)
+                rows.append((self.run_id, 1, result["address"], time.time_ns(),
+                             result.get("rtt") if result["is_alive"] else None, result["status_text"]))
+                if len(rows) >= SWEEP_DB_BATCH and self.database is not None:
+                    self.database.add_round(rows)
+                    rows = []
+                # GUI не встигає - нові адреси не беруться, поки черга не спаде
+                while self.results.full() and self._is_running:
+                    await asyncio.sleep(_QUEUE_FULL_POLL)
+        if self.database is not None:
+            self.database.add_round(rows)
+
+    def eta(self):
+        """Секунди до кінця за поточною швидкістю, або None, якщо оцінювати ще зарано."""
+        if not self.probed or self.started_at is None:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        # Перша хвиля ще чекає таймаутів - швидкість поки нічого не означає
+        if elapsed < 2 * SWEEP_TIMEOUT:
+            return None
+        rate = self.probed / elapsed
+        return max(0, self.total - self.probed) / rate
+
     def stop(self):
         self._is_running = False
 
 
+class HostImportWorker(QThread):
+    """Читає й розбирає файл хостів поза GUI-потоком; результат - один ImportResult."""
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, existing_hosts):
+        super().__init__()
+        self.path = path
+        self.existing_hosts = existing_hosts
+
+    def run(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                result = parse_host_lines(f, self.existing_hosts)
+        except (OSError, UnicodeDecodeError) as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(result)
+
+
 # --- Оновлений клас вкладки ---
 class IPTestTab(QWidget):
-    def __init__(self, history_callback, completer):
+    # Помилка запису з фонового потоку ResultDatabase
+    database_error = pyqtSignal(str)
+
+    def __init__(self, history_callback, completer, refresh_hz=DEFAULT_REFRESH_HZ, db_path=DEFAULT_DB_PATH,
+                 max_pps=DEFAULT_MAX_PPS, processes=DEFAULT_PROBE_PROCESSES):
         super().__init__()
 
         # Створюємо UI
@@ -111,13 +278,36 @@ class IPTestTab(QWidget):
 
         # Ініціалізуємо логіку
         self.worker = None
-        self.host_stats = {}
+        # Статистика поточного тесту/сканування: стовпці NumPy, рядок на хост
+        self.host_stats = HostStatsTable(percentile_accuracy=IP_TEST_PERCENTILE_ACCURACY)
         self.history_callback = history_callback
+        # Бюджет пакетів на секунду для тесту та сканування; процеси для тесту
+        self.max_pps = max_pps
+        self.processes = processes
+
+        # Таймер, що забирає накопичені результати воркера пакетами
+        self.refresh_hz = refresh_hz
+        self.refresh_timer = QTimer(self)
+        if refresh_hz > 0:
+            self.refresh_timer.setInterval(int(1000 / refresh_hz))
+        self.refresh_timer.timeout.connect(self.drain_results)
+        # Пересортування таблиці - окремим рідшим таймером, лише коли порядок застарів
+        self.resort_timer = QTimer(self)
+        self.resort_timer.setInterval(RESORT_INTERVAL_MS)
+        self.resort_timer.timeout.connect(self.resort_table)
+        self.resort_timer.start()
+
+        # Історія всіх раундів (db_path=None - не зберігати); відкривається при першому тесті
+        self.db_path = db_path
+        self.database = None
+        self.export_worker = None
+        self.import_worker = None
 
         # Встановлюємо початковий стиль кнопки
         self.set_start_button_style(False)
 
         # --- Прив'язка сигналів (ЛОГІКА) ---
+        self.database_error.connect(self.on_database_error)
         self.ui.host_input.returnPressed.connect(self.add_host_from_input)
         self.ui.add_btn.clicked.connect(self.add_host_from_input)
         self.ui.import_btn.clicked.connect(self.import_hosts)
@@ -125,56 +315,56 @@ class IPTestTab(QWidget):
         self.ui.delete_btn.clicked.connect(self.delete_selection)  # --- *** НОВИЙ СИГНАЛ *** ---
         self.ui.start_btn.clicked.connect(self.toggle_test)
         self.ui.export_btn.clicked.connect(self.export_results)
+        self.ui.sweep_btn.clicked.connect(self.start_sweep)
+        self.ui.table.doubleClicked.connect(self.show_host_history)
+        self.ui.table.horizontalHeader().customContextMenuRequested.connect(self.show_column_menu)
+
+    def show_column_menu(self, pos):
+        """Меню заголовка таблиці: які колонки показувати (Host - завжди)."""
+        header = self.ui.table.horizontalHeader()
+        menu = QMenu(self)
+        for column in range(1, len(COLUMNS)):
+            action = menu.addAction(COLUMNS[column])
+            action.setCheckable(True)
+            action.setChecked(not self.ui.table.isColumnHidden(column))
+            action.toggled.connect(lambda checked, column=column: self.set_column_visible(column, checked))
+        menu.exec(header.mapToGlobal(pos))
+
+    def set_column_visible(self, column, visible):
+        self.ui.table.setColumnHidden(column, not visible)
+        # Перцентилі коштують пам'яті на кожен хост - рахуються, лише поки їх видно
+        shown = any(not self.ui.table.isColumnHidden(col) for col in (COL_P50, COL_P95, COL_P99))
+        if shown != self.host_stats.percentiles_enabled:
+            self.host_stats.enable_percentiles(shown)
+
+    def resort_table(self):
+        if self.ui.model.sort_dirty:
+            self.ui.model.resort()
+
+    def _selected_source_rows(self):
+        """Рядки моделі, вибрані у таблиці, у порядку відображення."""
+        return sorted(set(index.row() for index in self.ui.table.selectionModel().selectedIndexes()))
 
-    # --- *** НОВИЙ МЕТОД *** ---
     def delete_selection(self):
         """
         Видаляє вибрані рядки з таблиці та з активного тестування.
         """
-        selected_items = self.ui.table.selectedItems()
-        if not selected_items:
+        hosts_removed = [self.ui.model.cell_text(row, 0) for row in self._selected_source_rows()]
+        if not hosts_removed:
             return  # Нічого не вибрано
 
-        # Отримуємо унікальні індекси рядків, відсортовані у зворотному порядку.
-        # Це важливо, щоб індекси не зсувалися під час видалення.
-        rows_to_delete = sorted(list(set(item.row() for item in selected_items)), reverse=True)
-
-        hosts_removed = []
-
-        # Тимчасово вимикаємо сортування, щоб уникнути помилок при видаленні
-        self.ui.table.setSortingEnabled(False)
-
-        for row in rows_to_delete:
-            host_item = self.ui.table.item(row, 0)
-            if host_item:
-                host = host_item.text()
-                hosts_removed.append(host)
-
-                # Видаляємо хост зі словника статистики
-                if host in self.host_stats:
-                    del self.host_stats[host]
-
-            # Видаляємо рядок з таблиці (візуально)
-            self.ui.table.removeRow(row)
-
-        # Вмикаємо сортування назад
-        self.ui.table.setSortingEnabled(True)
+        self.host_stats.remove(hosts_removed)
+        self.ui.model.remove_hosts(hosts_removed)
 
-        # Якщо воркер активний, видаляємо хости з його списку завдань
-        if self.worker and self.worker.isRunning() and hosts_removed:
-            self.worker.addresses = [addr for addr in self.worker.addresses if addr not in hosts_removed]
-
-    # --- *** КІНЕЦЬ НОВОГО МЕТОДУ *** ---
+        # Якщо воркер активний, видаляємо хости з його розкладу
+        if self._test_running():
+            self.worker.remove_addresses(hosts_removed)
 
     def copy_selection(self):
-        selection = self.ui.table.selectedIndexes()
-        if not selection:
+        rows = self._selected_source_rows()
+        if not rows:
             return
-        rows = sorted(set(index.row() for index in selection))
-        clipboard_text = []
-        for row in rows:
-            row_data = [self.ui.table.item(row, col).text() for col in range(self.ui.table.columnCount())]
-            clipboard_text.append("\t".join(row_data))
+        clipboard_text = ["\t".join(self.ui.model.row_text(row)) for row in rows]
         QApplication.clipboard().setText("\n".join(clipboard_text))
 
     def add_host_from_input(self):
@@ -182,30 +372,25 @@ class IPTestTab(QWidget):
         if not address:
             return
         self.history_callback(address)
-        self._add_row(address)
+        added = self._add_row(address)
+        current_backend().resolver.prefetch([address])
         self.ui.host_input.clear()
 
-        if self.worker and self.worker.isRunning():
-            if address not in self.worker.addresses:
-                self.worker.addresses.append(address)
-                self.host_stats[address] = IPStat()
+        if added and self._test_running():
+            self.worker.add_addresses([address])
 
+    @perf.timed("ip_test.add_row")
     def _add_row(self, address):
-        for row in range(self.ui.table.rowCount()):
-            if self.ui.table.item(row, 0).text() == address:
-                return
-        row_position = self.ui.table.rowCount()
-        self.ui.table.insertRow(row_position)
-        self.ui.table.setItem(row_position, 0, QTableWidgetItem(address))
-        self.ui.table.setItem(row_position, 1, QTableWidgetItem("-"))
-        self.ui.table.setItem(row_position, 2, NumericTableWidgetItem("-"))
-        self.ui.table.setItem(row_position, 3, NumericTableWidgetItem("-"))
-        for col in range(4):
-            if col > 0:
-                self.ui.table.item(row_position, col).setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        if self.worker and self.worker.isRunning():
-            self.host_stats[address] = IPStat()
+        """Додає рядок (і статистику, якщо тест іде); False, якщо хост уже в таблиці."""
+        if not self.ui.model.add_hosts([address]):
+            return False
+        if self._test_running():
+            self.host_stats.add([address])
+        return True
+
+    def _test_running(self):
+        """Чи йде звичайний тест (у сканування підмережі хости не додаються)."""
+        return isinstance(self.worker, IPTestWorker) and self.worker.isRunning()
 
     def toggle_test(self):
         if self.worker is not None and self.worker.isRunning():
@@ -215,56 +400,199 @@ class IPTestTab(QWidget):
         elif self.worker is None:
             if self.ui.host_input.text().strip():
                 self.add_host_from_input()
-            addresses = []
+            addresses = self.ui.model.hosts()
             self.host_stats.clear()
-            for row in range(self.ui.table.rowCount()):
-                item = self.ui.table.item(row, 0)
-                if item:
-                    address = item.text()
-                    addresses.append(address)
-                    self.host_stats[address] = IPStat()
+            self.host_stats.add(addresses)
             if not addresses:
                 return
             self.set_start_button_style(True)
-            self.worker = IPTestWorker(addresses)
+            self.worker = IPTestWorker(addresses, batched=self.refresh_hz > 0, database=self._open_database(),
+                                       max_pps=self.max_pps, processes=self.processes)
             self.worker.result_ready.connect(self.update_row)
             self.worker.finished.connect(self.on_test_finished)
             self.worker.start()
+            if self.worker.results is not None:
+                self.refresh_timer.start()
+
+    def start_sweep(self):
+        """Сканує підмережу з поля вводу; нові адреси додаються в таблицю по мірі відповідей."""
+        if self.worker is not None:
+            CustomMessageBox.show_info(self, "Sweep", "Stop the running test before starting a sweep.")
+            return
+        network = self.ui.host_input.text().strip()
+        if not network:
+            CustomMessageBox.show_info(self, "Sweep", "Enter a subnet to sweep, e.g. 192.168.1.0/24.")
+            return
+        try:
+            total, targets = sweep_targets(network)
+        except ValueError as e:
+            CustomMessageBox.show_critical(self, "Sweep", f"Invalid subnet: {e}")
+            return
+        self.history_callback(network)
+        self.ui.host_input.clear()
+
+        # Статистика - лише по цьому скануванню; рядки з попередніх тестів лишаються
+        self.host_stats.clear()
+        self.set_start_button_style(True)
+        self.ui.sweep_btn.setEnabled(False)
+        self.worker = SubnetSweepWorker(network, targets, total, database=self._open_database(),
+                                        max_pps=self.max_pps)
+        self.worker.finished.connect(self.on_test_finished)
+        self.worker.start()
+        self._update_sweep_label()
+        self.ui.sweep_label.show()
+        # Без пакетного режиму таблиця все одно оновлюється таймером
+        if self.refresh_hz <= 0:
+            self.refresh_timer.setInterval(int(1000 / DEFAULT_REFRESH_HZ))
+        self.refresh_timer.start()
+
+    def _update_sweep_label(self, finished=False):
+        worker = self.worker
+        text = (f"{worker.network}: {worker.probed} / {worker.total} probed, "
+                f"{worker.alive} alive, {worker.probed - worker.alive} no reply")
+        if finished:
+            elapsed = time.monotonic() - worker.started_at if worker.started_at is not None else 0
+            text += f" — {'done' if worker.probed == worker.total else 'stopped'} in {elapsed:.0f} s"
+        else:
+            eta = worker.eta()
+            if eta is not None:
+                text += f" — ETA {int(eta) // 60}:{int(eta) % 60:02d}"
+        self.ui.sweep_label.setText(text)
+
+    def _open_database(self):
+        if self.database is None and self.db_path is not None:
+            try:
+                self.database = ResultDatabase(self.db_path, on_error=self.database_error.emit)
+            except Exception as e:
+                # Тест працює й без бази - лише без історії хостів
+                self.db_path = None
+                CustomMessageBox.show_warning(self, "Results Database",
+                                              f"Could not open the results database, history will not be saved:\n{e}")
+        return self.database
+
+    def on_database_error(self, message):
+        # Тест триває, але історія хостів неповна
+        CustomMessageBox.show_warning(self, "Results Database",
+                                      f"Could not save results to the history database:\n{message}")
+
+    def close_database(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker.wait()
+        if self.database is not None:
+            self.database.close()
+            self.database = None
+
+    def show_host_history(self, index):
+        """Подвійний клік по хосту: зведення за поточний тест і за всю збережену історію."""
+        row = index.row()
+        host = self.ui.model.cell_text(row, 0)
+        current = self.host_stats.summary(host)
+        database = self._open_database()
+        summary = database.host_summary(host) if database is not None else None
+        if summary is None and current is None:
+            CustomMessageBox.show_info(self, host, "No saved results for this host yet.")
+            return
+
+        def fmt(ns):
+            return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ns / 1e9)) if ns is not None else "—"
+
+        lines = []
+        if current is not None:
+            lines.append(f"This run: {current['sent']} probes, loss {current['loss_percent']:.1f}% "
+                         f"(last {DEFAULT_RECENT_PROBES}: {current['recent_loss_percent']:.0f}%)")
+            if current["received"]:
+                p95 = f", P95 {current['p95']:.1f} ms" if current["p95"] is not None else ""
+                lines.append(f"Latency min/avg/max: {current['min_rtt']:.1f} / {current['avg_rtt']:.1f} / "
+                             f"{current['max_rtt']:.1f} ms{p95}, jitter {current['jitter']:.1f} ms")
+            if current["consecutive_failures"]:
+                lines.append(f"Failed {current['consecutive_failures']} probes in a row")
+        if summary is not None:
+            if lines:
+                lines.append("")
+            lines.append(f"All history: {summary['sent']} probes, received: {summary['received']} "
+                         f"(loss {summary['loss_percent']:.1f}%)")
+            if summary["received"]:
+                lines.append(f"Latency min/avg/max: {summary['min_rtt']:.1f} / {summary['avg_rtt']:.1f} / "
+                             f"{summary['max_rtt']:.1f} ms")
+            lines.append(f"First seen: {fmt(summary['first_ns'])}")
+            lines.append(f"Last success: {fmt(summary['last_success_ns'])}")
+            if summary["failing_since_ns"] is not None:
+                lines.append(f"Failing since: {fmt(summary['failing_since_ns'])}")
+        CustomMessageBox.show_info(self, host, "\n".join(lines))
+
+    def drain_results(self, limit=DEFAULT_DRAIN_LIMIT):
+        if self.worker is not None and self.worker.results is not None:
+            if perf.enabled:
+                perf.gauge("ip_test.queue_depth", len(self.worker.results))
+            results = self.worker.results.drain(limit)
+            if isinstance(self.worker, SubnetSweepWorker):
+                self._add_sweep_rows(results)
+                self._update_sweep_label()
+            if results:
+                self.update_rows(results)
+
+    def _add_sweep_rows(self, results):
+        """Адреси підмережі потрапляють у таблицю лише тоді, коли по них є результат."""
+        new_hosts = [result["address"] for result in results if result["address"] not in self.host_stats]
+        if new_hosts:
+            self.ui.model.add_hosts(new_hosts)
+            self.host_stats.add(new_hosts)
 
     def update_row(self, result):
-        address = result["address"]
-        if address not in self.host_stats:
-            # Хост міг бути видалений, поки воркер ще працював
+        self.update_rows([result])
+
+    @perf.timed("ip_test.update_rows")
+    def update_rows(self, results):
+        """
+        Обробляє пакет результатів: статистика - векторно за всіма результатами,
+        таблиця - одним оновленням лише з останнім результатом кожного хоста.
+        """
+        if not results:
             return
-        self.ui.table.setSortingEnabled(False)
-        for row in range(self.ui.table.rowCount()):
-            if self.ui.table.item(row, 0).text() == address:
-                stat = self.host_stats[address]
-                stat.sent += 1
-                status_text = "Success"
-                latency_item = NumericTableWidgetItem("-")
-                if result.get("is_alive"):
-                    stat.received += 1
-                    latency_item.setText(f"{result['rtt']:.2f}")
-                else:
-                    status_text = result.get("status_text", "Failed")
-                status_item = QTableWidgetItem(status_text)
-                status_item.setForeground(QColor("#1D672D" if result.get("is_alive") else "#B3261E"))
-                loss_percent = (1 - stat.received / stat.sent) * 100 if stat.sent > 0 else 0
-                loss_item = NumericTableWidgetItem(f"{loss_percent:.1f}")
-                self.ui.table.setItem(row, 1, status_item)
-                self.ui.table.setItem(row, 2, latency_item)
-                self.ui.table.setItem(row, 3, loss_item)
-                for col in range(self.ui.table.columnCount()):
-                    if self.ui.table.item(row, col) and col > 0:
-                        self.ui.table.item(row, col).setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                break
-        current_sort_col = self.ui.table.horizontalHeader().sortIndicatorSection()
-        current_sort_order = self.ui.table.horizontalHeader().sortIndicatorOrder()
-        self.ui.table.sortItems(current_sort_col, current_sort_order)
-        self.ui.table.setSortingEnabled(True)
+        stats = self.host_stats
+        # -1 - хост видалено, поки воркер ще працював
+        ids = stats.ids([result["address"] for result in results])
+        alive = np.fromiter((bool(result.get("is_alive")) for result in results), dtype=bool, count=len(results))
+        rtt = np.fromiter((result.get("rtt") or 0.0 for result in results), dtype=np.float64, count=len(results))
+        stats.record(ids, alive, rtt)
+        known_ids = np.maximum(ids, 0)
+        loss = stats.loss_percent(known_ids).tolist()
+        # Джитер - None, поки хост не відповів жодного разу
+        jitters = [value if received else None
+                   for value, received in zip(stats.jitter(known_ids).tolist(), stats.received(known_ids).tolist())]
+
+        # Хост, що встиг відповісти кілька разів за пакет, показується за останньою перевіркою
+        latest = {}
+        for result, host_id, is_alive, loss_percent, jitter in zip(results, ids.tolist(), alive.tolist(), loss,
+                                                                   jitters):
+            if host_id >= 0:
+                latest[result["address"]] = (result, host_id, is_alive, loss_percent, jitter)
+
+        updates = []
+        for result, host_id, is_alive, loss_percent, jitter in latest.values():
+            latency = result['rtt'] if is_alive else None
+            status_text = "Success" if is_alive else result.get("status_text", "Failed")
+            sketch = stats.latency_stats(host_id)
+            if sketch is not None:
+                p50, p95, p99 = sketch.percentiles((50, 95, 99))
+            else:
+                p50 = p95 = p99 = None
+            updates.append((result["address"], status_text, is_alive, latency, loss_percent,
+                            result.get("next_probe_at"), result.get("backoff"), p50, p95, p99, jitter))
+        # Модель сама знаходить рядки за адресою; порядок рядків оновить resort_table()
+        self.ui.model.update_hosts(updates)
 
     def on_test_finished(self):
+        # Забираємо залишок результатів, що прийшли після останнього тіку
+        self.drain_results(limit=None)
+        self.refresh_timer.stop()
+        if isinstance(self.worker, SubnetSweepWorker):
+            self._update_sweep_label(finished=True)
+            self.ui.sweep_btn.setEnabled(True)
+            if self.worker.permission_denied:
+                CustomMessageBox.show_critical(self, "Permission Error",
+                                               "ICMP ping requires administrator privileges.")
         self.set_start_button_style(False)
         self.ui.start_btn.setEnabled(True)
         self.worker = None
@@ -303,28 +631,40 @@ class IPTestTab(QWidget):
         self.ui.start_btn.setFont(btn_font)
 
     def import_hosts(self):
+        if self.import_worker is not None and self.import_worker.isRunning():
+            return
         path, _ = QFileDialog.getOpenFileName(self, "Import Hosts", "", "Text Files (*.txt);;All Files (*)")
         if path:
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        address = line.strip()
-                        if address:
-                            self.history_callback(address)
-                            self._add_row(address)
-            except Exception as e:
-                print(f"Error importing file: {e}")
+            self.ui.import_btn.setEnabled(False)
+            self.import_worker = HostImportWorker(path, self.ui.model.hosts())
+            self.import_worker.done.connect(self.on_hosts_imported)
+            self.import_worker.failed.connect(lambda message: CustomMessageBox.show_critical(
+                self, "Import Error", f"Could not read file: {message}"))
+            self.import_worker.finished.connect(lambda: self.ui.import_btn.setEnabled(True))
+            self.import_worker.start()
+
+    @perf.timed("ip_test.import_hosts")
+    def on_hosts_imported(self, result):
+        """Усі нові хости - однією вставкою в модель і одним оновленням історії."""
+        added = self.ui.model.add_hosts(result.hosts)
+        if added:
+            if self._test_running():
+                self.worker.add_addresses(added)
+                self.host_stats.add(added)
+            self.history_callback(added)
+            current_backend().resolver.prefetch(added)
+        CustomMessageBox.show_info(self, "Import Finished", result.summary())
 
     def export_results(self):
+        if self.export_worker is not None and self.export_worker.isRunning():
+            CustomMessageBox.show_info(self, "Export", "An export is already in progress.")
+            return
         path, _ = QFileDialog.getSaveFileName(self, "Export Results", "ip_test_results.csv", "CSV Files (*.csv)")
         if path:
-            try:
-                with open(path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f, delimiter=';')
-                    writer.writerow(
-                        [self.ui.table.horizontalHeaderItem(i).text() for i in range(self.ui.table.columnCount())])
-                    for row in range(self.ui.table.rowCount()):
-                        writer.writerow(
-                            [self.ui.table.item(row, col).text() for col in range(self.ui.table.columnCount())])
-            except Exception as e:
-                print(f"Error exporting file: {e}")
\ No newline at end of file
+            # Порядок рядків - як у таблиці, з урахуванням змін після останнього resort():
+            # сортування знімка повторюється у потоці експорту
+            model = self.ui.model
+            snapshot = model.snapshot()
+            rows = snapshot_rows_text(snapshot, model.sort_column,
+                                      model.sort_order == Qt.SortOrder.DescendingOrder)
+            self.export_worker = start_csv_export(self, path, COLUMNS, rows, len(snapshot))
\ No newline at end of file
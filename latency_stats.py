@@ -0,0 +1,98 @@
+# latency_stats.py
+import math
+import numpy as np
+
+# Відносна похибка перцентилів за замовчуванням (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Межі затримки, що розрізняються (мс); менші й більші значення йдуть у крайні кошики,
+# тож кількість кошиків (і пам'ять) обмежена незалежно від кількості семплів
+MIN_TRACKED_MS = 0.001
+MAX_TRACKED_MS = 600_000
+# RFC 3550, 6.4.1: J += (|D| - J) / 16
+_JITTER_GAIN = 1 / 16
+# Старіші різниці впливають на джитер менше ніж на (15/16)^2048 - ними можна знехтувати
+_JITTER_TAIL = 2048
+
+
+class LatencyStats:
+    """
+    Потокові перцентилі та джитер з обмеженою пам'яттю.
+    Перцентилі - логарифмічні кошики (як у DDSketch): кошик i охоплює
+    (gamma^(i-1), gamma^i], а оцінка значення має відносну похибку не більше
+    relative_accuracy. Кошики зберігаються розріджено (dict), тож хост із
+    стабільною затримкою займає кілька десятків записів.
+    Джитер - міжпакетний джитер RFC 3550 за різницями RTT сусідніх відповідей.
+    record() коштує O(1); percentile() - O(k log k) від кількості непорожніх кошиків.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._min_index = self._index(MIN_TRACKED_MS)
+        self.clear()
+
+    def clear(self):
+        self._buckets = {}
+        self.count = 0
+        self.jitter = 0.0
+        self._last = None
+
+    def _index(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def record(self, latency):
+        """Додає одну відповідь (мс)."""
+        index = self._index(min(max(latency, MIN_TRACKED_MS), MAX_TRACKED_MS))
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        if self._last is not None:
+            self.jitter += (abs(latency - self._last) - self.jitter) * _JITTER_GAIN
+        self._last = latency
+
+    def record_many(self, latencies):
+        """Додає масив відповідей (мс) одним викликом; NaN (втрати) пропускаються."""
+        values = np.asarray(latencies, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        clipped = np.clip(values, MIN_TRACKED_MS, MAX_TRACKED_MS)
+        indexes, counts = np.unique(np.ceil(np.log(clipped) / self._log_gamma).astype(np.int64),
+                                    return_counts=True)
+        buckets = self._buckets
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+        self.count += len(values)
+
+        # Той самий рекурсивний фільтр джитера, але в замкненій формі по хвосту різниць
+        if self._last is not None:
+            values = np.concatenate(([self._last], values))
+        differences = np.abs(np.diff(values))[-_JITTER_TAIL:]
+        if len(differences):
+            decay = 1 - _JITTER_GAIN
+            weights = _JITTER_GAIN * decay ** np.arange(len(differences) - 1, -1, -1)
+            self.jitter = self.jitter * decay ** len(differences) + float(np.dot(weights, differences))
+        self._last = float(values[-1])
+
+    def percentiles(self, percents):
+        """Оцінки кількох перцентилів (мс) за один прохід; None, якщо відповідей ще не було."""
+        if not self.count:
+            return [None] * len(percents)
+        # Кошиків небагато, тож звичайний прохід швидший за numpy (IP Test питає на кожен результат)
+        ranks = sorted((max(1, math.ceil(percent / 100 * self.count)), position)
+                       for position, percent in enumerate(percents))
+        results = [None] * len(percents)
+        buckets = iter(sorted(self._buckets.items()))
+        index, cumulative_count = next(buckets)
+        for rank, position in ranks:
+            while cumulative_count < rank:
+                index, count = next(buckets)
+                cumulative_count += count
+            if index <= self._min_index:
+                results[position] = MIN_TRACKED_MS
+            else:
+                # Середина кошика з найменшою відносною похибкою
+                results[position] = 2 * self.gamma ** index / (self.gamma + 1)
+        return results
+
+    def percentile(self, percent):
+        return self.percentiles([percent])[0]
\ No newline at end of file
@@ -1,14 +1,19 @@
 # main.py
+import multiprocessing
 import sys
 # --- Змінено цей рядок ---
 from PyQt6.QtWidgets import QApplication, QWidget, QCompleter
 from PyQt6.QtCore import Qt, QStringListModel
+from PyQt6.QtGui import QKeySequence, QShortcut
 
 # --- Нові імпорти ---
 from custom_navbar import CustomNavBar  # Імпортуємо логіку
 from ping_tab import PingTab
 from table_tab import TableTab
 from ip_test_tab import IPTestTab
+from probe_engine import current_backend
+from perf_monitor import perf
+from perf_overlay import PerfOverlay
 from ui import Ui_MainWindow           # Імпортуємо UI головного вікна
 
 MAX_HISTORY_ITEMS = 100
@@ -42,22 +47,43 @@ class MainWindow(QWidget):
 
         # З'єднання сигналів між сторінками
         self.ping_widget.ping_started.connect(self.table_widget.clear_table)
-        self.ping_widget.new_ping_result.connect(self.table_widget.add_ping_result)
+        self.ping_widget.new_ping_results.connect(self.table_widget.add_ping_results)
         self.table_widget.toggle_ping_requested.connect(self.ping_widget.toggle_ping)
         self.ping_widget.ping_status_changed.connect(self.table_widget.update_toggle_button_style)
 
-    def add_to_history(self, item):
-        item = item.strip().lower()
-        if item:
-            if item in self.history:
-                self.history.remove(item)
-            self.history.insert(0, item)
-            if len(self.history) > MAX_HISTORY_ITEMS:
-                self.history = self.history[:MAX_HISTORY_ITEMS]
-            self.history_model.setStringList(self.history)
+        # Оверлей лічильників продуктивності (F12); поки схований, збір вимкнено
+        self.perf_overlay = PerfOverlay(self)
+        self.perf_shortcut = QShortcut(QKeySequence("F12"), self)
+        self.perf_shortcut.activated.connect(self.perf_overlay.toggle)
+
+    def closeEvent(self, event):
+        # Зупиняємо пінг і тест, щоб сесія та історія були дописані на диск
+        self.ping_widget.stop_ping_keep_data()
+        self.ip_test_widget.close_database()
+        super().closeEvent(event)
+
+    @perf.timed("main.add_to_history")
+    def add_to_history(self, items):
+        """Один запис або цілий список (імпорт); модель комплітера оновлюється один раз."""
+        if isinstance(items, str):
+            items = [items]
+        # Зі списку в історії все одно лишаться лише останні MAX_HISTORY_ITEMS
+        for item in items[-MAX_HISTORY_ITEMS:]:
+            item = item.strip().lower()
+            if item:
+                if item in self.history:
+                    self.history.remove(item)
+                self.history.insert(0, item)
+        if len(self.history) > MAX_HISTORY_ITEMS:
+            self.history = self.history[:MAX_HISTORY_ITEMS]
+        self.history_model.setStringList(self.history)
 
 
 if __name__ == "__main__":
+    # Процеси-шарди IP Test (spawn) у зібраному .exe
+    multiprocessing.freeze_support()
+    # Некоректний PING_TOOL_BACKEND - помилка одразу, а не в потоці воркера
+    current_backend()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,151 @@
+# perf_monitor.py
+"""
+Вбудовані лічильники продуктивності гарячих шляхів: тривалість етапів (гістограми
+на LatencyStats) і поточні значення (глибина черг, RSS). Поки збір вимкнено,
+кожна точка виміру коштує одну перевірку perf.enabled, тож інструментація
+лишається в коді завжди. Модуль не імпортує Qt; оверлей - у perf_overlay.py.
+Процеси-шарди IP Test мають власний (вимкнений) perf - їхні сокети тут не видно.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from latency_stats import LatencyStats
+
+
+class _Stage:
+    __slots__ = ("count", "total", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = LatencyStats()
+
+
+class PerfMonitor:
+    """
+    Один на процес (perf). record() - тривалість етапу в секундах, gauge() - значення
+    з максимумом, timed() - декоратор для обробників. Потокобезпечний: етапи рушія
+    пінгу пишуться з потоків воркерів.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, enabled=True):
+        """Вмикає/вимикає збір; увімкнення починає вимірювання з нуля."""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._gauges = {}
+            self.started_at = time.monotonic()
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        milliseconds = seconds * 1000
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _Stage()
+            stats.count += 1
+            stats.total += milliseconds
+            stats.max = max(stats.max, milliseconds)
+            stats.histogram.record(milliseconds)
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            _, peak = self._gauges.get(name, (value, value))
+            self._gauges[name] = (value, max(peak, value))
+
+    def timed(self, stage):
+        """Декоратор: тривалість кожного виклику йде в етап stage (коли збір увімкнено)."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """{"uptime_s", "stages": {етап: count/per_s/total_ms/mean/p50/p95/p99/max}, "gauges": {...}}."""
+        with self._lock:
+            uptime = max(time.monotonic() - self.started_at, 1e-9)
+            stages = {}
+            for name, stats in self._stages.items():
+                # Середина кошика гістограми може трохи перевищити справжній максимум
+                p50, p95, p99 = (min(value, stats.max) for value in stats.histogram.percentiles((50, 95, 99)))
+                stages[name] = {
+                    "count": stats.count,
+                    "per_s": stats.count / uptime,
+                    "total_ms": stats.total,
+                    "mean_ms": stats.total / stats.count,
+                    "p50_ms": p50,
+                    "p95_ms": p95,
+                    "p99_ms": p99,
+                    "max_ms": stats.max,
+                }
+            gauges = {name: {"value": value, "max": peak} for name, (value, peak) in self._gauges.items()}
+        return {"uptime_s": uptime, "stages": stages, "gauges": gauges}
+
+    def dump(self, path):
+        """Пише знімок у JSON (разом із часом і платформою)."""
+        report = dict(self.snapshot(), created=time.strftime("%Y-%m-%d %H:%M:%S"), platform=sys.platform)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+def process_rss_bytes():
+    """Поточний RSS процесу в байтах, або None, якщо платформа його не дає."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", 'r') as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    # macOS: лише пік (у байтах), поточного RSS без сторонніх бібліотек немає
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# Один монітор на процес
+perf = PerfMonitor()
\ No newline at end of file
@@ -0,0 +1,117 @@
+# perf_overlay.py
+import time
+from PyQt6.QtWidgets import QWidget, QFileDialog
+from PyQt6.QtCore import Qt, QTimer, QEvent
+
+from perf_monitor import perf, process_rss_bytes
+from custom_dialogs import CustomMessageBox
+from ui import Ui_PerfOverlay
+
+# Як часто оновлюється текст оверлею та знімається RSS (мс)
+REFRESH_INTERVAL_MS = 500
+# Такт виміру часу кадру: ~60 Гц. Інтервал між тактами понад нього - час,
+# коли цикл подій GUI був зайнятий (обробники, перемальовування таблиць і графіка)
+FRAME_INTERVAL_MS = 16
+# Відступ від правого верхнього кута вікна (px)
+MARGIN = 12
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def format_snapshot(snapshot):
+    """Текст оверлею: етапи (частота, p50/p95/p99/max у мс) і поточні значення."""
+    lines = [f"{'stage':<22}{'n/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}"]
+    for name, stage in sorted(snapshot["stages"].items()):
+        lines.append(f"{name:<22}{stage['per_s']:>8.1f}{_ms(stage['p50_ms']):>8}{_ms(stage['p95_ms']):>8}"
+                     f"{_ms(stage['p99_ms']):>8}{_ms(stage['max_ms']):>9}")
+    if snapshot["gauges"]:
+        lines.append("")
+        lines.append(f"{'gauge':<22}{'value':>16}{'max':>17}")
+        for name, gauge in sorted(snapshot["gauges"].items()):
+            lines.append(f"{name:<22}{gauge['value']:>16.0f}{gauge['max']:>17.0f}")
+    lines.append("")
+    lines.append(f"uptime {snapshot['uptime_s']:.0f} s")
+    return "\n".join(lines)
+
+
+class PerfOverlay(QWidget):
+    """
+    Панель лічильників perf у правому верхньому куті вікна (F12).
+    Поки панель показана, збір увімкнено; схована - perf вимкнений і
+    інструментація нічого не коштує.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.ui = Ui_PerfOverlay()
+        self.ui.setupUi(self)
+        self.hide()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self.frame_timer.timeout.connect(self._frame_tick)
+        self._last_frame = None
+
+        self.ui.save_btn.clicked.connect(self.save_report)
+        self.ui.reset_btn.clicked.connect(self.reset)
+        self.ui.close_btn.clicked.connect(self.toggle)
+        # Тримаємось правого верхнього кута при зміні розміру вікна
+        parent.installEventFilter(self)
+
+    def toggle(self):
+        # Збір вмикається тут, а не в showEvent: згортання вікна не має скидати лічильники
+        if self.isVisible():
+            self.frame_timer.stop()
+            self.refresh_timer.stop()
+            perf.enable(False)
+            self.hide()
+        else:
+            perf.enable(True)
+            self._last_frame = None
+            self.frame_timer.start()
+            self.refresh_timer.start()
+            self.show()
+            self.refresh()
+
+    def eventFilter(self, obj, event):
+        if obj is self.parent() and event.type() == QEvent.Type.Resize and self.isVisible():
+            self._place()
+        return super().eventFilter(obj, event)
+
+    def _place(self):
+        self.adjustSize()
+        self.move(self.parent().width() - self.width() - MARGIN, MARGIN)
+        self.raise_()
+
+    def _frame_tick(self):
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            perf.record("gui.frame", now - self._last_frame)
+        self._last_frame = now
+
+    def refresh(self):
+        rss = process_rss_bytes()
+        if rss is not None:
+            perf.gauge("process.rss_mb", rss / 2 ** 20)
+        self.ui.text.setText(format_snapshot(perf.snapshot()))
+        self._place()
+
+    def reset(self):
+        perf.reset()
+        self._last_frame = None
+        self.refresh()
+
+    def save_report(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save performance counters", "perf_report.json",
+                                              "JSON Files (*.json)")
+        if path:
+            try:
+                perf.dump(path)
+            except OSError as e:
+                CustomMessageBox.show_critical(self, "Save Error", f"Could not save the report:\n{e}")
\ No newline at end of file
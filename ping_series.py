@@ -0,0 +1,176 @@
+# ping_series.py
+import math
+import numpy as np
+from latency_stats import LatencyStats
+
+# Початкова місткість буферів (зростає вдвічі за потреби)
+INITIAL_CAPACITY = 4096
+
+
+class GrowableArray:
+    """Попередньо виділений NumPy-масив з амортизованим O(1) додаванням."""
+    __slots__ = ("_data", "_size")
+
+    def __init__(self, dtype, capacity=INITIAL_CAPACITY):
+        self._data = np.empty(max(1, capacity), dtype=dtype)
+        self._size = 0
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            capacity = len(self._data)
+            while capacity < size:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def append(self, value):
+        if self._size == len(self._data):
+            self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        count = len(values)
+        self._reserve(self._size + count)
+        self._data[self._size:self._size + count] = values
+        self._size += count
+
+    @property
+    def view(self):
+        """Представлення заповненої частини (без копіювання)."""
+        return self._data[:self._size]
+
+    def clear(self):
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+
+class PingSeries:
+    """
+    Часовий ряд пінгу одного хоста: мітки часу (int64, нс), затримка
+    (float32, NaN для втрат), маска втрат та запізнення відправки (float32, мс). Лічильники та min/max/mean/variance
+    оновлюються інкрементально (алгоритм Велфорда), тож кожен семпл коштує O(1).
+    Перцентилі та джитер - у latency_stats (LatencyStats), без сортування всього ряду.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._times = GrowableArray(np.int64, capacity)
+        self._latency = GrowableArray(np.float32, capacity)
+        self._lost = GrowableArray(np.bool_, capacity)
+        self._lateness = GrowableArray(np.float32, capacity)
+        # Збільшується при кожному clear(), щоб кеші знали, що дані скинуто
+        self.generation = 0
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.received = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.latency_stats = LatencyStats()
+
+    def clear(self):
+        for array in (self._times, self._latency, self._lost, self._lateness):
+            array.clear()
+        self.generation += 1
+        self._reset_stats()
+
+    def append(self, timestamp_ns, latency, lateness_ms=0.0):
+        """Додає семпл; latency=None означає втрачений пакет."""
+        self._times.append(timestamp_ns)
+        self._lateness.append(lateness_ms)
+        if latency is None:
+            self._latency.append(np.nan)
+            self._lost.append(True)
+            return
+
+        self._latency.append(latency)
+        self._lost.append(False)
+
+        self.received += 1
+        self.latency_stats.record(latency)
+        if latency < self.min:
+            self.min = latency
+        if latency > self.max:
+            self.max = latency
+        delta = latency - self.mean
+        self.mean += delta / self.received
+        self._m2 += delta * (latency - self.mean)
+
+    def extend(self, timestamps_ns, latency, lateness_ms):
+        """
+        Додає масив семплів одним викликом (NaN у latency - втрати).
+        Статистика блоку зливається з накопиченою за формулою Чана.
+        """
+        latency = np.asarray(latency, dtype=np.float32)
+        lost = np.isnan(latency)
+        self._times.extend(timestamps_ns)
+        self._latency.extend(latency)
+        self._lost.extend(lost)
+        self._lateness.extend(lateness_ms)
+
+        ok = latency[~lost].astype(np.float64)
+        if not len(ok):
+            return
+        self.latency_stats.record_many(ok)
+        count = len(ok)
+        mean = float(ok.mean())
+        total = self.received + count
+        delta = mean - self.mean
+        self._m2 += float(((ok - mean) ** 2).sum()) + delta * delta * self.received * count / total
+        self.mean += delta * count / total
+        self.received = total
+        self.min = min(self.min, float(ok.min()))
+        self.max = max(self.max, float(ok.max()))
+
+    # --- Статистика ---
+    @property
+    def sent(self):
+        return len(self._times)
+
+    @property
+    def lost_count(self):
+        return self.sent - self.received
+
+    @property
+    def loss_percent(self):
+        return (self.lost_count / self.sent) * 100 if self.sent > 0 else 0
+
+    @property
+    def variance(self):
+        return self._m2 / (self.received - 1) if self.received > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def percentiles(self, percents=(50, 95, 99)):
+        return self.latency_stats.percentiles(percents)
+
+    @property
+    def jitter(self):
+        return self.latency_stats.jitter
+
+    # --- Дані (представлення без копіювання) ---
+    @property
+    def times(self):
+        return self._times.view
+
+    @property
+    def latency(self):
+        return self._latency.view
+
+    @property
+    def lost(self):
+        return self._lost.view
+
+    @property
+    def lateness(self):
+        return self._lateness.view
+
+    def __len__(self):
+        return len(self._times)
\ No newline at end of file
@@ -1,105 +1,136 @@
 # ping_tab.py
+import asyncio
+import re
 import time
-import socket
-import csv
 import numpy as np
 from PyQt6.QtWidgets import QWidget, QFileDialog
 from PyQt6.QtGui import QColor, QFont
-from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QThread, QTimer
 from PyQt6.QtMultimedia import QSoundEffect
-from ping3 import ping, errors as ping_errors
+from probe_engine import (AsyncProbeEngine, FixedRateScheduler, ping_record,
+                          DEFAULT_MIN_TIMEOUT, DEFAULT_MAX_TIMEOUT)
 from custom_dialogs import CustomMessageBox
+from result_queue import ResultQueue, DEFAULT_REFRESH_HZ, DEFAULT_DRAIN_LIMIT
+from ping_series import PingSeries
+from plot_lod import SeriesDecimator
+from session_store import (SessionWriter, read_session, session_results, new_session_path, local_times,
+                           DEFAULT_SESSION_DIR, SESSION_EXTENSION)
+from history_model import DEFAULT_HISTORY_ROWS
+from perf_monitor import perf
+from export_worker import start_csv_export, EXPORT_CHUNK_ROWS
 import qtawesome as qta
 # pyqtgraph імпортується в ui.py
 
 # --- Новий імпорт ---
 from ui import Ui_PingTab
 
+# Мінімальна кількість точок графіка, якщо ширину ще не відомо
+MIN_PLOT_POINTS = 400
+# Інтервал між запитами (мс); підтримуються значення до 10 мс
+DEFAULT_INTERVAL_MS = 1000
+# Кольори кривих хостів (перший - основний колір застосунку)
+HOST_COLORS = ["#6750A4", "#00897B", "#E65100", "#1E88E5", "#C2185B", "#7CB342", "#6D4C41", "#546E7A"]
 
-# --- Клас-воркер (ЛОГІКА) залишається без змін ---
+
+def _graph_csv_rows(columns, chunk_size=EXPORT_CHUNK_ROWS):
+    """Рядки CSV графіка з копій буферів (виконується в потоці експорту, блоками)."""
+    for host, times, latency, lateness in columns:
+        for start in range(0, len(times), chunk_size):
+            stop = start + chunk_size
+            time_strs = local_times(times[start:stop], with_ms=True, with_date=True)
+            for time_str, latency_ms, lateness_ms in zip(time_strs, latency[start:stop].tolist(),
+                                                         lateness[start:stop].tolist()):
+                latency_str = f"{latency_ms:.1f}" if latency_ms == latency_ms else "Failed"  # NaN - втрата
+                yield [host, f"'{time_str}", latency_str, f"{lateness_ms:.1f}"]
+
+
+def split_hosts(text):
+    """Кілька хостів в одному полі: через кому, крапку з комою або пробіл."""
+    return list(dict.fromkeys(host for host in re.split(r"[,;\s]+", text) if host))
+
+
+# --- Клас-воркер (ЛОГІКА) ---
 class PingWorker(QThread):
+    """
+    Один потік і один ICMP-сокет на всі хости вкладки: для кожного хоста
+    працює свій FixedRateScheduler у спільному циклі asyncio.
+    """
     result_ready = pyqtSignal(dict)
     permission_error = pyqtSignal()
 
-    def __init__(self, host):
+    def __init__(self, hosts, batched=False, interval_ms=DEFAULT_INTERVAL_MS, timeout=2,
+                 min_timeout=DEFAULT_MIN_TIMEOUT, max_timeout=DEFAULT_MAX_TIMEOUT):
         super().__init__()
-        self.host = host
+        self.hosts = [hosts] if isinstance(hosts, str) else list(hosts)
+        self.interval_ms = interval_ms
+        # timeout - лише до першої відповіді; далі таймаут кожного хоста рахується з його RTT
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
         self._is_running = True
-        self.seq = 0
+        # У пакетному режимі результати складаються в чергу замість сигналів
+        self.results = ResultQueue() if batched else None
 
+    # --- Запити йдуть за фіксованим розкладом, незалежно від часу відповіді ---
     def run(self):
-        while self._is_running:
-            self.seq += 1
-            current_time = time.strftime("%H:%M:%S")
-            delay = None
-            status = "Failed"  # Встановлюємо за замовчуванням
-            error_message = ""
-
-            try:
-                delay = ping(self.host, timeout=2, unit="ms")
-
-                # ping() повертає None або False при помилці (напр. timeout)
-                if delay is None or delay is False or delay <= 0:
-                    delay = -1
-                    # error_message тут не потрібен, статус "Failed" це вже показує
-                else:
-                    status = "Success"
-                    delay = round(delay, 1)
-
-            # --- Покращена обробка винятків ---
-
-            # Конкретна помилка: хост не знайдено (DNS-помилка)
-            except (socket.gaierror, ping_errors.HostUnknown):
-                error_message = "Host not found. Check DNS or network."
-                delay = -1
-
-            # Конкретна помилка: немає прав адміністратора
-            except ping_errors.PermissionError:
-                error_message = "ICMP ping requires administrator privileges."
-                delay = -1
-                self.permission_error.emit()
-                self._is_running = False  # Зупиняємо воркер
-
-            # Інші відомі помилки бібліотеки ping3
-            except ping_errors.PingError as e:
-                error_message = f"Ping error: {e}"
-                delay = -1
-
-            # Загальний обробник для НЕОЧІКУВАНИХ помилок
-            except Exception as e:
-                error_message = f"An unexpected error occurred: {e}"
-                delay = -1
-                # Важливо вивести цю помилку в консоль, щоб ви її побачили!
-                print(f"[PingWorker Error] Host: {self.host}, Error: {e}")
-
-                # --- Кінець обробки ---
-
-            if not self._is_running:
-                break
-
-            result_data = {
-                "seq": self.seq,
-                "host": self.host,
-                "time": current_time,
-                "delay": delay,
-                "status": status,
-                "error_message": error_message
-            }
-            self.result_ready.emit(result_data)
+        asyncio.run(self._run())
+
+    async def _run(self):
+        async with AsyncProbeEngine(timeout=self.timeout, min_timeout=self.min_timeout,
+                                    max_timeout=self.max_timeout) as engine:
+            await engine.prepare(self.hosts)
+            schedulers = [
+                FixedRateScheduler(engine, host, self.interval_ms / 1000,
+                                   lambda *args, host=host: self._on_probe_result(host, *args),
+                                   lambda: self._is_running)
+                for host in self.hosts
+            ]
+            await asyncio.gather(*(scheduler.run() for scheduler in schedulers))
+
+    def _on_probe_result(self, host, seq, result, sent_at_ns, lateness_ms):
+        # Конкретна помилка: немає прав адміністратора
+        if result["status_text"] == "Permission Error":
+            self.permission_error.emit()
+            self._is_running = False  # Зупиняємо воркер
+            return
+        self._publish(ping_record(host, seq, result, sent_at_ns, lateness_ms, self.interval_ms))
 
-            if self._is_running:
-                self.msleep(1000)
+    def _publish(self, result_data):
+        if self.results is not None:
+            self.results.put(result_data)
+        else:
+            self.result_ready.emit(result_data)
 
     def stop(self):
         self._is_running = False
 
 
+class _HostTrace:
+    """Усе, що вкладка тримає для одного хоста: семпли, LOD-кеш, криві та мітки статистики."""
+
+    def __init__(self, host, color, items, stat_labels=None):
+        self.host = host
+        self.color = color
+        self.series = PingSeries()
+        self.decimator = SeriesDecimator(self.series)
+        self.line, self.scatter_success, self.scatter_loss = items
+        self.stat_labels = stat_labels
+
+    @property
+    def items(self):
+        return (self.line, self.scatter_success, self.scatter_loss)
+
+
 class PingTab(QWidget):
-    new_ping_result = pyqtSignal(dict)
+    # object, а не list: пакет передається без конвертації у QVariantList
+    new_ping_results = pyqtSignal(object)
     ping_started = pyqtSignal()
     ping_status_changed = pyqtSignal(bool)
+    # Помилка запису сесії з фонового потоку SessionWriter
+    session_error = pyqtSignal(str)
 
-    def __init__(self, history_callback, completer):
+    def __init__(self, history_callback, completer, refresh_hz=DEFAULT_REFRESH_HZ,
+                 interval_ms=DEFAULT_INTERVAL_MS, session_dir=DEFAULT_SESSION_DIR):
         super().__init__()
 
         # Створюємо UI
@@ -111,16 +142,26 @@ class PingTab(QWidget):
         self.is_running = False
         self.sound_enabled = False
         self.is_live_view = True
+        self.interval_ms = interval_ms
 
         self.sound_effect = QSoundEffect()
         self.sound_effect.setSource(QUrl.fromLocalFile("loss.wav"))
         self.sound_effect.setVolume(1.0)
 
-        self.full_pings = []
-        self.full_times = []
-        self.sent = 0
-        self.received = 0
+        # По одному буферу та кривій на хост; статистика рахується інкрементально
+        self.traces = {}
         self.worker = None
+        # Кожна сесія безперервно пишеться на диск (session_dir=None - не писати)
+        self.session_dir = session_dir
+        self.session_writer = None
+        self.export_worker = None
+
+        # Таймер, що забирає накопичені результати воркера пакетами
+        self.refresh_hz = refresh_hz
+        self.refresh_timer = QTimer(self)
+        if refresh_hz > 0:
+            self.refresh_timer.setInterval(int(1000 / refresh_hz))
+        self.refresh_timer.timeout.connect(self.drain_results)
 
         # Встановлюємо початковий стиль кнопки
         self.ui.btn.setStyleSheet(self.btn_style("#6750A4"))
@@ -132,6 +173,8 @@ class PingTab(QWidget):
         self.ui.sound_btn.clicked.connect(self.toggle_sound)
         self.ui.export_data_btn.clicked.connect(self.export_graph_data)
         self.ui.export_btn.clicked.connect(self.export_screenshot)
+        self.ui.open_session_btn.clicked.connect(self.open_session)
+        self.session_error.connect(self.on_session_error)
 
         self.ui.btn.clicked.connect(self.toggle_ping)
 
@@ -140,12 +183,17 @@ class PingTab(QWidget):
         self.ui.btn_100.clicked.connect(lambda: self.set_view_mode(100))
         self.ui.all_btn.clicked.connect(lambda: self.set_view_mode('all'))
 
+        # Графік перемальовується лише для видимого діапазону X
+        # Лямбда відкидає аргументи сигналу: обгортка perf.timed приймає *args, тож PyQt їх не обрізає
+        self.ui.chart.getViewBox().sigXRangeChanged.connect(lambda *_: self.refresh_plot())
+
     def stop_ping_keep_data(self):
         """Останавливает тест, но не очищает график и статистику"""
         if self.is_running:
             self.is_running = False
             if self.worker:
                 self.worker.stop()
+            self._stop_recording()
             self.ui.btn.setText("Start Ping")
             self.ui.btn.setStyleSheet(self.btn_style("#6750A4"))
             self.ping_status_changed.emit(False)
@@ -164,7 +212,7 @@ class PingTab(QWidget):
                 btn.setChecked(False)
         sender.setChecked(True)
 
-        total_points = len(self.full_pings)
+        total_points = self._total_points()
         if not self.is_running and total_points == 0: return
 
         self.ui.chart.enableAutoRange(axis='y')
@@ -175,81 +223,207 @@ class PingTab(QWidget):
         elif mode == 100:
             self.ui.chart.setXRange(max(0, total_points - 100), total_points)
         elif mode == 'all':
-            self.ui.chart.autoRange()
+            # autoRange() бачив би лише вже намальовані (проріджені) точки
+            self.ui.chart.setXRange(0, total_points)
 
     def show_status_message(self, message):
         self.ui.status_icon.setPixmap(qta.icon("fa5s.exclamation-triangle", color="#FFA000").pixmap(16, 16))
         self.ui.status_text.setText(message)
         self.ui.status_frame.show()
 
+    def drain_results(self, limit=DEFAULT_DRAIN_LIMIT):
+        if self.worker is not None and self.worker.results is not None:
+            if perf.enabled:
+                perf.gauge("ping.queue_depth", len(self.worker.results))
+            results = self.worker.results.drain(limit)
+            if results:
+                self.handle_ping_results(results)
+
     def handle_ping_result(self, result_data):
+        self.handle_ping_results([result_data])
+
+    @perf.timed("ping.handle_results")
+    def handle_ping_results(self, results):
+        """Обробляє пакет результатів: одне оновлення міток, статистики та графіка."""
         if not self.is_running:
             return
 
-        delay = result_data["delay"]
+        any_failed = False
+        max_lateness_ms = 0.0
+        accepted = []
+        for result_data in results:
+            trace = self.traces.get(result_data["host"])
+            if trace is None:
+                continue
+            accepted.append(result_data)
+            lateness_ms = result_data.get("lateness_ms", 0.0)
+            max_lateness_ms = max(max_lateness_ms, lateness_ms)
+            timestamp_ns = result_data.get("timestamp_ns") or time.time_ns()
+            if result_data["status"] == "Failed":
+                any_failed = True
+                trace.series.append(timestamp_ns, None, lateness_ms)
+            else:
+                trace.series.append(timestamp_ns, result_data["delay"], lateness_ms)
+        if self.session_writer is not None:
+            self.session_writer.append(accepted)
+
+        # Мітки показують лише останній результат пакета
+        result_data = results[-1]
         error_message = result_data["error_message"]
-
         if error_message and "Permission" not in error_message:
             self.show_status_message(error_message)
+        elif max_lateness_ms > self.interval_ms / 2:
+            # Запити відправляються із запізненням - вузьке місце на цій машині
+            self.show_status_message(f"Probes are running {max_lateness_ms:.0f} ms late. This computer is overloaded.")
         else:
             self.ui.status_frame.hide()
 
+        prefix = f"{result_data['host']}: " if len(self.traces) > 1 else ""
         if result_data["status"] == "Failed":
-            if self.sound_enabled: self.sound_effect.play()
             self.ui.result_icon.setPixmap(qta.icon("mdi.close-circle", color="#B3261E").pixmap(24, 24))
-            self.ui.result_text.setText("Request timed out")
+            self.ui.result_text.setText(f"{prefix}Request timed out")
             self.ui.result_text.setStyleSheet("color: #B3261E;")
-            self.full_pings.append(np.nan)
         else:
             self.ui.result_icon.setPixmap(qta.icon("mdi.check-circle", color="#6750A4").pixmap(24, 24))
-            self.ui.result_text.setText(f"{delay} ms")
+            self.ui.result_text.setText(f"{prefix}{result_data['delay']} ms")
             self.ui.result_text.setStyleSheet("color: #6750A4;")
-            self.received += 1
-            self.full_pings.append(delay)
+        if any_failed and self.sound_enabled:
+            self.sound_effect.play()
 
-        self.sent = result_data["seq"]
-        self.new_ping_result.emit(result_data)
-        self.full_times.append(time.time())
+        self.new_ping_results.emit(results)
         self.update_stats()
 
     def handle_permission_error(self):
         self.stop_ping_keep_data()
         CustomMessageBox.show_critical(self, "Permission Error",
-                                       "ICMP ping requires administrator privileges. Please restart as administrator.")
+                                       "ICMP ping requires administrator privileges. Please restart as administrator "
+                                       "(on Linux you can allow unprivileged ICMP via net.ipv4.ping_group_range).")
 
     def on_worker_finished(self):
+        if self.sender() is not self.worker:
+            return  # Завершився попередній воркер, поточний ще працює
+        # Забираємо залишок результатів, що прийшли після останнього тіку
+        self.drain_results(limit=None)
+        self.refresh_timer.stop()
         self.worker = None
         if self.is_running:
             self.stop_ping_keep_data()
 
     def toggle_ping(self):
         if not self.is_running:
-            host = self.ui.input.text().strip() or self.ui.input.placeholderText()
-            if not host:
+            text = self.ui.input.text().strip() or self.ui.input.placeholderText()
+            hosts = split_hosts(text)
+            if not hosts:
                 CustomMessageBox.show_warning(self, "Attention", "Please enter a host to ping.")
                 return
 
-            self.history_callback(host)
-            self.reset_stats()
+            self.history_callback(text)
+            self.reset_stats(hosts)
+            self._start_recording(hosts)
             self.ping_started.emit()
             self.is_running = True
             self.ui.btn.setText("Stop Ping")
             self.ui.btn.setStyleSheet(self.btn_style("#B3261E"))
             self.ping_status_changed.emit(True)
 
-            self.worker = PingWorker(host)
+            self.worker = PingWorker(hosts, batched=self.refresh_hz > 0, interval_ms=self.interval_ms)
             self.worker.result_ready.connect(self.handle_ping_result)
             self.worker.permission_error.connect(self.handle_permission_error)
             self.worker.finished.connect(self.on_worker_finished)
             self.worker.start()
+            if self.worker.results is not None:
+                self.refresh_timer.start()
         else:
             self.stop_ping_keep_data()
 
-    def reset_stats(self):
-        self.full_pings.clear()
-        self.full_times.clear()
-        self.sent = 0
-        self.received = 0
+    def _start_recording(self, hosts):
+        if self.session_dir is None:
+            return
+        try:
+            self.session_writer = SessionWriter(new_session_path(self.session_dir), hosts, self.interval_ms,
+                                                on_error=self.session_error.emit)
+        except (OSError, ValueError) as e:
+            self.on_session_error(str(e))
+
+    def on_session_error(self, message):
+        # Пінг триває, лише без запису на диск
+        CustomMessageBox.show_warning(self, "Session Error",
+                                      f"Could not write the session file, recording stopped:\n{message}")
+
+    def _stop_recording(self):
+        if self.session_writer is not None:
+            self.session_writer.close()
+            self.session_writer = None
+
+    def open_session(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Session", self.session_dir or "",
+                                              f"Ping Sessions (*{SESSION_EXTENSION});;All Files (*)")
+        if not path:
+            return
+        try:
+            meta, records = read_session(path)
+        except (OSError, ValueError) as e:
+            CustomMessageBox.show_critical(self, "Open Error", f"Could not open session: {e}")
+            return
+        self.stop_ping_keep_data()
+        self.load_session(meta, records)
+
+    def load_session(self, meta, records):
+        """Показує збережену сесію: записи беруться прямо з memmap, без розбору тексту."""
+        hosts = meta["hosts"]
+        self.reset_stats(hosts)
+        self.ui.input.setText(", ".join(hosts))
+        for host_id, trace in enumerate(self.traces.values()):
+            selected = records if len(hosts) == 1 else records[records["host_id"] == host_id]
+            trace.series.extend(selected["timestamp_ns"], selected["latency"], selected["lateness"])
+
+        # Таблиця History отримує останні рядки сесії
+        self.ping_started.emit()
+        tail = records[-DEFAULT_HISTORY_ROWS:]
+        if len(tail):
+            self.new_ping_results.emit(session_results(meta, tail))
+
+        self.is_live_view = False
+        for btn in self.view_buttons:
+            btn.setChecked(btn is self.ui.all_btn)
+        self.update_stats()
+        self.ui.chart.enableAutoRange(axis='y')
+        self.ui.chart.setXRange(0, self._total_points())
+
+    def _total_points(self):
+        return max((len(trace.series) for trace in self.traces.values()), default=0)
+
+    def _setup_traces(self, hosts):
+        """Перший хост малюється основними кривими з ui, решта отримують власні."""
+        for trace in list(self.traces.values())[1:]:
+            self.ui.remove_host_curves(trace.items)
+        self.ui.clear_host_rows()
+        self.ui.legend.clear()
+        self.traces = {}
+
+        multi = len(hosts) > 1
+        for index, host in enumerate(hosts):
+            color = HOST_COLORS[index % len(HOST_COLORS)]
+            if index == 0:
+                items = (self.ui.plot_line, self.ui.plot_scatter_success, self.ui.plot_scatter_loss)
+            else:
+                items = self.ui.add_host_curves(color)
+            trace = _HostTrace(host, color, items, self.ui.add_host_row(host, color) if multi else None)
+            # Коли хостів кілька, втрати позначаються кольором хоста
+            trace.scatter_loss.setPen(color if multi else 'r')
+            if multi:
+                self.ui.legend.addItem(trace.line, host)
+            self.traces[host] = trace
+
+        self.ui.legend.setVisible(multi)
+        self.ui.stats_frame.setVisible(not multi)
+        self.ui.hosts_frame.setVisible(multi)
+
+    def reset_stats(self, hosts=None):
+        if hosts is not None:
+            self._setup_traces(hosts)
+        for trace in self.traces.values():
+            trace.series.clear()
         self.ui.result_text.setText("")
         self.ui.result_icon.setText("      —")
         self.ui.status_frame.hide()
@@ -259,40 +433,64 @@ class PingTab(QWidget):
             btn.setChecked(False)
 
         for l in [self.ui.sent_value, self.ui.received_value, self.ui.loss_value, self.ui.min_value, self.ui.max_value,
-                  self.ui.avg_value]: l.setText("")
-        self.ui.plot_line.setData([], [])
-        self.ui.plot_scatter_success.setData([], [])
-        self.ui.plot_scatter_loss.setData([], [])
+                  self.ui.avg_value, self.ui.p50_value, self.ui.p95_value, self.ui.p99_value,
+                  self.ui.jitter_value]: l.setText("")
+        for trace in self.traces.values():
+            for item in trace.items:
+                item.setData([], [])
 
+    @perf.timed("ping.update_stats")
     def update_stats(self):
-        if not self.full_pings: return
-        total_points = len(self.full_pings)
-
-        p = [p for p in self.full_pings if not np.isnan(p)]
-        l = ((self.sent - self.received) / self.sent) * 100 if self.sent > 0 else 0
-        self.ui.sent_value.setText(str(self.sent))
-        self.ui.received_value.setText(str(self.received))
-        self.ui.loss_value.setText(f"{l:.1f}%")
-        if p:
-            self.ui.min_value.setText(f"{min(p):.1f} ms")
-            self.ui.max_value.setText(f"{max(p):.1f} ms")
-            self.ui.avg_value.setText(f"{np.mean(p):.1f} ms")
-
-        y = np.array(self.full_pings)
-        x = np.arange(total_points)
-
-        if y.size == 0:
-            return
-
-        valid_indices = ~np.isnan(y)
-
-        self.ui.plot_line.setData(x[valid_indices], y[valid_indices])
-        self.ui.plot_scatter_success.setData(x[valid_indices], y[valid_indices])
-        self.ui.plot_scatter_loss.setData(x[~valid_indices], np.zeros(np.sum(~valid_indices)))
+        total_points = self._total_points()
+        if total_points == 0: return
+
+        for trace in self.traces.values():
+            series = trace.series
+            if trace.stat_labels is None:
+                self.ui.sent_value.setText(str(series.sent))
+                self.ui.received_value.setText(str(series.received))
+                self.ui.loss_value.setText(f"{series.loss_percent:.1f}%")
+                if series.received:
+                    self.ui.min_value.setText(f"{series.min:.1f} ms")
+                    self.ui.max_value.setText(f"{series.max:.1f} ms")
+                    self.ui.avg_value.setText(f"{series.mean:.1f} ms")
+                    p50, p95, p99 = series.percentiles((50, 95, 99))
+                    self.ui.p50_value.setText(f"{p50:.1f} ms")
+                    self.ui.p95_value.setText(f"{p95:.1f} ms")
+                    self.ui.p99_value.setText(f"{p99:.1f} ms")
+                    self.ui.jitter_value.setText(f"{series.jitter:.1f} ms")
+                continue
+            (sent_value, loss_value, min_value, avg_value, max_value,
+             p95_value, p99_value, jitter_value) = trace.stat_labels
+            sent_value.setText(str(series.sent))
+            loss_value.setText(f"{series.loss_percent:.1f}%")
+            if series.received:
+                min_value.setText(f"{series.min:.1f}")
+                avg_value.setText(f"{series.mean:.1f}")
+                max_value.setText(f"{series.max:.1f}")
+                p95, p99 = series.percentiles((95, 99))
+                p95_value.setText(f"{p95:.1f}")
+                p99_value.setText(f"{p99:.1f}")
+                jitter_value.setText(f"{series.jitter:.1f}")
 
         if self.is_live_view:
             self.ui.chart.enableAutoRange(axis='y')
             self.ui.chart.setXRange(max(0, total_points - 20), total_points)
+        self.refresh_plot()
+
+    @perf.timed("ping.refresh_plot")
+    def refresh_plot(self):
+        """Малює лише видимі точки; якщо їх більше, ніж пікселів, - min/max на піксель."""
+        if not self._total_points():
+            return
+        view_box = self.ui.chart.getViewBox()
+        x_min, x_max = view_box.viewRange()[0]
+        max_points = max(MIN_PLOT_POINTS, int(view_box.width()) * 2)
+        for trace in self.traces.values():
+            ok_x, ok_y, loss_x = trace.decimator.points(x_min, x_max, max_points)
+            trace.line.setData(ok_x, ok_y)
+            trace.scatter_success.setData(ok_x, ok_y)
+            trace.scatter_loss.setData(loss_x, np.zeros(len(loss_x)))
 
     def btn_style(self, c):
         return f"QPushButton {{ background-color: {c}; color: white; border-radius: 14px; padding: 8px; }} QPushButton:hover {{ background-color: {'#D32F2F' if c == '#B3261E' else '#7F67BE'}; }}"
@@ -307,19 +505,18 @@ class PingTab(QWidget):
             self.ui.sound_btn.setToolTip("Enable packet loss sound")
 
     def export_graph_data(self):
-        if not self.full_times: CustomMessageBox.show_info(self, "No Data", "There is no data to export."); return
+        if not self._total_points(): CustomMessageBox.show_info(self, "No Data", "There is no data to export."); return
+        if self.export_worker is not None and self.export_worker.isRunning():
+            CustomMessageBox.show_info(self, "Export", "An export is already in progress.")
+            return
         path, _ = QFileDialog.getSaveFileName(self, "Export Graph Data", "ping_data.csv", "CSV Files (*.csv)")
         if path:
-            try:
-                with open(path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f, delimiter=';')
-                    writer.writerow(["Timestamp", "Latency (ms)"])
-                    for ts, latency in zip(self.full_times, self.full_pings):
-                        time_str = f"'{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))}"
-                        latency_str = f"{latency:.1f}" if not np.isnan(latency) else "Failed"
-                        writer.writerow([time_str, latency_str])
-            except Exception as e:
-                CustomMessageBox.show_critical(self, "Export Error", f"Could not save file: {e}")
+            # Копії буферів (memcpy): пінг продовжує дописувати семпли під час експорту
+            columns = [(trace.host, trace.series.times.copy(), trace.series.latency.copy(),
+                        trace.series.lateness.copy()) for trace in self.traces.values()]
+            total = sum(len(times) for _, times, _, _ in columns)
+            self.export_worker = start_csv_export(self, path, ["Host", "Timestamp", "Latency (ms)", "Lateness (ms)"],
+                                                  _graph_csv_rows(columns), total)
 
     def export_screenshot(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Screenshot", "screenshot.png", "PNG Images (*.png)")
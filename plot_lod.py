@@ -0,0 +1,143 @@
+# plot_lod.py
+import math
+import numpy as np
+
+from ping_series import GrowableArray
+
+# Кожен наступний рівень деталізації об'єднує в 4 рази більше семплів
+TIER_FACTOR = 4
+MAX_TIERS = 10
+
+
+def _reduce_block(latency, lost, offset, bucket):
+    """
+    Ділить блок семплів на кошики по `bucket` і для кожного повертає
+    індекс/значення мінімуму та максимуму і перший втрачений семпл (-1, якщо втрат немає).
+    """
+    count = len(latency)
+    buckets = -(-count // bucket)
+    pad = buckets * bucket - count
+    if pad:
+        latency = np.concatenate([latency, np.full(pad, np.nan, dtype=latency.dtype)])
+        lost = np.concatenate([lost, np.zeros(pad, dtype=bool)])
+    latency = latency.reshape(buckets, bucket)
+    lost = lost.reshape(buckets, bucket)
+    rows = np.arange(buckets)
+    base = offset + rows * bucket
+
+    nan = np.isnan(latency)
+    low = np.where(nan, np.inf, latency)
+    high = np.where(nan, -np.inf, latency)
+    min_pos = low.argmin(axis=1)
+    max_pos = high.argmax(axis=1)
+    has_loss = lost.any(axis=1)
+    first_loss = np.where(has_loss, base + lost.argmax(axis=1), -1)
+    return base + min_pos, low[rows, min_pos], base + max_pos, high[rows, max_pos], first_loss
+
+
+class _Tier:
+    """Закешований рівень: min/max по кошиках фіксованого розміру."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.min_index = GrowableArray(np.int64)
+        self.min_value = GrowableArray(np.float32)
+        self.max_index = GrowableArray(np.int64)
+        self.max_value = GrowableArray(np.float32)
+        self.loss_index = GrowableArray(np.int64)
+
+    @property
+    def arrays(self):
+        return (self.min_index, self.min_value, self.max_index, self.max_value, self.loss_index)
+
+    def __len__(self):
+        return len(self.min_index)
+
+    def clear(self):
+        for array in self.arrays:
+            array.clear()
+
+    def update(self, latency, lost):
+        # Додаємо лише нові ПОВНІ кошики; неповний останній рахується при запиті
+        done = len(self) * self.bucket
+        complete = (len(latency) // self.bucket) * self.bucket
+        if complete > done:
+            reduced = _reduce_block(latency[done:complete], lost[done:complete], done, self.bucket)
+            for array, values in zip(self.arrays, reduced):
+                array.extend(values)
+
+    def select(self, latency, lost, first_bucket, last_bucket):
+        """Кошики [first_bucket, last_bucket): з кешу плюс неповний хвіст."""
+        cached = min(last_bucket, len(self))
+        parts = [tuple(array.view[first_bucket:cached] for array in self.arrays)]
+        if last_bucket > len(self):
+            start = len(self) * self.bucket
+            if start < len(latency):
+                parts.append(_reduce_block(latency[start:], lost[start:], start, self.bucket))
+        if len(parts) == 1:
+            return parts[0]
+        return tuple(np.concatenate(columns) for columns in zip(*parts))
+
+
+class SeriesDecimator:
+    """
+    Рендерний конвеєр для PingSeries: повертає лише точки видимого діапазону X,
+    а коли точок більше, ніж пікселів, - min/max на піксель з кешованих рівнів.
+    Втрати зберігаються: кошик із втратою дає маркер у першому втраченому семплі.
+    """
+
+    def __init__(self, series):
+        self.series = series
+        self._tiers = [_Tier(TIER_FACTOR ** level) for level in range(1, MAX_TIERS + 1)]
+        self._generation = series.generation
+
+    def _sync(self):
+        if self._generation != self.series.generation:
+            # Серію очищено - кеш більше не дійсний
+            for tier in self._tiers:
+                tier.clear()
+            self._generation = self.series.generation
+
+    def points(self, x_min, x_max, max_points):
+        """
+        Повертає (ok_x, ok_y, loss_x) для діапазону [x_min, x_max].
+        max_points - скільки точок можна намалювати (зазвичай 2 на піксель).
+        """
+        self._sync()
+        latency, lost = self.series.latency, self.series.lost
+        total = len(latency)
+        # По одній точці за межами діапазону, щоб лінія доходила до країв
+        start = max(0, int(math.floor(x_min)) - 1)
+        stop = min(total, int(math.ceil(x_max)) + 2)
+        if stop <= start:
+            empty = np.empty(0)
+            return empty, empty, empty
+
+        visible = stop - start
+        if visible <= max_points:
+            index = np.arange(start, stop)
+            mask = lost[start:stop]
+            return index[~mask], latency[start:stop][~mask], index[mask]
+
+        # Найдрібніший рівень, що дає не більше max_points/2 кошиків
+        tier = self._tiers[-1]
+        for candidate in self._tiers:
+            if visible / candidate.bucket <= max_points / 2:
+                tier = candidate
+                break
+        tier.update(latency, lost)
+        first_bucket = start // tier.bucket
+        last_bucket = -(-stop // tier.bucket)
+        min_index, min_value, max_index, max_value, loss_index = tier.select(
+            latency, lost, first_bucket, last_bucket)
+
+        has_ok = np.isfinite(min_value)
+        min_index, min_value = min_index[has_ok], min_value[has_ok]
+        max_index, max_value = max_index[has_ok], max_value[has_ok]
+        # Точки кожного кошика - у порядку зростання X
+        min_first = min_index <= max_index
+        ok_x = np.column_stack([np.where(min_first, min_index, max_index),
+                                np.where(min_first, max_index, min_index)]).ravel()
+        ok_y = np.column_stack([np.where(min_first, min_value, max_value),
+                                np.where(min_first, max_value, min_value)]).ravel()
+        return ok_x, ok_y, loss_index[loss_index >= 0]
\ No newline at end of file
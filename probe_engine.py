@@ -0,0 +1,771 @@
+# probe_engine.py
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import socket
+import struct
+import sys
+import time
+from collections import deque
+from icmplib import ICMPv4Socket, ICMPv6Socket, exceptions as icmp_exceptions
+from dns_cache import shared_dns_cache
+from perf_monitor import perf
+
+# Скільки ехо-запитів може одночасно бути "в польоті"
+DEFAULT_CONCURRENCY = 256
+# Таймаут очікування відповіді (секунди)
+DEFAULT_TIMEOUT = 1
+# Адаптивні таймаути (с): межі для таймауту, обчисленого з RTT хоста
+DEFAULT_MIN_TIMEOUT = 0.2
+DEFAULT_MAX_TIMEOUT = 5
+# Коефіцієнти RFC 6298: вага нового зразка для SRTT та RTTVAR і множник RTTVAR
+_RTT_ALPHA = 1 / 8
+_RTT_BETA = 1 / 4
+_RTT_K = 4
+# Хост, що ще не відповідав, отримує таймаут своєї підмережі (/24 або /64, байтів префікса)
+_SUBNET_PREFIX_BYTES = {socket.AF_INET: 3, socket.AF_INET6: 8}
+# Відкладання мертвих хостів: після скількох поспільних втрат інтервал почне подвоюватися і до якої межі (с)
+DEFAULT_BACKOFF_AFTER = 3
+DEFAULT_MAX_BACKOFF = 60
+# Як часто планувальник перевіряє зупинку та зміни списку, коли чекати нічого (с)
+_SCHEDULER_POLL = 0.1
+# Загальний бюджет ехо-запитів на секунду для масового пінгу (0 - без обмеження)
+DEFAULT_MAX_PPS = 2000
+# Адаптивна паралельність: нижня межа та частка "раптових" втрат, після якої вона зменшується
+MIN_ADAPTIVE_CONCURRENCY = 16
+LOCAL_DROP_THRESHOLD = 0.1
+# Менше хостів, що відповідали в попередньому раунді, - замало для висновків
+_MIN_DROP_SAMPLES = 20
+
+_ECHO_REQUEST_TYPES = {socket.AF_INET: 8, socket.AF_INET6: 128}
+_ECHO_REPLY_TYPES = {socket.AF_INET: 0, socket.AF_INET6: 129}
+# Повідомлення про помилку, що несуть заголовок вихідного пакета (RFC 792; у RFC 4443 - типи 0-127)
+_ICMPV4_ERROR_TYPES = frozenset((3, 4, 5, 11, 12))
+_IPV6_HEADER_SIZE = 40
+_SOCKET_CLASSES = {socket.AF_INET: ICMPv4Socket, socket.AF_INET6: ICMPv6Socket}
+_RECV_BUFFER_SIZE = 1 << 20
+# Змінна оточення з бекендом за замовчуванням: "icmp" або "simulated:seed=42,loss=0.02,..."
+BACKEND_ENV = "PING_TOOL_BACKEND"
+_PING_GROUP_RANGE = "/proc/sys/net/ipv4/ping_group_range"
+
+# Незмінне корисне навантаження (56 байт, як у системного ping).
+# Його частина контрольної суми рахується один раз, а не для кожного пакета.
+_PAYLOAD = bytes(range(0x10, 0x10 + 56))
+_PAYLOAD_SUM = sum(struct.unpack(f"!{len(_PAYLOAD) // 2}H", _PAYLOAD))
+
+
+def _echo_request(family, icmp_id, sequence):
+    """Збирає ICMP Echo Request із готовою контрольною сумою."""
+    total = (_ECHO_REQUEST_TYPES[family] << 8) + icmp_id + sequence + _PAYLOAD_SUM
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    header = struct.pack("!2B3H", _ECHO_REQUEST_TYPES[family], 0, ~total & 0xFFFF, icmp_id, sequence)
+    return header + _PAYLOAD
+
+
+class _IcmpReply:
+    __slots__ = ("type", "code", "id", "sequence")
+
+    def __init__(self, reply_type, code, icmp_id, sequence):
+        self.type = reply_type
+        self.code = code
+        self.id = icmp_id
+        self.sequence = sequence
+
+
+def _ipv4_payload(packet):
+    # Довжина IPv4-заголовка - поле IHL (у 32-бітних словах), з опціями вона більша за 20
+    return packet[(packet[0] & 0x0F) * 4:] if packet else packet
+
+
+def _parse_reply(family, packet, ip_header):
+    """
+    Пакет із ICMP-сокета -> _IcmpReply або None, якщо це не відповідь на ехо-запит.
+    ip_header - чи передує ICMP IPv4-заголовок (сирий сокет; SOCK_DGRAM на Linux
+    і сокети IPv6 віддають лише ICMP). Для помилок (unreachable, time exceeded)
+    id і sequence беруться з вкладеного заголовка нашого Echo Request.
+    """
+    if ip_header:
+        packet = _ipv4_payload(packet)
+    if len(packet) < 8:
+        return None
+    reply_type, code = packet[0], packet[1]
+    if reply_type != _ECHO_REPLY_TYPES[family]:
+        if family == socket.AF_INET:
+            if reply_type not in _ICMPV4_ERROR_TYPES:
+                return None
+            inner = _ipv4_payload(packet[8:])
+        else:
+            if reply_type >= 128:
+                return None
+            inner = packet[8 + _IPV6_HEADER_SIZE:]
+        # Помилка про чужий пакет (UDP, TCP) - не наша
+        if len(inner) < 8 or inner[0] != _ECHO_REQUEST_TYPES[family]:
+            return None
+        packet = inner
+    icmp_id, sequence = struct.unpack_from("!2H", packet, 4)
+    return _IcmpReply(reply_type, code, icmp_id, sequence)
+
+
+def unprivileged_icmp_allowed():
+    """
+    Linux: чи дозволяє net.ipv4.ping_group_range відкрити ICMP-сокет
+    SOCK_DGRAM без root для групи поточного процесу.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(_PING_GROUP_RANGE, "r") as f:
+            low, high = (int(value) for value in f.read().split())
+    except (OSError, ValueError):
+        return False
+    groups = {os.getegid(), *os.getgroups()}
+    return any(low <= gid <= high for gid in groups)
+
+
+def _open_icmp_socket(family, privileged):
+    """
+    privileged=None - автовибір: непривілейований SOCK_DGRAM, якщо ядро дозволяє,
+    інакше сирий сокет (потрібні права адміністратора).
+    """
+    socket_class = _SOCKET_CLASSES[family]
+    if privileged is None:
+        if unprivileged_icmp_allowed():
+            try:
+                return socket_class(privileged=False)
+            except (icmp_exceptions.SocketPermissionError, PermissionError):
+                pass
+        privileged = True
+    return socket_class(privileged=privileged)
+
+
+class _SharedSocket:
+    """
+    Один ICMP-сокет на сімейство адрес, відкритий на всю сесію воркера.
+    Окрема задача читає всі відповіді та розподіляє їх за номером послідовності.
+    """
+
+    def __init__(self, family, icmp_id, privileged):
+        self.family = family
+        self.icmp_id = icmp_id
+        self.icmp_sock = _open_icmp_socket(family, privileged)
+        self.icmp_sock.blocking = False
+        self.sock = self.icmp_sock.sock
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RECV_BUFFER_SIZE)
+        except OSError:
+            pass
+        # Linux SOCK_DGRAM: ядро саме підставляє id (порт сокета) і віддає
+        # лише наші відповіді. Сирий сокет бачить УСІ ICMP-пакети хоста.
+        self.match_id = self.icmp_sock.is_privileged or not sys.platform.startswith("linux")
+        # IPv4-заголовок перед ICMP є там само, де видно чужі пакети
+        self.ip_header = family == socket.AF_INET and self.match_id
+        self.pending = {}
+        self._next_sequence = random.randint(1, 0xFFFF)
+        self._reader = asyncio.get_running_loop().create_task(self._read_replies())
+
+    def next_sequence(self):
+        # 16-бітний лічильник; пропускаємо номери, що ще очікують відповіді
+        while True:
+            self._next_sequence = self._next_sequence % 0xFFFF + 1
+            if self._next_sequence not in self.pending:
+                return self._next_sequence
+
+    async def send(self, ip, sequence):
+        """Надсилає запит без getaddrinfo/setsockopt; повертає момент відправки."""
+        packet = _echo_request(self.family, self.icmp_id, sequence)
+        sent_at = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().sock_sendto(self.sock, packet, (ip, 0))
+        except PermissionError:
+            raise icmp_exceptions.SocketBroadcastError
+        except OSError as err:
+            raise icmp_exceptions.ICMPSocketError(str(err))
+        if perf.enabled:
+            perf.record("probe.send", time.perf_counter() - sent_at)
+        return sent_at
+
+    async def _read_replies(self):
+        loop = asyncio.get_running_loop()
+        sock = self.sock
+        while True:
+            try:
+                packet, _ = await loop.sock_recvfrom(sock, 1024)
+            except OSError:
+                # SOCK_DGRAM повідомляє ICMP-помилки (unreachable) як помилку сокета
+                await asyncio.sleep(0.01)
+                continue
+            received_at = time.perf_counter()
+            reply = _parse_reply(self.family, packet, self.ip_header)
+            if reply is None:
+                continue
+            if self.match_id and reply.id != self.icmp_id:
+                continue
+            future = self.pending.get(reply.sequence)
+            if future is not None and not future.done():
+                future.set_result((reply, received_at))
+            if perf.enabled:
+                perf.record("probe.receive", time.perf_counter() - received_at)
+
+    def close(self):
+        self._reader.cancel()
+        for future in self.pending.values():
+            if not future.done():
+                future.cancel()
+        self.pending.clear()
+        self.icmp_sock.close()
+
+
+# --- Бекенди: звідки беруться сокети та розв'язання імен ---
+class IcmpBackend:
+    """
+    Справжній бекенд: ICMP-сокети icmplib і спільний DNSCache.
+    Бекенд дає рушію resolver (resolve/resolve_many/prefetch) та open_socket(),
+    що повертає об'єкт з інтерфейсом _SharedSocket: family, pending, next_sequence(),
+    send(ip, sequence) -> момент відправки (perf_counter), close(). Відповіді
+    потрапляють у pending[sequence] як (reply з полем type, received_at).
+    """
+    spec = "icmp"
+
+    def __init__(self, resolver=None):
+        self.resolver = resolver or shared_dns_cache
+
+    def open_socket(self, family, icmp_id, privileged):
+        return _SharedSocket(family, icmp_id, privileged)
+
+
+_current_backend = None
+
+
+def backend_from_spec(spec):
+    """"icmp" або "simulated[:key=value,...]" -> бекенд. Кидає ValueError."""
+    name, _, params = spec.strip().partition(":")
+    if name in ("", "icmp"):
+        return IcmpBackend()
+    if name == "simulated":
+        from simulated_backend import SimulatedBackend  # Без циклічного імпорту
+        return SimulatedBackend.from_spec(params)
+    raise ValueError(f"Unknown probe backend: {name}")
+
+
+def set_backend(backend):
+    """Бекенд для всіх рушіїв, створених без явного backend (None - знову з BACKEND_ENV)."""
+    global _current_backend
+    _current_backend = backend
+
+
+def current_backend():
+    global _current_backend
+    if _current_backend is None:
+        _current_backend = backend_from_spec(os.environ.get(BACKEND_ENV, "icmp"))
+    return _current_backend
+
+
+class RttEstimator:
+    """
+    Таймаут одного хоста в стилі RTO з TCP (RFC 6298): SRTT + 4 * RTTVAR
+    у межах [floor, ceiling]. До першої відповіді діє таймаут fallback - загальнішої
+    оцінки (підмережі, далі всіх хостів), а поки й та без зразків - initial.
+    Кожен зразок іде і в fallback, тож хост, що ніколи не відповідає, чекає стільки,
+    скільки потрібно його живим сусідам: мертвий хост у локальній мережі коштує
+    раунду близько floor, а не повний таймаут. Втрати оцінок не змінюють.
+    """
+
+    def __init__(self, initial, floor, ceiling, fallback=None):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.fallback = fallback
+        self.srtt = None
+        self.rttvar = None
+        self._timeout = initial
+
+    @property
+    def timeout(self):
+        if self.srtt is None and self.fallback is not None:
+            return self.fallback.timeout
+        return self._timeout
+
+    def observe(self, rtt):
+        """rtt - у секундах; зразок враховується і в усіх fallback."""
+        if self.fallback is not None:
+            self.fallback.observe(rtt)
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - _RTT_BETA) * self.rttvar + _RTT_BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - _RTT_ALPHA) * self.srtt + _RTT_ALPHA * rtt
+        self._timeout = min(self.ceiling, max(self.floor, self.srtt + _RTT_K * self.rttvar))
+
+
+class TokenBucket:
+    """
+    Обмежувач швидкості відправки: rate запитів на секунду, не більше burst поспіль.
+    Кожен acquire резервує свій токен одразу, тож очікувачі проходять по черзі
+    і рівномірно, а не всі разом після паузи.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        # За замовчуванням - запас на ~20 мс відправки
+        self.burst = max(1.0, burst if burst is not None else self.rate / 50)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD-регулятор паралельності для раундів по списку хостів.
+    Локальні втрати (переповнені буфери сокета, ICMP rate limit на роутері) видно
+    з того, що за один раунд замовкає помітна частка хостів, які відповідали
+    в попередньому, або відправка повертає помилки сокета; справжні відмови хостів
+    так не корелюють. Тоді паралельність зменшується вдвічі, а після чистих
+    раундів поступово повертається до максимуму.
+    """
+
+    def __init__(self, maximum, minimum=MIN_ADAPTIVE_CONCURRENCY):
+        self.maximum = max(1, int(maximum))
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.value = self.maximum
+        self._alive = set()  # Хости, що відповіли в попередньому раунді
+        self._round_alive = set()
+        self._dropped = 0
+        self._send_errors = 0
+
+    def record(self, result):
+        address = result["address"]
+        if result["is_alive"]:
+            self._round_alive.add(address)
+        elif address in self._alive:
+            self._dropped += 1
+        if result["status_text"] == "ICMP Error":
+            # Напр. ENOBUFS: ядро не прийняло пакет
+            self._send_errors += 1
+
+    def end_round(self):
+        """Підсумовує раунд і повертає нову паралельність."""
+        previously_alive = len(self._alive)
+        drop_ratio = self._dropped / previously_alive if previously_alive >= _MIN_DROP_SAMPLES else 0
+        if self._send_errors or drop_ratio > LOCAL_DROP_THRESHOLD:
+            self.value = max(self.minimum, self.value // 2)
+        elif self.value < self.maximum:
+            self.value = min(self.maximum, self.value + max(1, self.maximum // 16))
+        self._alive, self._round_alive = self._round_alive, set()
+        self._dropped = self._send_errors = 0
+        return self.value
+
+
+class AsyncProbeEngine:
+    """
+    Асинхронний рушій ICMP-пінгу: тримає багато ехо-запитів одночасно
+    на спільних сокетах, тож раунд по N хостах триває приблизно один таймаут.
+    Повертає ті ж словники результатів, що й IPTestWorker раніше.
+    Сокети й DNS дає backend (за замовчуванням current_backend()), тож той самий
+    рушій працює і з симуляцією мережі (simulated_backend.py).
+    privileged=None - на Linux без root використовуються сокети SOCK_DGRAM.
+    Імена хостів розв'язуються через спільний DNSCache, а не на кожен запит.
+    rate_limiter (TokenBucket) обмежує відправку; таймаут рахується від
+    фактичної відправки, тож черга до обмежувача не виглядає як втрати.
+    adaptive_timeout - таймаут кожного хоста рахується з його RTT (RttEstimator);
+    хост без відповідей чекає за оцінкою своєї підмережі (/24, /64), а за її
+    відсутності - усіх хостів, і лише до першої відповіді будь-кого - timeout.
+    Відповіді, що прийшли після таймауту, теж ідуть в оцінку, тож повільний хост
+    швидко отримує довший таймаут.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, privileged=None,
+                 resolver=None, rate_limiter=None, adaptive_timeout=True,
+                 min_timeout=DEFAULT_MIN_TIMEOUT, max_timeout=DEFAULT_MAX_TIMEOUT, backend=None):
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._estimators = {} if adaptive_timeout else None
+        # Загальніші оцінки для хостів без власних зразків: (family, префікс) -> RttEstimator
+        self._subnet_estimators = {}
+        self._overall_estimator = RttEstimator(timeout, min_timeout, max_timeout)
+        self.privileged = privileged
+        self.backend = backend or current_backend()
+        self.resolver = resolver or self.backend.resolver
+        self.rate_limiter = rate_limiter
+        self._icmp_id = (os.getpid() ^ random.randint(0, 0xFFFF)) & 0xFFFF
+        self._sockets = {}
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        for shared in self._sockets.values():
+            shared.close()
+        self._sockets.clear()
+
+    def _get_socket(self, family):
+        shared = self._sockets.get(family)
+        if shared is None:
+            shared = self.backend.open_socket(family, self._icmp_id, self.privileged)
+            self._sockets[family] = shared
+        return shared
+
+    def _estimator(self, address, family, ip):
+        estimator = self._estimators.get(address)
+        if estimator is None:
+            # Зона IPv6 (fe80::1%eth0) до префікса не належить
+            packed = socket.inet_pton(family, ip.partition("%")[0])
+            subnet = (family, packed[:_SUBNET_PREFIX_BYTES[family]])
+            subnet_estimator = self._subnet_estimators.get(subnet)
+            if subnet_estimator is None:
+                subnet_estimator = RttEstimator(self.timeout, self.min_timeout, self.max_timeout,
+                                                fallback=self._overall_estimator)
+                self._subnet_estimators[subnet] = subnet_estimator
+            estimator = RttEstimator(self.timeout, self.min_timeout, self.max_timeout, fallback=subnet_estimator)
+            self._estimators[address] = estimator
+        return estimator
+
+    def timeout_for(self, address):
+        """Поточний таймаут хоста (секунди)."""
+        if self._estimators is None:
+            return self.timeout
+        estimator = self._estimators.get(address)
+        return estimator.timeout if estimator is not None else self.timeout
+
+    async def prepare(self, addresses):
+        """Паралельно розв'язує всі імена наперед, щоб цикл пінгу мав справу лише з IP."""
+        await self.resolver.resolve_many(addresses)
+
+    async def probe(self, address):
+        """Надсилає один ехо-запит і повертає словник результату."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            try:
+                return await self._probe(address)
+
+            # --- Обробка винятків (ті ж статуси, що й раніше) ---
+            except (icmp_exceptions.SocketPermissionError, PermissionError):
+                return {"address": address, "is_alive": False, "status_text": "Permission Error"}
+
+            except (socket.gaierror, UnicodeError):
+                return {"address": address, "is_alive": False, "status_text": "Host not found"}
+
+            except icmp_exceptions.SocketAddressError:
+                return {"address": address, "is_alive": False, "status_text": "Invalid address"}
+
+            # Текст винятку - у результаті (error), а не рядком у stdout на кожен хост
+            except icmp_exceptions.ICMPLibError as e:
+                return {"address": address, "is_alive": False, "status_text": "ICMP Error", "error": str(e)}
+
+            except Exception as e:
+                return {"address": address, "is_alive": False, "status_text": "Unexpected Error", "error": str(e)}
+
+    async def _probe(self, address):
+        family, ip = await self.resolver.resolve(address)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        shared = self._get_socket(family)
+        estimator = self._estimator(address, family, ip) if self._estimators is not None else None
+        sequence = shared.next_sequence()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        shared.pending[sequence] = future
+        wait_late = False
+        try:
+            sent_at = await shared.send(ip, sequence)
+            done, _ = await asyncio.wait((future,), timeout=estimator.timeout if estimator else self.timeout)
+            if not done:
+                if estimator is not None:
+                    # Номер лишається зайнятим до max_timeout: запізніла відповідь - теж зразок RTT
+                    wait_late = True
+                    future.add_done_callback(
+                        lambda f: self._observe_late(f, family, sent_at, estimator))
+                    loop.call_later(self.max_timeout, self._forget, shared, sequence)
+                return {"address": address, "rtt": 0, "is_alive": False, "status_text": "Failed"}
+        finally:
+            if not wait_late:
+                shared.pending.pop(sequence, None)
+
+        reply, received_at = future.result()
+        if reply.type != _ECHO_REPLY_TYPES[family]:
+            # Destination unreachable, TTL exceeded тощо
+            return {"address": address, "rtt": 0, "is_alive": False, "status_text": "Failed"}
+        if estimator is not None:
+            estimator.observe(received_at - sent_at)
+        rtt = (received_at - sent_at) * 1000
+        return {"address": address, "rtt": rtt, "is_alive": True, "status_text": "Success"}
+
+    @staticmethod
+    def _observe_late(future, family, sent_at, estimator):
+        if future.cancelled():
+            return
+        reply, received_at = future.result()
+        if reply.type == _ECHO_REPLY_TYPES[family]:
+            estimator.observe(received_at - sent_at)
+
+    @staticmethod
+    def _forget(shared, sequence):
+        future = shared.pending.pop(sequence, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    async def probe_many(self, addresses, spread=0):
+        """
+        Асинхронний генератор: пінгує всі адреси з обмеженою паралельністю
+        і віддає результати в порядку надходження відповідей.
+        Адреси беруться з ітератора ліниво, тож підходять і генератори.
+        spread > 0 (лише для списків) - запуски рівномірно розподіляються
+        на spread секунд замість одного сплеску на початку.
+        """
+        spacing = spread / len(addresses) if spread and addresses else 0
+        addresses = iter(addresses)
+        pending = set()
+        exhausted = False
+        launched = 0
+        start = time.monotonic()
+        try:
+            while True:
+                wait_timeout = None
+                while not exhausted and len(pending) < self.concurrency:
+                    if spacing:
+                        delay = start + launched * spacing - time.monotonic()
+                        if delay > 0:
+                            wait_timeout = delay
+                            break
+                    address = next(addresses, None)
+                    if address is None:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self.probe(address)))
+                    launched += 1
+                if not pending:
+                    if exhausted:
+                        return
+                    await asyncio.sleep(wait_timeout)
+                    continue
+                done, pending = await asyncio.wait(pending, timeout=wait_timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class FixedRateScheduler:
+    """
+    Надсилає ехо-запити до одного хоста за фіксованими дедлайнами монотонного
+    годинника: start + k * interval. Час відповіді не зсуває розклад, тож кілька
+    запитів можуть бути "в польоті", якщо таймаут довший за інтервал.
+    Результати віддаються у порядку номерів (seq) разом із запізненням відправки.
+    count=None - без обмеження; інакше після count запитів чекає останні відповіді й завершується.
+    """
+
+    def __init__(self, engine, address, interval, on_result, is_running, count=None):
+        self.engine = engine
+        self.address = address
+        self.interval = interval
+        # on_result(seq, result, sent_at_ns, lateness_ms)
+        self.on_result = on_result
+        self.is_running = is_running
+        self.count = count
+        self._completed = {}
+        self._next_to_publish = 1
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        in_flight = set()
+        start = time.monotonic()
+        slot = 0
+        seq = 0
+        try:
+            while self.is_running():
+                if self.count is not None and seq >= self.count:
+                    if in_flight:
+                        await asyncio.wait(set(in_flight))
+                    break
+                deadline = start + slot * self.interval
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if not self.is_running():
+                    break
+
+                now = time.monotonic()
+                lateness_ms = (now - deadline) * 1000
+                seq += 1
+                task = loop.create_task(self._probe(seq, time.time_ns(), lateness_ms))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+                # Пропущені слоти (машина "заснула" чи перевантажена) не надолужуємо пачкою
+                slot = max(slot + 1, int((now - start) / self.interval) + 1)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _probe(self, seq, sent_at_ns, lateness_ms):
+        result = await self.engine.probe(self.address)
+        self._completed[seq] = (seq, result, sent_at_ns, lateness_ms)
+        # Відповідь на пізніший запит може прийти раніше - тримаємо порядок seq
+        while self._next_to_publish in self._completed and self.is_running():
+            self.on_result(*self._completed.pop(self._next_to_publish))
+            self._next_to_publish += 1
+
+
+class _ScheduledHost:
+    __slots__ = ("failures", "probes")
+
+    def __init__(self):
+        self.failures = 0
+        self.probes = 0
+
+
+class BackoffScheduler:
+    """
+    Перевіряє список хостів за купою (heapq), впорядкованою за часом наступної
+    перевірки. Кожен хост перевіряється раз на interval; після backoff_after
+    поспільних втрат інтервал подвоюється з кожною новою втратою до max_backoff,
+    а перша ж відповідь повертає звичайний ритм. Хости, що то відповідають, то ні,
+    ритму не втрачають.
+    add/remove можна викликати з іншого потоку: зміни застосовує цикл run().
+    До результату додаються next_probe_at (час наступної перевірки, с epoch)
+    і backoff (поточний подовжений інтервал у секундах або None).
+    """
+
+    def __init__(self, interval, max_backoff=DEFAULT_MAX_BACKOFF, backoff_after=DEFAULT_BACKOFF_AFTER):
+        self.interval = interval
+        self.max_backoff = max(max_backoff, interval)
+        self.backoff_after = backoff_after
+        self._heap = []
+        self._hosts = {}
+        self._changes = deque()
+        self._counter = itertools.count()
+
+    def add(self, addresses):
+        self._changes.append((True, list(addresses)))
+
+    def remove(self, addresses):
+        self._changes.append((False, list(addresses)))
+
+    def backoff_for(self, failures):
+        """Подовжений інтервал для такої кількості поспільних втрат, або None."""
+        if failures < self.backoff_after:
+            return None
+        return min(self.max_backoff, self.interval * 2 ** (failures - self.backoff_after + 1))
+
+    def _apply_changes(self, now):
+        while self._changes:
+            adding, addresses = self._changes.popleft()
+            if not adding:
+                for address in addresses:
+                    # Записи в купі лишаються і відкидаються при виїмці
+                    self._hosts.pop(address, None)
+                continue
+            new_hosts = [address for address in dict.fromkeys(addresses) if address not in self._hosts]
+            # Нові хости розподіляються по інтервалу, а не йдуть одним сплеском
+            spacing = self.interval / len(new_hosts) if new_hosts else 0
+            for offset, address in enumerate(new_hosts):
+                host = _ScheduledHost()
+                self._hosts[address] = host
+                self._push(now + offset * spacing, address, host)
+
+    def _push(self, due, address, host):
+        heapq.heappush(self._heap, (due, next(self._counter), address, host))
+
+    async def run(self, engine, on_result, is_running, throttled=None):
+        """
+        on_result(result, probe_number); паралельність - engine.concurrency.
+        Поки throttled() повертає True (споживач результатів не встигає), нові
+        перевірки не запускаються - хости чекають у купі, а не результати в черзі.
+        """
+        loop = asyncio.get_running_loop()
+        in_flight = set()
+        try:
+            while is_running():
+                now = time.monotonic()
+                self._apply_changes(now)
+                paused = throttled is not None and throttled()
+                while (not paused and self._heap and self._heap[0][0] <= now
+                       and len(in_flight) < engine.concurrency):
+                    _, _, address, host = heapq.heappop(self._heap)
+                    if self._hosts.get(address) is not host:
+                        continue  # Хост видалили (або додали наново)
+                    task = loop.create_task(self._probe(engine, address, host, on_result, is_running))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+
+                if in_flight and len(in_flight) >= engine.concurrency:
+                    await asyncio.wait(set(in_flight), timeout=_SCHEDULER_POLL,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                elif paused:
+                    await asyncio.sleep(_SCHEDULER_POLL)
+                else:
+                    delay = self._heap[0][0] - time.monotonic() if self._heap else _SCHEDULER_POLL
+                    await asyncio.sleep(min(max(delay, 0), _SCHEDULER_POLL))
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _probe(self, engine, address, host, on_result, is_running):
+        started = time.monotonic()
+        result = await engine.probe(address)
+        if self._hosts.get(address) is not host or not is_running():
+            return
+        host.probes += 1
+        host.failures = 0 if result["is_alive"] else host.failures + 1
+        backoff = self.backoff_for(host.failures)
+        now = time.monotonic()
+        # Наступна перевірка - від моменту відправки, а не від відповіді
+        due = max(started + (backoff or self.interval), now)
+        self._push(due, address, host)
+        on_result(dict(result, next_probe_at=time.time() + (due - now), backoff=backoff), host.probes)
+
+
+def ping_record(host, seq, result, sent_at_ns, lateness_ms, interval_ms):
+    """Результат одного запиту FixedRateScheduler у форматі вкладки Ping / History."""
+    delay = -1
+    status = "Failed"  # Встановлюємо за замовчуванням
+    error_message = ""
+    status_text = result["status_text"]
+
+    if result["is_alive"]:
+        status = "Success"
+        delay = round(result["rtt"], 1)
+
+    # Конкретна помилка: хост не знайдено (DNS-помилка)
+    elif status_text == "Host not found":
+        error_message = "Host not found. Check DNS or network."
+
+    # Інші помилки (таймаут - це просто статус "Failed")
+    elif status_text != "Failed":
+        error_message = f"Ping error: {status_text}"
+        if result.get("error"):
+            error_message += f" ({result['error']})"
+
+    sent_at = sent_at_ns / 1e9
+    current_time = time.strftime("%H:%M:%S", time.localtime(sent_at))
+    if interval_ms < 1000:
+        current_time += f".{int(sent_at * 1000) % 1000:03d}"
+
+    return {
+        "seq": seq,
+        "host": host,
+        "time": current_time,
+        "timestamp_ns": sent_at_ns,
+        "lateness_ms": lateness_ms,
+        "delay": delay,
+        "status": status,
+        "error_message": error_message
+    }
\ No newline at end of file
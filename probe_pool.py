@@ -0,0 +1,277 @@
+# probe_pool.py
+"""
+Шардинг перевірок IP Test по кількох процесах. Кожен процес-шард має власний
+AsyncProbeEngine (свої ICMP-сокети), власний BackoffScheduler і свою частину
+бюджету пакетів, тож надсилання, прийом і розбір відповідей масштабуються
+на всі ядра, а процес GUI лише розпаковує готові пакети результатів.
+
+Результати йдуть через pipe компактними пакетами: номер хоста в шарді,
+код статусу і числа, без рядків та словників. У пакеті - лише останній
+результат кожного хоста, а відправка - за кредитами: шард має право на
+MAX_UNACKED_BATCHES непідтверджених пакетів, і батьківський процес підтверджує
+пакет, лише коли GUI встигає їх розбирати. Без кредитів шард не запускає нових
+перевірок, тож швидкість шардів підлаштовується під споживача.
+Модуль не імпортує Qt: дочірні процеси стартують через spawn.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from multiprocessing.connection import wait
+
+from probe_engine import (AsyncProbeEngine, AdaptiveConcurrency, BackoffScheduler, TokenBucket,
+                          backend_from_spec, current_backend, set_backend, DEFAULT_CONCURRENCY, DEFAULT_MAX_PPS, DEFAULT_TIMEOUT,
+                          DEFAULT_MIN_TIMEOUT, DEFAULT_MAX_TIMEOUT, DEFAULT_MAX_BACKOFF)
+
+# Як часто шард віддає накопичені результати та перевіряє команди (с)
+BATCH_INTERVAL = 0.05
+# Скільки пакетів шард може надіслати без підтвердження від батьківського процесу
+MAX_UNACKED_BATCHES = 4
+# Скільки чекати на коректне завершення шарда, перш ніж зупинити його примусово (с)
+_STOP_TIMEOUT = 3
+
+# Статуси результатів AsyncProbeEngine <-> коди в пакетах
+STATUS_TEXTS = ("Success", "Failed", "Host not found", "Invalid address", "ICMP Error",
+                "Unexpected Error", "Permission Error")
+_STATUS_CODES = {text: code for code, text in enumerate(STATUS_TEXTS)}
+_UNEXPECTED_CODE = _STATUS_CODES["Unexpected Error"]
+
+
+def shard_of(address, shards):
+    """Стабільний номер шарда для хоста (однаковий у всіх процесах і запусках)."""
+    return zlib.crc32(address.encode("utf-8")) % shards
+
+
+# --- Дочірній процес ---
+def _shard_main(commands, results, addresses, options):
+    # Шард стартує через spawn: бекенд батьківського процесу передається рядком
+    set_backend(backend_from_spec(options["backend"]))
+    try:
+        asyncio.run(_run_shard(commands, results, addresses, options))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        results.close()
+
+
+async def _run_shard(commands, results, addresses, options):
+    hosts = list(addresses)
+    index = {address: number for number, address in enumerate(hosts)}
+    scheduler = BackoffScheduler(options["probe_interval"], max_backoff=options["max_backoff"])
+    scheduler.add(hosts)
+    adaptive = AdaptiveConcurrency(options["concurrency"])
+    # Номер хоста -> його останній результат з часу попереднього пакета
+    pending = {}
+    credits = MAX_UNACKED_BATCHES
+    running = True
+
+    def is_running():
+        return running
+
+    def out_of_credits():
+        return credits <= 0
+
+    def on_result(result, probe_number):
+        nonlocal running
+        code = _STATUS_CODES.get(result["status_text"], _UNEXPECTED_CODE)
+        number = index[result["address"]]
+        pending[number] = (number, code, result.get("rtt", 0), result["next_probe_at"],
+                           result["backoff"], probe_number)
+        if result["status_text"] == "Permission Error":
+            running = False
+            return
+        adaptive.record(result)
+
+    async def pump(engine):
+        nonlocal pending, credits, running
+        round_started = time.monotonic()
+        while True:
+            await asyncio.sleep(BATCH_INTERVAL)
+            try:
+                while commands.poll():
+                    command, payload = commands.recv()
+                    if command == "add":
+                        for address in payload:
+                            if address not in index:
+                                index[address] = len(hosts)
+                                hosts.append(address)
+                        scheduler.add(payload)
+                    elif command == "remove":
+                        scheduler.remove(payload)
+                    elif command == "ack":
+                        credits += 1
+                    else:
+                        running = False
+            except (EOFError, OSError):
+                running = False  # Батьківський процес завершився
+            # Останній пакет (зокрема з Permission Error) іде і без кредиту
+            if pending and (credits > 0 or not running):
+                chunk, pending = list(pending.values()), {}
+                credits -= 1
+                results.send(chunk)
+            if time.monotonic() - round_started >= options["probe_interval"]:
+                round_started = time.monotonic()
+                engine.concurrency = adaptive.end_round()
+            if not running:
+                return
+
+    max_pps = options["max_pps"]
+    async with AsyncProbeEngine(concurrency=options["concurrency"], timeout=options["timeout"],
+                                rate_limiter=TokenBucket(max_pps) if max_pps else None,
+                                min_timeout=options["min_timeout"],
+                                max_timeout=options["max_timeout"]) as engine:
+        await engine.prepare(hosts)
+        pump_task = asyncio.get_running_loop().create_task(pump(engine))
+        try:
+            await scheduler.run(engine, on_result, is_running, out_of_credits)
+        finally:
+            running = False
+            await pump_task
+
+
+# --- Батьківський процес ---
+class _Shard:
+    def __init__(self):
+        self.hosts = []
+        self.known = set()
+        self.process = None
+        self.commands = None
+        self.results = None
+
+
+class ShardedProbePool:
+    """
+    Пул процесів-шардів для IP Test. Хост закріплюється за шардом за хешем
+    адреси; add/remove можна викликати з будь-якого потоку (і до start()).
+    receive() повертає розпаковані результати у форматі AsyncProbeEngine
+    (разом із next_probe_at і backoff) та номер перевірки хоста і підтверджує
+    отримані пакети: хто не викликає receive(), той зупиняє шарди.
+    Загальний бюджет max_pps ділиться між шардами порівну.
+    """
+
+    def __init__(self, addresses, processes=None, concurrency=DEFAULT_CONCURRENCY, max_pps=DEFAULT_MAX_PPS,
+                 probe_interval=2, timeout=DEFAULT_TIMEOUT, min_timeout=DEFAULT_MIN_TIMEOUT,
+                 max_timeout=DEFAULT_MAX_TIMEOUT, max_backoff=DEFAULT_MAX_BACKOFF):
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.options = {
+            "concurrency": concurrency,
+            "max_pps": max_pps / self.processes if max_pps else 0,
+            "probe_interval": probe_interval,
+            "timeout": timeout,
+            "min_timeout": min_timeout,
+            "max_timeout": max_timeout,
+            "max_backoff": max_backoff,
+            "backend": current_backend().spec,
+        }
+        self._shards = [_Shard() for _ in range(self.processes)]
+        self._lock = threading.Lock()
+        self._started = False
+        self.add(addresses)
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        with self._lock:
+            for shard in self._shards:
+                command_reader, shard.commands = context.Pipe(duplex=False)
+                shard.results, result_writer = context.Pipe(duplex=False)
+                shard.process = context.Process(
+                    target=_shard_main, name="probe-shard", daemon=True,
+                    args=(command_reader, result_writer, list(shard.hosts), self.options))
+                shard.process.start()
+                # Кінці дочірнього процесу тут не потрібні: так його завершення дає EOF
+                command_reader.close()
+                result_writer.close()
+            self._started = True
+
+    def _route(self, addresses):
+        by_shard = {}
+        for address in addresses:
+            by_shard.setdefault(shard_of(address, self.processes), []).append(address)
+        return by_shard
+
+    def _send(self, shard, message):
+        # Викликається під self._lock: add/remove йдуть з GUI-потоку, підтвердження - з потоку воркера
+        try:
+            shard.commands.send(message)
+        except (OSError, ValueError):
+            pass  # Шард уже завершився
+
+    def add(self, addresses):
+        with self._lock:
+            for number, hosts in self._route(addresses).items():
+                shard = self._shards[number]
+                # Нумерація хостів тут і в шарді збігається: обидва дописують лише нові, у тому ж порядку
+                for address in hosts:
+                    if address not in shard.known:
+                        shard.known.add(address)
+                        shard.hosts.append(address)
+                if self._started:
+                    # Повторно доданий після видалення хост шард поверне в розклад
+                    self._send(shard, ("add", hosts))
+
+    def remove(self, addresses):
+        with self._lock:
+            if not self._started:
+                removed = set(addresses)
+                for shard in self._shards:
+                    shard.hosts = [address for address in shard.hosts if address not in removed]
+                    shard.known -= removed
+                return
+            for number, hosts in self._route(addresses).items():
+                self._send(self._shards[number], ("remove", hosts))
+
+    def alive(self):
+        return any(shard.results is not None for shard in self._shards)
+
+    def receive(self, timeout):
+        """Чекає до timeout секунд; повертає [(result, probe_number), ...]."""
+        connections = {shard.results: shard for shard in self._shards if shard.results is not None}
+        if not connections:
+            return []
+        received = []
+        for connection in wait(list(connections), timeout):
+            shard = connections[connection]
+            try:
+                batch = connection.recv()
+            except (EOFError, OSError):
+                connection.close()
+                shard.results = None
+                continue
+            with self._lock:
+                self._send(shard, ("ack", None))
+            hosts = shard.hosts
+            for index, code, rtt, next_probe_at, backoff, probe_number in batch:
+                received.append(({
+                    "address": hosts[index],
+                    "rtt": rtt,
+                    "is_alive": code == 0,
+                    "status_text": STATUS_TEXTS[code],
+                    "next_probe_at": next_probe_at,
+                    "backoff": backoff,
+                }, probe_number))
+        return received
+
+    def stop(self):
+        with self._lock:
+            for shard in self._shards:
+                if shard.process is not None:
+                    self._send(shard, ("stop", None))
+        # Поки шарди завершуються, їхні результати вичитуються: інакше шард може
+        # застрягти на відправці пакета в заповнений pipe
+        deadline = time.monotonic() + _STOP_TIMEOUT
+        while time.monotonic() < deadline and any(
+                shard.process is not None and shard.process.is_alive() for shard in self._shards):
+            if not self.receive(BATCH_INTERVAL):
+                time.sleep(BATCH_INTERVAL / 5)
+        for shard in self._shards:
+            if shard.process is None:
+                continue
+            if shard.process.is_alive():
+                shard.process.terminate()
+                shard.process.join()
+            shard.commands.close()
+            if shard.results is not None:
+                shard.results.close()
+                shard.results = None
\ No newline at end of file
@@ -0,0 +1,163 @@
+# result_db.py
+import os
+import queue
+import sqlite3
+import threading
+
+# Де зберігається історія вкладки IP Test
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".ping_tool", "ip_test.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ip_test_results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    timestamp_ns INTEGER NOT NULL,
+    rtt REAL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ip_test_results_host_time ON ip_test_results (host, timestamp_ns);
+CREATE INDEX IF NOT EXISTS idx_ip_test_results_time ON ip_test_results (timestamp_ns);
+"""
+
+_INSERT = "INSERT INTO ip_test_results (run_id, round, host, timestamp_ns, rtt, status) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def _connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # У режимі WAL NORMAL не ламає базу при збої, а лише може втратити останні транзакції
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ResultDatabase:
+    """
+    Історія всіх результатів IP Test у SQLite (WAL).
+    Воркер віддає результати раунду одним пакетом, а вставляє їх окремий потік
+    однією транзакцією, тож цикл пінгу ніколи не чекає на диск.
+    Читання йдуть через власні з'єднання і не блокуються записом (WAL).
+    on_error(message) викликається з потоку запису, коли пакет не вдалося вставити;
+    про першу таку помилку повідомляється один раз, наступні пакети пробуються далі.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, on_error=None):
+        self.path = path
+        self.on_error = on_error
+        self.failed = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = _connect(path)
+        with connection:
+            connection.executescript(_SCHEMA)
+        connection.close()
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="result-db", daemon=True)
+        self._thread.start()
+
+    # --- Запис ---
+    def add_round(self, rows):
+        """rows - список (run_id, round, host, timestamp_ns, rtt або None, status_text)."""
+        if rows:
+            self._queue.put(rows)
+
+    def _run(self):
+        connection = _connect(self.path)
+        try:
+            while True:
+                rows = self._queue.get()
+                if rows is None:
+                    break
+                # Усе, що встигло накопичитися, - однією транзакцією
+                batch = list(rows)
+                stop = False
+                while not self._queue.empty():
+                    more = self._queue.get_nowait()
+                    if more is None:
+                        stop = True
+                        break
+                    batch.extend(more)
+                try:
+                    with connection:
+                        connection.executemany(_INSERT, batch)
+                except sqlite3.Error as e:
+                    self._report(f"{len(batch)} results were not saved: {e}")
+                if stop:
+                    break
+        finally:
+            connection.close()
+
+    def _report(self, message):
+        if not self.failed:
+            self.failed = True
+            if self.on_error is not None:
+                self.on_error(message)
+
+    def close(self):
+        """Дописує чергу і зупиняє потік запису."""
+        self._queue.put(None)
+        self._thread.join()
+
+    # --- Запити ---
+    def _query(self, sql, params=()):
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    def host_history(self, host, since_ns=None, limit=None):
+        """[(timestamp_ns, rtt, status), ...] від найстарішого до найновішого."""
+        sql = "SELECT timestamp_ns, rtt, status FROM ip_test_results WHERE host = ?"
+        params = [host]
+        if since_ns is not None:
+            sql += " AND timestamp_ns >= ?"
+            params.append(since_ns)
+        if limit is not None:
+            # Останні limit записів, але у хронологічному порядку
+            sql = f"SELECT * FROM ({sql} ORDER BY timestamp_ns DESC LIMIT ?) ORDER BY timestamp_ns"
+            params.append(limit)
+        else:
+            sql += " ORDER BY timestamp_ns"
+        return self._query(sql, params)
+
+    def host_summary(self, host):
+        """
+        Агрегати по хосту за всю історію, або None, якщо записів немає.
+        failing_since_ns - початок поточної серії втрат (None, якщо останній запит успішний).
+        """
+        row = self._query(
+            "SELECT COUNT(*), SUM(status = 'Success'), MIN(rtt), AVG(rtt), MAX(rtt), "
+            "MIN(timestamp_ns), MAX(timestamp_ns), MAX(CASE WHEN status = 'Success' THEN timestamp_ns END) "
+            "FROM ip_test_results WHERE host = ?", (host,))[0]
+        sent, received, min_rtt, avg_rtt, max_rtt, first_ns, last_ns, last_success_ns = row
+        if not sent:
+            return None
+        failing_since_ns = self._query(
+            "SELECT MIN(timestamp_ns) FROM ip_test_results WHERE host = ? AND timestamp_ns > ?",
+            (host, last_success_ns if last_success_ns is not None else -1))[0][0]
+        return {
+            "sent": sent,
+            "received": received,
+            "loss_percent": (1 - received / sent) * 100,
+            "min_rtt": min_rtt,
+            "avg_rtt": avg_rtt,
+            "max_rtt": max_rtt,
+            "first_ns": first_ns,
+            "last_ns": last_ns,
+            "last_success_ns": last_success_ns,
+            "failing_since_ns": failing_since_ns,
+        }
+
+    def summaries(self, since_ns=None):
+        """{host: (sent, received, avg_rtt)} для всіх хостів (з моменту since_ns)."""
+        sql = "SELECT host, COUNT(*), SUM(status = 'Success'), AVG(rtt) FROM ip_test_results"
+        params = []
+        if since_ns is not None:
+            sql += " WHERE timestamp_ns >= ?"
+            params.append(since_ns)
+        sql += " GROUP BY host"
+        return {host: (sent, received, avg_rtt) for host, sent, received, avg_rtt in self._query(sql, params)}
\ No newline at end of file
@@ -0,0 +1,43 @@
+# result_queue.py
+from collections import deque
+
+# Частота, з якою вкладки забирають накопичені результати (разів на секунду).
+# 0 - вимкнути пакетування: кожен результат іде окремим сигналом, як раніше.
+DEFAULT_REFRESH_HZ = 20
+# Скільки результатів вкладка обробляє за один тік: решта чекає наступного,
+# тож навіть великий наплив не блокує GUI довше, ніж на один такий пакет
+DEFAULT_DRAIN_LIMIT = 2000
+# Скільки результатів може чекати в черзі, поки воркери не пригальмують (full())
+DEFAULT_HIGH_WATER = 50_000
+
+
+class ResultQueue:
+    """
+    Черга результатів між потоком воркера та GUI.
+    Воркер лише додає словники, а вкладка забирає їх пакетом по QTimer,
+    тож на один пакет припадає одне оновлення таблиці/графіка.
+    Черга не відкидає результатів: воркери, що можуть пригальмувати, не
+    запускають нових перевірок, поки full() (зворотний тиск), тож у черзі - не
+    більше high_water плюс перевірки, що вже були в польоті.
+    append/popleft у deque атомарні, тому окремий лок не потрібен.
+    """
+
+    def __init__(self, high_water=DEFAULT_HIGH_WATER):
+        self.high_water = high_water
+        self._items = deque()
+
+    def put(self, item):
+        self._items.append(item)
+
+    def full(self):
+        """Чи накопичилось не менше high_water результатів (споживач не встигає)."""
+        return len(self._items) >= self.high_water
+
+    def drain(self, limit=None):
+        """Забирає накопичене на цей момент, але не більше limit (None - усе)."""
+        items = self._items
+        count = len(items) if limit is None else min(limit, len(items))
+        return [items.popleft() for _ in range(count)]
+
+    def __len__(self):
+        return len(self._items)
\ No newline at end of file
@@ -0,0 +1,198 @@
+# session_store.py
+import json
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Куди за замовчуванням пишуться сесії вкладки Ping
+DEFAULT_SESSION_DIR = os.path.join(os.path.expanduser("~"), ".ping_tool", "sessions")
+SESSION_EXTENSION = ".pts"
+# Як часто накопичені записи скидаються на диск з fsync (секунди)
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+_MAGIC = b"PINGSES1"
+_VERSION = 1
+# Заголовок фіксованого розміру: записи починаються з цього зміщення
+HEADER_SIZE = 4096
+_HEADER_PREFIX = struct.Struct("<8sII")  # magic, version, довжина JSON
+
+STATUS_SUCCESS = 0
+STATUS_FAILED = 1
+
+# Один запис - 24 байти; порядок байтів зафіксовано, тож файл переноситься між машинами
+RECORD_DTYPE = np.dtype([
+    ("timestamp_ns", "<i8"),
+    ("seq", "<u4"),
+    ("latency", "<f4"),   # NaN для втрат
+    ("lateness", "<f4"),  # мс
+    ("host_id", "<u2"),
+    ("status", "u1"),
+    ("reserved", "u1"),
+])
+
+
+def new_session_path(directory=DEFAULT_SESSION_DIR):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, time.strftime("ping_%Y%m%d_%H%M%S") + SESSION_EXTENSION)
+
+
+def _pack_header(hosts, interval_ms):
+    meta = json.dumps({"hosts": list(hosts), "interval_ms": interval_ms,
+                       "started_ns": time.time_ns()}).encode("utf-8")
+    if _HEADER_PREFIX.size + len(meta) > HEADER_SIZE:
+        raise ValueError("Too many hosts for one session file")
+    header = _HEADER_PREFIX.pack(_MAGIC, _VERSION, len(meta)) + meta
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def _unpack_header(data):
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Not a ping session file")
+    magic, version, length = _HEADER_PREFIX.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not a ping session file")
+    start = _HEADER_PREFIX.size
+    return json.loads(data[start:start + length].decode("utf-8"))
+
+
+class SessionWriter:
+    """
+    Append-only запис сесії пінгу у бінарний файл із записами фіксованої ширини.
+    GUI лише перетворює пакет результатів на масив і кладе його в чергу;
+    запис на диск і fsync робить фоновий потік раз на flush_interval.
+    Після аварії у файлі лишаються всі записи до останнього fsync.
+    on_error(message) викликається з фонового потоку, якщо запис не вдався;
+    після цього запис сесії припиняється.
+    """
+
+    def __init__(self, path, hosts, interval_ms, flush_interval=DEFAULT_FLUSH_INTERVAL, on_error=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.failed = False
+        self._host_ids = {host: index for index, host in enumerate(hosts)}
+        self._file = open(path, 'wb')
+        self._file.write(_pack_header(hosts, interval_ms))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._pending = deque()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, results):
+        """Приймає пакет результатів у форматі вкладки Ping."""
+        if not results or self._stop.is_set():
+            return
+        records = np.zeros(len(results), dtype=RECORD_DTYPE)
+        failed = np.array([data["status"] == "Failed" for data in results])
+        records["timestamp_ns"] = [data["timestamp_ns"] for data in results]
+        records["seq"] = [data["seq"] for data in results]
+        records["latency"] = [data["delay"] for data in results]
+        records["latency"][failed] = np.nan
+        records["lateness"] = [data.get("lateness_ms", 0.0) for data in results]
+        records["host_id"] = [self._host_ids[data["host"]] for data in results]
+        records["status"] = np.where(failed, STATUS_FAILED, STATUS_SUCCESS)
+        self._pending.append(records)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        chunks = [self._pending.popleft() for _ in range(len(self._pending))]
+        if not chunks or self._file.closed:
+            return
+        try:
+            self._file.write(np.concatenate(chunks).tobytes())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            self._stop.set()
+            self._report(e)
+
+    def _report(self, error):
+        # Про першу помилку повідомляємо один раз
+        if not self.failed:
+            self.failed = True
+            if self.on_error is not None:
+                self.on_error(str(error))
+
+    def close(self):
+        """Дописує залишок і закриває файл."""
+        self._stop.set()
+        self._thread.join()
+        try:
+            self._file.close()
+        except OSError as e:
+            # Буфер, що не записався, close() намагається дописати ще раз
+            self._report(e)
+
+
+def read_session(path):
+    """
+    Повертає (meta, records): meta - словник із hosts/interval_ms/started_ns,
+    records - np.memmap лише для читання (без розбору тексту й без копіювання).
+    Неповний останній запис (обрив під час запису) відкидається.
+    """
+    with open(path, 'rb') as f:
+        meta = _unpack_header(f.read(HEADER_SIZE))
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count <= 0:
+        return meta, np.zeros(0, dtype=RECORD_DTYPE)
+    return meta, np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+
+def local_times(timestamps_ns, with_ms, with_date=False):
+    """
+    [YYYY-MM-DD ]HH:MM:SS[.mmm] для масиву міток у нс; векторно, якщо зсув
+    часового поясу в межах масиву сталий.
+    """
+    if not len(timestamps_ns):
+        return []
+    offsets = {time.localtime(int(ts) / 1e9).tm_gmtoff for ts in (timestamps_ns[0], timestamps_ns[-1])}
+    if len(offsets) == 1:
+        local_ms = np.asarray(timestamps_ns) // 1_000_000 + offsets.pop() * 1000
+        start, end = (0 if with_date else 11), (23 if with_ms else 19)
+        texts = np.datetime_as_string(local_ms.astype("datetime64[ms]")).tolist()
+        if with_date:
+            return [text[start:end].replace("T", " ") for text in texts]
+        return [text[start:end] for text in texts]
+    # Перехід на літній/зимовий час усередині масиву - рахуємо кожну мітку окремо
+    fmt = "%Y-%m-%d %H:%M:%S" if with_date else "%H:%M:%S"
+    times = []
+    for timestamp_ns in np.asarray(timestamps_ns).tolist():
+        sent_at = timestamp_ns / 1e9
+        current_time = time.strftime(fmt, time.localtime(sent_at))
+        if with_ms:
+            current_time += f".{int(sent_at * 1000) % 1000:03d}"
+        times.append(current_time)
+    return times
+
+
+def session_results(meta, records):
+    """Записи сесії у форматі результатів вкладки Ping (для таблиці History)."""
+    hosts = meta["hosts"]
+    times = local_times(records["timestamp_ns"], meta.get("interval_ms", 1000) < 1000)
+    delays = np.round(records["latency"].astype(np.float64), 1).tolist()
+    return [
+        {
+            "seq": seq,
+            "host": hosts[host_id],
+            "time": current_time,
+            "timestamp_ns": timestamp_ns,
+            "lateness_ms": lateness,
+            "delay": -1 if status == STATUS_FAILED else delay,
+            "status": "Failed" if status == STATUS_FAILED else "Success",
+            "error_message": ""
+        }
+        for seq, current_time, timestamp_ns, lateness, delay, host_id, status in zip(
+            records["seq"].tolist(), times, records["timestamp_ns"].tolist(), records["lateness"].tolist(),
+            delays, records["host_id"].tolist(), records["status"].tolist())
+    ]
\ No newline at end of file
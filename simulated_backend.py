@@ -0,0 +1,233 @@
+# simulated_backend.py
+"""
+Симульована мережа для AsyncProbeEngine: без root, без мережі, відтворювано.
+Усе випадкове - хеш від (seed, адреса, номер перевірки хоста), тож той самий seed
+дає ті самі RTT, втрати та відмови незалежно від порядку й темпу перевірок.
+Номер перевірки та стан серії втрат рахуються окремо для кожного сокета, тобто
+для кожного запуску рушія: повторний запуск чи інша вкладка починають з нуля.
+Спільні лише тип хоста й базовий RTT - вони залежать тільки від seed і адреси.
+
+    PING_TOOL_BACKEND="simulated:seed=42,loss=0.02,dead=0.1" python main.py
+    python -m cli --backend simulated:seed=1 10.0.0.1 10.0.0.2
+
+Модель хоста: базовий RTT (логнормальний розкид навколо rtt_ms), відносний джитер
+кожної відповіді, випадкові втрати та серії втрат (модель Гілберта-Еліота:
+burst_rate - ймовірність початку серії, burst_length - середня довжина),
+частка мертвих хостів та хостів, що відповідають Destination Unreachable.
+Імена хостів розв'язуються в 198.18.0.0/15, частка dns_failure - з помилкою.
+permission_error - ймовірність, що відкриття сокета буде заборонено (як без root).
+"""
+import asyncio
+import hashlib
+import ipaddress
+import math
+import socket
+import struct
+import time
+
+from icmplib import exceptions as icmp_exceptions
+from dns_cache import parse_ip
+from perf_monitor import perf
+
+_ECHO_REPLY_TYPES = {socket.AF_INET: 0, socket.AF_INET6: 129}
+_UNREACHABLE_TYPES = {socket.AF_INET: 3, socket.AF_INET6: 1}
+# Мережа для розв'язаних імен (RFC 2544, зарезервована для тестів)
+_NAME_NETWORK = ipaddress.ip_network("198.18.0.0/15")
+_UNIT = 1 / 2 ** 64
+
+# Типи хостів
+_ALIVE, _DEAD, _UNREACHABLE = range(3)
+
+
+def _uniforms(*key):
+    """Три незалежні рівномірні числа з [0, 1), детерміновані для ключа."""
+    digest = hashlib.blake2b("\0".join(map(str, key)).encode("utf-8"), digest_size=24).digest()
+    return [value * _UNIT for value in struct.unpack("<3Q", digest)]
+
+
+def _normal(first, second):
+    """Стандартне нормальне число з двох рівномірних (Бокс-Мюллер)."""
+    return math.sqrt(-2 * math.log(1 - first)) * math.cos(2 * math.pi * second)
+
+
+class _SimulatedReply:
+    __slots__ = ("type",)
+
+    def __init__(self, reply_type):
+        self.type = reply_type
+
+
+class _ProbeState:
+    """Лічильник перевірок хоста та стан серії втрат у межах одного сокета."""
+    __slots__ = ("probes", "in_burst")
+
+    def __init__(self):
+        self.probes = 0
+        self.in_burst = False
+
+
+class SimulatedResolver:
+    """Те саме, що DNSCache (resolve/resolve_many/prefetch), але без мережі."""
+
+    def __init__(self, seed, dns_failure):
+        self.seed = seed
+        self.dns_failure = dns_failure
+
+    async def resolve(self, name):
+        literal = parse_ip(name)
+        if literal is not None:
+            return literal
+        failure, offset, _ = _uniforms(self.seed, "dns", name)
+        if failure < self.dns_failure:
+            raise socket.gaierror(f"[Errno -2] Name or service not known (simulated): {name}")
+        ip = _NAME_NETWORK[int(offset * _NAME_NETWORK.num_addresses)]
+        return socket.AF_INET, str(ip)
+
+    async def resolve_many(self, names):
+        pass  # Розв'язання миттєве, кешувати нічого
+
+    def prefetch(self, names):
+        pass
+
+
+class _SimulatedSocket:
+    """Інтерфейс _SharedSocket: відповіді доставляються в pending через call_later."""
+
+    def __init__(self, backend, family):
+        self.family = family
+        self.pending = {}
+        self._backend = backend
+        self._next_sequence = 0
+        self._states = {}  # ip -> _ProbeState; сокет використовує лише потік свого рушія
+
+    def next_sequence(self):
+        while True:
+            self._next_sequence = self._next_sequence % 0xFFFF + 1
+            if self._next_sequence not in self.pending:
+                return self._next_sequence
+
+    async def send(self, ip, sequence):
+        sent_at = time.perf_counter()
+        state = self._states.get(ip)
+        if state is None:
+            state = self._states[ip] = _ProbeState()
+        reply = self._backend.reply_for(ip, self.family, state)
+        future = self.pending.get(sequence)
+        if reply is not None and future is not None:
+            reply_type, rtt = reply
+            asyncio.get_running_loop().call_later(
+                rtt, self._deliver, future, _SimulatedReply(reply_type), sent_at + rtt)
+        if perf.enabled:
+            perf.record("probe.send", time.perf_counter() - sent_at)
+        return sent_at
+
+    def _deliver(self, future, reply, received_at):
+        # Майбутнє прив'язане до конкретного запиту: повторно використаний номер не отримає чужої відповіді
+        if not future.done():
+            future.set_result((reply, received_at))
+
+    def close(self):
+        # Відповіді, що ще "летять", дістануться скасованим майбутнім і будуть відкинуті
+        for future in self.pending.values():
+            if not future.done():
+                future.cancel()
+        self.pending.clear()
+
+
+class SimulatedBackend:
+    """Бекенд AsyncProbeEngine із симульованою мережею (див. опис модуля)."""
+
+    # Параметри spec і їхні значення за замовчуванням
+    DEFAULTS = {
+        "seed": 0,
+        "rtt_ms": 20.0,
+        "rtt_spread": 0.5,    # sigma логнормального розкиду базового RTT між хостами
+        "jitter": 0.1,        # відносне стандартне відхилення RTT однієї відповіді
+        "loss": 0.01,
+        "burst_rate": 0.002,
+        "burst_length": 5.0,
+        "dead": 0.05,
+        "unreachable": 0.01,
+        "dns_failure": 0.02,
+        "permission_error": 0.0,
+    }
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown simulated backend parameters: {', '.join(sorted(unknown))}")
+        values = dict(self.DEFAULTS, **params)
+        for key, value in values.items():
+            setattr(self, key, int(value) if key == "seed" else float(value))
+        for key in ("loss", "burst_rate", "dead", "unreachable", "dns_failure", "permission_error"):
+            if not 0 <= getattr(self, key) <= 1:
+                raise ValueError(f"{key} must be between 0 and 1")
+        if self.rtt_ms <= 0 or self.burst_length < 1:
+            raise ValueError("rtt_ms must be positive and burst_length at least 1")
+        self._params = values
+        self.resolver = SimulatedResolver(self.seed, self.dns_failure)
+        # ip -> (тип, базовий RTT у с): залежить лише від seed, тож гонка потоків
+        # щонайбільше порахує той самий запис двічі
+        self._profiles = {}
+        self._sockets_opened = 0
+
+    @classmethod
+    def from_spec(cls, params):
+        """"seed=42,loss=0.02" -> SimulatedBackend. Кидає ValueError."""
+        values = {}
+        for item in filter(None, (part.strip() for part in params.split(","))):
+            key, separator, value = item.partition("=")
+            if not separator:
+                raise ValueError(f"Expected key=value, got: {item}")
+            values[key.strip()] = float(value)
+        return cls(**values)
+
+    @property
+    def spec(self):
+        """Рядок для backend_from_spec (так бекенд передається процесам-шардам)."""
+        return "simulated:" + ",".join(f"{key}={value}" for key, value in self._params.items())
+
+    def open_socket(self, family, icmp_id, privileged):
+        self._sockets_opened += 1
+        if _uniforms(self.seed, "socket", self._sockets_opened)[0] < self.permission_error:
+            raise icmp_exceptions.SocketPermissionError(bool(privileged))
+        return _SimulatedSocket(self, family)
+
+    def _profile(self, ip):
+        profile = self._profiles.get(ip)
+        if profile is None:
+            kind_draw, rtt_a, rtt_b = _uniforms(self.seed, "host", ip)
+            if kind_draw < self.dead:
+                kind = _DEAD
+            elif kind_draw < self.dead + self.unreachable:
+                kind = _UNREACHABLE
+            else:
+                kind = _ALIVE
+            base_rtt = self.rtt_ms / 1000 * math.exp(self.rtt_spread * _normal(rtt_a, rtt_b))
+            profile = self._profiles[ip] = (kind, base_rtt)
+        return profile
+
+    def reply_for(self, ip, family, state):
+        """
+        (тип ICMP-відповіді, RTT у с) для чергової перевірки хоста, або None - втрата.
+        state - _ProbeState хоста в сокеті, що надсилає перевірку.
+        """
+        kind, base_rtt = self._profile(ip)
+        probe = state.probes
+        state.probes += 1
+        if kind == _DEAD:
+            return None
+        if kind == _UNREACHABLE:
+            return _UNREACHABLE_TYPES[family], base_rtt
+        state_draw, jitter_a, jitter_b = _uniforms(self.seed, "probe", ip, probe)
+        if state.in_burst:
+            state.in_burst = state_draw >= 1 / self.burst_length
+            return None
+        if state_draw < self.burst_rate:
+            state.in_burst = True
+            return None
+        # Той самий рівномірний відрізок, що й для серій, - зсунутий, щоб події не корелювали
+        if (state_draw - self.burst_rate) / (1 - self.burst_rate) < self.loss:
+            return None
+        rtt = base_rtt * max(0.05, 1 + self.jitter * _normal(jitter_a, jitter_b))
+        return _ECHO_REPLY_TYPES[family], rtt
\ No newline at end of file
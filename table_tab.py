@@ -1,26 +1,37 @@
 # table_tab.py
-import csv
-import time
-from PyQt6.QtWidgets import (
-    QWidget, QTableWidgetItem, QFileDialog, QApplication
-)
-from PyQt6.QtGui import QFont, QColor
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QFileDialog, QApplication
+from PyQt6.QtCore import pyqtSignal
 import qtawesome as qta
+from history_model import COLUMNS, COL_TIME, DEFAULT_HISTORY_ROWS, record_cell_text
+from export_worker import start_csv_export
+from custom_dialogs import CustomMessageBox
+from perf_monitor import perf
 
 # --- Новий імпорт ---
 from ui import Ui_TableTab
 
 
+def _history_csv_rows(records):
+    """Рядки CSV зі знімка історії (виконується в потоці експорту)."""
+    for record in records:
+        row_data = [record_cell_text(record, col) for col in range(len(COLUMNS))]
+        row_data[COL_TIME] = f"'{row_data[COL_TIME]}"
+        yield row_data
+
+
 class TableTab(QWidget):
     toggle_ping_requested = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, max_rows=DEFAULT_HISTORY_ROWS):
         super().__init__()
 
         # Створюємо UI
         self.ui = Ui_TableTab()
         self.ui.setupUi(self)
+        if max_rows != self.ui.model.max_rows:
+            self.ui.model.set_max_rows(max_rows)
+
+        self.export_worker = None
 
         # Встановлюємо початковий стиль
         self.update_toggle_button_style(False)
@@ -47,58 +58,33 @@ class TableTab(QWidget):
             """)
 
     def add_ping_result(self, data: dict):
-        self.ui.table.insertRow(0)
+        self.add_ping_results([data])
 
-        seq = QTableWidgetItem(str(data.get("seq", "")))
-        timestamp = QTableWidgetItem(data.get("time", ""))
-        host = QTableWidgetItem(data.get("host", ""))
-        status = QTableWidgetItem(data.get("status", ""))
-        delay = QTableWidgetItem(str(data.get("delay", "")))
+    @perf.timed("history.add_results")
+    def add_ping_results(self, results: list):
+        # Модель вставляє весь пакет на початок одним beginInsertRows
+        self.ui.model.add_results(results)
 
-        for item in [seq, timestamp, host, status, delay]:
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        if data.get("status") == "Success":
-            status.setForeground(QColor("#1D672D"))
-            delay_val = data.get("delay")
-            delay.setText(f"{delay_val:.1f}")
-        else:
-            status.setForeground(QColor("#B3261E"))
-            delay.setText("—")
-
-        self.ui.table.setItem(0, 0, seq)
-        self.ui.table.setItem(0, 1, timestamp)
-        self.ui.table.setItem(0, 2, host)
-        self.ui.table.setItem(0, 3, status)
-        self.ui.table.setItem(0, 4, delay)
+    def set_max_rows(self, max_rows):
+        self.ui.model.set_max_rows(max_rows)
 
     def clear_table(self):
-        self.ui.table.setRowCount(0)
+        self.ui.model.clear()
 
     def copy_selection(self):
-        selection = self.ui.table.selectedIndexes()
+        selection = self.ui.table.selectionModel().selectedIndexes()
         if not selection:
             return
-        rows = sorted(list(set(index.row() for index in selection)))
-        clipboard_text = []
-        for row in rows:
-            row_data = [self.ui.table.item(row, col).text() for col in range(self.ui.table.columnCount())]
-            clipboard_text.append("\t".join(row_data))
+        rows = sorted(set(index.row() for index in selection))
+        clipboard_text = ["\t".join(self.ui.model.row_text(row)) for row in rows]
         QApplication.clipboard().setText("\n".join(clipboard_text))
 
     def export_to_csv(self):
+        if self.export_worker is not None and self.export_worker.isRunning():
+            CustomMessageBox.show_info(self, "Export", "An export is already in progress.")
+            return
         path, _ = QFileDialog.getSaveFileName(self, "Export to CSV", f"ping_history.csv", "CSV Files (*.csv)")
         if path:
-            try:
-                with open(path, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file, delimiter=';')
-                    headers = [self.ui.table.horizontalHeaderItem(i).text() for i in range(self.ui.table.columnCount())]
-                    writer.writerow(headers)
-
-                    for row in range(self.ui.table.rowCount()):
-                        row_data = [self.ui.table.item(row, col).text() for col in range(self.ui.table.columnCount())]
-                        if len(row_data) > 1:
-                            row_data[1] = f"'{row_data[1]}"
-                        writer.writerow(row_data)
-            except Exception as e:
-                print(f"Error exporting to CSV: {e}")
\ No newline at end of file
+            # Знімок буфера моделі; текст формується вже у потоці експорту
+            records = self.ui.model.snapshot()
+            self.export_worker = start_csv_export(self, path, COLUMNS, _history_csv_rows(records), len(records))
\ No newline at end of file
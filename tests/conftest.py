@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# Модулі застосунку лежать у корені репозиторію, а не в пакеті
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
\ No newline at end of file
@@ -0,0 +1,53 @@
+# test_host_import.py
+import ipaddress
+
+import pytest
+
+from host_import import sweep_targets, parse_host_lines, expand_entry, MAX_SWEEP_HOSTS
+
+
+@pytest.mark.parametrize("cidr", [
+    "10.0.0.0/24", "10.0.0.0/30", "10.0.0.0/31", "10.0.0.7/32",
+    "fd00::/120", "fd00::/126", "fd00::/127", "fd00::1/128",
+])
+def test_sweep_count_matches_generated_addresses(cidr):
+    count, targets = sweep_targets(cidr)
+    assert count == len(list(targets))
+
+
+def test_sweep_ipv6_skips_only_subnet_router_anycast():
+    count, targets = sweep_targets("fd00::/120")
+    targets = list(targets)
+    assert count == 255
+    assert "fd00::" not in targets
+    assert targets[-1] == "fd00::ff"
+
+
+def test_sweep_ipv4_skips_network_and_broadcast():
+    count, targets = sweep_targets("192.168.1.77/24")
+    targets = list(targets)
+    assert count == 254
+    assert targets[0] == "192.168.1.1" and targets[-1] == "192.168.1.254"
+
+
+def test_sweep_rejects_too_large_network():
+    prefix = 32 - MAX_SWEEP_HOSTS.bit_length()
+    with pytest.raises(ValueError):
+        sweep_targets(f"10.0.0.0/{prefix}")
+
+
+def test_parse_host_lines_expands_and_deduplicates():
+    result = parse_host_lines([
+        "10.0.0.1, 10.0.0.2  # коментар",
+        "10.0.0.1-3; Example.COM.",
+        "300.1.1.1 bad_host! 10.0.0.0/30",
+        "",
+    ], existing=["10.0.0.2"])
+    assert result.hosts == ["10.0.0.1", "10.0.0.3", "example.com"]
+    # 10.0.0.2 (є в existing), 10.0.0.1 і 10.0.0.2 з діапазону, обидва хости /30
+    assert result.duplicates == 5
+    assert [entry for entry, _ in result.invalid] == ["300.1.1.1", "bad_host!"]
+
+
+def test_expand_entry_normalizes_ipv6():
+    assert list(expand_entry("FD00:0::1")) == [str(ipaddress.ip_address("fd00::1"))]
\ No newline at end of file
@@ -0,0 +1,76 @@
+# test_host_stats.py
+import numpy as np
+import pytest
+
+from host_stats import HostStatsTable
+from latency_stats import LatencyStats
+
+
+def _rounds(seed, hosts, rounds):
+    rng = np.random.default_rng(seed)
+    alive = rng.random((rounds, hosts)) > 0.2
+    rtt = rng.gamma(2.0, 5.0, (rounds, hosts))
+    return alive, rtt
+
+
+def test_batched_record_matches_per_host_reference():
+    addresses = [f"10.0.0.{i}" for i in range(1, 41)]
+    alive, rtt = _rounds(3, len(addresses), 30)
+    table = HostStatsTable(capacity=4, percentiles=True)
+    table.add(addresses)
+    ids = table.ids(addresses)
+    # Два раунди в одному пакеті: той самий хост трапляється двічі
+    for start in range(0, len(alive), 2):
+        table.record(np.concatenate([ids, ids]), alive[start:start + 2].ravel(), rtt[start:start + 2].ravel())
+
+    for column, address in enumerate(addresses):
+        host_alive, host_rtt = alive[:, column], rtt[:, column]
+        reference = LatencyStats()
+        for value in host_rtt[host_alive].tolist():
+            reference.record(value)
+        summary = table.summary(address)
+        assert summary["sent"] == len(host_alive)
+        assert summary["received"] == host_alive.sum()
+        assert summary["jitter"] == pytest.approx(reference.jitter, rel=1e-4)
+        assert summary["avg_rtt"] == pytest.approx(host_rtt[host_alive].mean())
+        assert summary["min_rtt"] == pytest.approx(host_rtt[host_alive].min(), rel=1e-6)
+        assert [summary["p50"], summary["p95"], summary["p99"]] == reference.percentiles((50, 95, 99))
+        failures = len(host_alive) - (np.flatnonzero(host_alive)[-1] + 1 if host_alive.any() else 0)
+        assert summary["consecutive_failures"] == failures
+
+
+def test_recent_loss_and_queries():
+    table = HostStatsTable()
+    table.add(["a", "b"])
+    ids = table.ids(["a", "b"])
+    for alive_b in (True, False, False, False):
+        table.record(ids, [True, alive_b], [1.0, 1.0])
+    assert table.recent_loss_percent(probes=4, ids=ids).tolist() == [0.0, 75.0]
+    assert table.failing_hosts(min_consecutive=3) == ["b"]
+    assert table.hosts_with_loss(50, probes=4) == ["b"]
+
+
+def test_percentiles_are_opt_in():
+    table = HostStatsTable()
+    table.add(["a"])
+    ids = table.ids(["a"])
+    table.record(ids, [True], [5.0])
+    assert table.latency_stats(ids[0]) is None
+    assert table.summary("a")["p50"] is None
+
+    table.enable_percentiles()
+    table.record(ids, [True], [5.0])
+    assert table.latency_stats(ids[0]).count == 1
+    table.enable_percentiles(False)
+    assert table.latency_stats(ids[0]) is None
+
+
+def test_removed_id_is_reused_with_clean_stats():
+    table = HostStatsTable()
+    table.add(["a", "b"])
+    table.record(table.ids(["a", "b"]), [False, True], [0.0, 2.0])
+    table.remove(["a"])
+    assert table.ids(["a"]).tolist() == [-1]
+    table.add(["c"])
+    assert table.summary("c") is None
+    assert table.sent(table.ids(["c"])).tolist() == [0]
\ No newline at end of file
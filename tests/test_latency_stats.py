@@ -0,0 +1,58 @@
+# test_latency_stats.py
+import math
+
+import numpy as np
+import pytest
+
+from latency_stats import LatencyStats, DEFAULT_RELATIVE_ACCURACY
+
+PERCENTS = (1, 10, 50, 90, 95, 99, 99.9)
+
+
+def _exact(values, percent):
+    # Той самий ранг, що й у скетчі: найменше значення, не менше за percent% вибірки
+    ordered = np.sort(values)
+    return ordered[max(1, math.ceil(percent / 100 * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_sketch_percentiles_within_relative_accuracy(seed):
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([rng.lognormal(1.0, 0.6, 5000), rng.uniform(50, 400, 200)])
+    stats = LatencyStats()
+    for value in values.tolist():
+        stats.record(value)
+    for percent, estimate in zip(PERCENTS, stats.percentiles(PERCENTS)):
+        exact = _exact(values, percent)
+        assert abs(estimate - exact) <= DEFAULT_RELATIVE_ACCURACY * exact * (1 + 1e-9)
+
+
+def test_record_many_matches_record():
+    rng = np.random.default_rng(7)
+    first, second = rng.gamma(2.0, 3.0, 300), rng.gamma(2.0, 3.0, 300)
+    second[::17] = np.nan
+    one_by_one, batched = LatencyStats(), LatencyStats()
+    for value in np.concatenate([first, second]).tolist():
+        if not math.isnan(value):
+            one_by_one.record(value)
+    batched.record_many(first)
+    batched.record_many(second)
+
+    assert batched.count == one_by_one.count
+    assert batched._buckets == one_by_one._buckets
+    assert batched.jitter == pytest.approx(one_by_one.jitter, rel=1e-9)
+    assert batched.percentiles(PERCENTS) == one_by_one.percentiles(PERCENTS)
+
+
+def test_jitter_follows_rfc3550_filter():
+    stats = LatencyStats()
+    for value in (10.0, 14.0, 12.0):
+        stats.record(value)
+    expected = 0.0
+    expected += (4.0 - expected) / 16
+    expected += (2.0 - expected) / 16
+    assert stats.jitter == pytest.approx(expected)
+
+
+def test_empty_sketch_has_no_percentiles():
+    assert LatencyStats().percentiles([50, 99]) == [None, None]
\ No newline at end of file
@@ -0,0 +1,53 @@
+# test_ping_series.py
+import math
+
+import numpy as np
+import pytest
+
+from ping_series import PingSeries
+
+
+def _samples(seed, count, loss_every=11):
+    rng = np.random.default_rng(seed)
+    latency = rng.gamma(3.0, 4.0, count).astype(np.float32)
+    latency[::loss_every] = np.nan
+    times = np.arange(count, dtype=np.int64) * 1_000_000
+    return times, latency, np.zeros(count, dtype=np.float32)
+
+
+def _assert_matches_direct(series, latency):
+    ok = latency[~np.isnan(latency)].astype(np.float64)
+    assert series.sent == len(latency)
+    assert series.received == len(ok)
+    assert series.min == pytest.approx(ok.min())
+    assert series.max == pytest.approx(ok.max())
+    assert series.mean == pytest.approx(ok.mean(), rel=1e-12)
+    assert series.variance == pytest.approx(ok.var(ddof=1), rel=1e-9)
+    assert series.stddev == pytest.approx(ok.std(ddof=1), rel=1e-9)
+
+
+def test_extend_chan_merge_matches_direct_computation():
+    series = PingSeries()
+    blocks = [_samples(seed, count) for seed, count in ((1, 1), (2, 500), (3, 37), (4, 2000))]
+    for times, latency, lateness in blocks:
+        series.extend(times, latency, lateness)
+    _assert_matches_direct(series, np.concatenate([latency for _, latency, _ in blocks]))
+
+
+def test_extend_after_append_matches_direct_computation():
+    series = PingSeries()
+    times, latency, lateness = _samples(5, 600)
+    for timestamp, value in zip(times[:100].tolist(), latency[:100].tolist()):
+        series.append(timestamp, None if math.isnan(value) else value)
+    series.extend(times[100:], latency[100:], lateness[100:])
+    _assert_matches_direct(series, latency)
+    assert np.array_equal(series.lost, np.isnan(latency))
+
+
+def test_extend_with_only_losses_keeps_stats():
+    series = PingSeries()
+    series.extend(*_samples(6, 50))
+    mean, variance = series.mean, series.variance
+    series.extend(np.arange(3, dtype=np.int64), np.full(3, np.nan, dtype=np.float32), np.zeros(3, dtype=np.float32))
+    assert (series.mean, series.variance) == (mean, variance)
+    assert series.lost_count == 50 - series.received + 3
\ No newline at end of file
@@ -0,0 +1,182 @@
+# test_probe_engine.py
+import asyncio
+import socket
+
+import pytest
+
+import probe_engine
+from probe_engine import (AsyncProbeEngine, TokenBucket, RttEstimator, BackoffScheduler, ping_record,
+                          _echo_request, _parse_reply)
+from simulated_backend import SimulatedBackend
+
+
+class _BrokenBackend(SimulatedBackend):
+    def open_socket(self, family, icmp_id, privileged):
+        raise RuntimeError("socket table full")
+
+
+def test_probe_errors_go_into_the_result_not_stdout(capsys):
+    async def probe():
+        async with AsyncProbeEngine(backend=_BrokenBackend()) as engine:
+            return await engine.probe("10.0.0.1")
+
+    result = asyncio.run(probe())
+    assert (result["status_text"], result["error"]) == ("Unexpected Error", "socket table full")
+    assert capsys.readouterr().out == ""
+    record = ping_record("10.0.0.1", 1, result, 0, 0.0, 1000)
+    assert record["error_message"] == "Ping error: Unexpected Error (socket table full)"
+
+
+def _ipv4(payload, words=5):
+    # Мінімальний IPv4-заголовок (words 32-бітних слів); поля, крім IHL, розбору не потрібні
+    return bytes([0x40 | words]) + bytes(words * 4 - 1) + payload
+
+
+def _echo_reply(family, icmp_id, sequence):
+    request = _echo_request(family, icmp_id, sequence)
+    return bytes([0 if family == socket.AF_INET else 129, 0]) + request[2:]
+
+
+@pytest.mark.parametrize("packet, ip_header", [
+    (_echo_reply(socket.AF_INET, 0x1234, 77), False),
+    (_ipv4(_echo_reply(socket.AF_INET, 0x1234, 77)), True),
+    (_ipv4(_echo_reply(socket.AF_INET, 0x1234, 77), words=6), True),
+])
+def test_parse_ipv4_echo_reply(packet, ip_header):
+    reply = _parse_reply(socket.AF_INET, packet, ip_header)
+    assert (reply.type, reply.code, reply.id, reply.sequence) == (0, 0, 0x1234, 77)
+
+
+def test_parse_ipv6_echo_reply():
+    reply = _parse_reply(socket.AF_INET6, _echo_reply(socket.AF_INET6, 7, 65535), False)
+    assert (reply.type, reply.id, reply.sequence) == (129, 7, 65535)
+
+
+def test_parse_errors_match_the_embedded_request():
+    request4 = _echo_request(socket.AF_INET, 0x1234, 77)
+    unreachable4 = _ipv4(bytes([3, 1]) + bytes(6) + _ipv4(request4[:8]))
+    reply = _parse_reply(socket.AF_INET, unreachable4, True)
+    assert (reply.type, reply.code, reply.id, reply.sequence) == (3, 1, 0x1234, 77)
+
+    request6 = _echo_request(socket.AF_INET6, 0x1234, 78)
+    unreachable6 = bytes([1, 3]) + bytes(6) + bytes(40) + request6[:8]
+    reply = _parse_reply(socket.AF_INET6, unreachable6, False)
+    assert (reply.type, reply.code, reply.id, reply.sequence) == (1, 3, 0x1234, 78)
+
+
+@pytest.mark.parametrize("family, packet, ip_header", [
+    # Власний запит, який сирий сокет бачить на loopback
+    (socket.AF_INET, _ipv4(_echo_request(socket.AF_INET, 1, 1)), True),
+    (socket.AF_INET6, _echo_request(socket.AF_INET6, 1, 1), False),
+    # Помилка про чужий UDP-пакет
+    (socket.AF_INET, _ipv4(bytes([3, 3]) + bytes(6) + _ipv4(bytes(8))), True),
+    # Обрізані пакети
+    (socket.AF_INET, _echo_reply(socket.AF_INET, 1, 1)[:7], False),
+    (socket.AF_INET, b"", True),
+    (socket.AF_INET6, bytes([1, 0]) + bytes(6) + bytes(20), False),
+])
+def test_parse_ignores_foreign_and_truncated_packets(family, packet, ip_header):
+    assert _parse_reply(family, packet, ip_header) is None
+
+
+def _run(coroutine):
+    # Підмінений sleep нічого не чекає, тож корутина завершується за один крок
+    try:
+        coroutine.send(None)
+    except StopIteration:
+        return
+    raise AssertionError("coroutine suspended")
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.slept.append(delay)
+        self.now += delay
+
+
+def test_token_bucket_paces_after_burst(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(probe_engine.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(probe_engine.asyncio, "sleep", clock.sleep)
+    bucket = TokenBucket(rate=100, burst=5)
+    for _ in range(5):
+        _run(bucket.acquire())
+    assert clock.slept == []
+    for _ in range(3):
+        _run(bucket.acquire())
+    assert clock.slept == pytest.approx([0.01, 0.01, 0.01])
+
+
+def test_token_bucket_refills_up_to_burst(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(probe_engine.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(probe_engine.asyncio, "sleep", clock.sleep)
+    bucket = TokenBucket(rate=10, burst=2)
+    clock.now += 60
+    for _ in range(3):
+        _run(bucket.acquire())
+    assert clock.slept == pytest.approx([0.1])
+
+
+def test_rtt_estimator_follows_rfc6298():
+    estimator = RttEstimator(initial=1.0, floor=0.0, ceiling=10.0)
+    assert estimator.timeout == 1.0
+    estimator.observe(0.1)
+    assert (estimator.srtt, estimator.rttvar) == (0.1, 0.05)
+    assert estimator.timeout == pytest.approx(0.1 + 4 * 0.05)
+    estimator.observe(0.3)
+    rttvar = 0.75 * 0.05 + 0.25 * 0.2
+    srtt = 0.875 * 0.1 + 0.125 * 0.3
+    assert estimator.timeout == pytest.approx(srtt + 4 * rttvar)
+
+
+def test_rtt_estimator_clamps_timeout():
+    estimator = RttEstimator(initial=1.0, floor=0.2, ceiling=5.0)
+    estimator.observe(0.001)
+    assert estimator.timeout == 0.2
+    for _ in range(20):
+        estimator.observe(30.0)
+    assert estimator.timeout == 5.0
+
+
+def test_silent_host_uses_subnet_then_overall_estimate():
+    overall = RttEstimator(1.0, 0.2, 5.0)
+    subnet_a = RttEstimator(1.0, 0.2, 5.0, fallback=overall)
+    subnet_b = RttEstimator(1.0, 0.2, 5.0, fallback=overall)
+    alive = RttEstimator(1.0, 0.2, 5.0, fallback=subnet_a)
+    silent_a = RttEstimator(1.0, 0.2, 5.0, fallback=subnet_a)
+    silent_b = RttEstimator(1.0, 0.2, 5.0, fallback=subnet_b)
+    assert silent_a.timeout == silent_b.timeout == 1.0
+
+    alive.observe(0.002)
+    # Сусід по підмережі відповів - мертвий хост чекає стільки ж, скільки він
+    assert silent_a.timeout == alive.timeout == 0.2
+    # Ніхто з підмережі не відповідав - загальна оцінка
+    assert silent_b.timeout == overall.timeout == 0.2
+
+
+def test_backoff_doubles_up_to_limit():
+    scheduler = BackoffScheduler(interval=1, max_backoff=10, backoff_after=3)
+    assert [scheduler.backoff_for(failures) for failures in range(7)] == [None, None, None, 2, 4, 8, 10]
+
+
+def test_backoff_limit_is_at_least_interval():
+    assert BackoffScheduler(interval=30, max_backoff=10).max_backoff == 30
+
+
+def test_new_hosts_are_spread_over_interval():
+    scheduler = BackoffScheduler(interval=2)
+    scheduler.add(["a", "b", "a", "c", "d"])
+    scheduler._apply_changes(now=50.0)
+    due = sorted((entry[0], entry[2]) for entry in scheduler._heap)
+    assert due == [(50.0, "a"), (50.5, "b"), (51.0, "c"), (51.5, "d")]
+    scheduler.remove(["b"])
+    scheduler._apply_changes(now=50.0)
+    assert set(scheduler._hosts) == {"a", "c", "d"}
\ No newline at end of file
@@ -0,0 +1,32 @@
+# test_result_db.py
+import pytest
+
+from result_db import ResultDatabase
+
+
+def test_rounds_are_queryable_after_close(tmp_path):
+    database = ResultDatabase(str(tmp_path / "r.sqlite3"))
+    database.add_round([(1, 1, "a", 100, 1.5, "Success"), (1, 1, "b", 100, None, "Request timed out")])
+    database.add_round([(1, 2, "a", 200, 2.5, "Success"), (1, 2, "b", 200, None, "Request timed out")])
+    database.close()
+
+    assert database.host_history("a") == [(100, 1.5, "Success"), (200, 2.5, "Success")]
+    assert database.host_history("a", limit=1) == [(200, 2.5, "Success")]
+    summary = database.host_summary("b")
+    assert (summary["sent"], summary["received"], summary["failing_since_ns"]) == (2, 0, 100)
+    assert database.host_summary("c") is None
+    assert database.summaries(since_ns=150) == {"a": (1, 1, 2.5), "b": (1, 0, None)}
+
+
+def test_failed_insert_is_reported_once(tmp_path):
+    errors = []
+    database = ResultDatabase(str(tmp_path / "r.sqlite3"), on_error=errors.append)
+    # status NOT NULL - пакет відкидається цілком
+    database.add_round([(1, 1, "a", 100, 1.5, None)])
+    database.close()
+    assert len(errors) == 1 and database.failed
+    assert errors[0].startswith("1 results were not saved")
+    # Наступні помилки того ж сховища вже не показуються
+    database._report("again")
+    assert len(errors) == 1
+    assert database.host_history("a") == []
\ No newline at end of file
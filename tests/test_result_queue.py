@@ -0,0 +1,15 @@
+# test_result_queue.py
+from result_queue import ResultQueue
+
+
+def test_drain_is_bounded_and_ordered():
+    queue = ResultQueue(high_water=3)
+    for item in range(5):
+        queue.put(item)
+    assert queue.full()
+    assert queue.drain(limit=2) == [0, 1]
+    assert queue.full()
+    assert queue.drain(limit=1) == [2]
+    assert not queue.full()
+    assert queue.drain() == [3, 4]
+    assert len(queue) == 0
\ No newline at end of file
@@ -0,0 +1,59 @@
+# test_session_store.py
+import os
+
+import numpy as np
+import pytest
+
+from session_store import SessionWriter, read_session, session_results, HEADER_SIZE, RECORD_DTYPE
+
+
+def _result(host, seq, delay, status="Success"):
+    return {"host": host, "seq": seq, "timestamp_ns": 1_700_000_000_000_000_000 + seq * 1_000_000,
+            "delay": delay, "status": status, "lateness_ms": 0.5}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "s.pts")
+    writer = SessionWriter(path, ["a", "b"], interval_ms=500, flush_interval=0.01)
+    writer.append([_result("a", 1, 10.5), _result("b", 1, -1, "Failed")])
+    writer.append([_result("a", 2, 11.0)])
+    writer.close()
+
+    meta, records = read_session(path)
+    assert meta["hosts"] == ["a", "b"] and meta["interval_ms"] == 500
+    assert records["host_id"].tolist() == [0, 1, 0]
+    assert np.isnan(records["latency"][1])
+    results = session_results(meta, records)
+    assert [(r["host"], r["seq"], r["delay"], r["status"]) for r in results] == [
+        ("a", 1, 10.5, "Success"), ("b", 1, -1, "Failed"), ("a", 2, 11.0, "Success")]
+    assert all(r["time"].count(":") == 2 and "." in r["time"] for r in results)
+
+
+def test_truncated_record_is_dropped(tmp_path):
+    path = str(tmp_path / "s.pts")
+    writer = SessionWriter(path, ["a"], interval_ms=1000)
+    writer.append([_result("a", seq, 1.0) for seq in range(3)])
+    writer.close()
+    with open(path, "ab") as f:
+        f.write(b"\0" * (RECORD_DTYPE.itemsize // 2))
+    _, records = read_session(path)
+    assert len(records) == 3
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "x.pts"
+    path.write_bytes(b"\0" * HEADER_SIZE)
+    with pytest.raises(ValueError):
+        read_session(str(path))
+
+
+@pytest.mark.skipif(not os.path.exists("/dev/full"), reason="needs /dev/full")
+def test_write_error_is_reported_once(tmp_path):
+    errors = []
+    writer = SessionWriter(str(tmp_path / "s.pts"), ["a"], interval_ms=1000, flush_interval=3600,
+                           on_error=errors.append)
+    writer._file.close()
+    writer._file = open("/dev/full", "wb")
+    writer.append([_result("a", 1, 1.0)])
+    writer.close()
+    assert len(errors) == 1 and writer.failed
\ No newline at end of file
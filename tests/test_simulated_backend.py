@@ -0,0 +1,43 @@
+# test_simulated_backend.py
+import asyncio
+
+from probe_engine import AsyncProbeEngine
+from simulated_backend import SimulatedBackend
+
+HOSTS = [f"10.0.0.{i}" for i in range(1, 9)]
+
+
+def _backend():
+    # Висока частка втрат і серій, щоб послідовності відрізнялись між перевірками
+    return SimulatedBackend(seed=1, rtt_ms=1, rtt_spread=0, jitter=0, loss=0.3, burst_rate=0.1,
+                            dead=0, unreachable=0, dns_failure=0)
+
+
+async def _session(backend, rounds=6):
+    """Рядок S/F на хост за rounds раундів в одному запуску рушія."""
+    outcomes = {host: "" for host in HOSTS}
+    async with AsyncProbeEngine(timeout=0.05, adaptive_timeout=False, backend=backend) as engine:
+        for _ in range(rounds):
+            results = await asyncio.gather(*(engine.probe(host) for host in HOSTS))
+            for host, result in zip(HOSTS, results):
+                outcomes[host] += "S" if result["is_alive"] else "F"
+    return outcomes
+
+
+def test_same_seed_reproduces_across_runs():
+    backend = _backend()
+    first = asyncio.run(_session(backend))
+    assert asyncio.run(_session(backend)) == first
+    assert asyncio.run(_session(_backend())) == first
+    assert len(set(first.values())) > 1
+
+
+def test_concurrent_sessions_do_not_share_probe_counters():
+    backend = _backend()
+    alone = asyncio.run(_session(_backend()))
+
+    async def both():
+        return await asyncio.gather(_session(backend), _session(backend))
+
+    first, second = asyncio.run(both())
+    assert first == second == alone
\ No newline at end of file
@@ -3,13 +3,16 @@ import sys
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QStackedWidget, QCompleter, QLineEdit,
     QPushButton, QLabel, QGraphicsDropShadowEffect, QHBoxLayout, QFrame,
-    QGridLayout, QTableWidget, QHeaderView, QTableWidgetItem, QButtonGroup
+    QGridLayout, QTableView, QHeaderView, QButtonGroup
 )
-from PyQt6.QtGui import QFont, QIcon, QColor
+from PyQt6.QtGui import QFont, QIcon, QColor, QFontMetrics
 from PyQt6.QtCore import Qt, QStringListModel, QSize
 import qtawesome as qta
 import pyqtgraph as pg
 
+from ip_test_model import IPTestTableModel, COLUMNS, OPTIONAL_COLUMNS
+from history_model import HistoryTableModel
+
 
 # --- Імпорти для класів вкладок (потрібні для type hinting) ---
 # Ми не можемо імпортувати їх напряму, щоб уникнути циклічного імпорту,
@@ -112,7 +115,11 @@ class Ui_PingTab(object):
         self.export_btn.setIcon(qta.icon("mdi.camera", color="#49454F"))
         self.export_btn.setToolTip("Save screenshot of the tab")
 
-        for btn in [self.sound_btn, self.export_data_btn, self.export_btn]:
+        self.open_session_btn = QPushButton()
+        self.open_session_btn.setIcon(qta.icon("fa5s.folder-open", color="#49454F"))
+        self.open_session_btn.setToolTip("Open a recorded ping session")
+
+        for btn in [self.sound_btn, self.export_data_btn, self.export_btn, self.open_session_btn]:
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
             btn.setStyleSheet("""
                 QPushButton { background-color: #EADDFF; border-radius: 10px; padding: 4px; }
@@ -124,6 +131,7 @@ class Ui_PingTab(object):
         controls_layout.addWidget(self.sound_btn)
         controls_layout.addWidget(self.export_data_btn)
         controls_layout.addWidget(self.export_btn)
+        controls_layout.addWidget(self.open_session_btn)
 
         self.btn = QPushButton("Start Ping")
         self.btn.setFont(QFont("Segoe UI Semibold", 11))
@@ -171,37 +179,66 @@ class Ui_PingTab(object):
         self.min_label, self.min_value = stat_item("Min")
         self.max_label, self.max_value = stat_item("Max")
         self.avg_label, self.avg_value = stat_item("Avg")
-        stats_layout.addWidget(self.sent_label, 0, 0)
-        stats_layout.addWidget(self.sent_value, 1, 0)
-        stats_layout.addWidget(self.received_label, 0, 1)
-        stats_layout.addWidget(self.received_value, 1, 1)
-        stats_layout.addWidget(self.loss_label, 0, 2)
-        stats_layout.addWidget(self.loss_value, 1, 2)
-
-        line = QFrame()
-        line.setFrameShape(QFrame.Shape.HLine)
-        line.setFrameShadow(QFrame.Shadow.Plain)
-        line.setFixedHeight(1)
-        line.setStyleSheet("background-color: rgba(0, 0, 0, 0.10); border: none;")
-
-        line_layout = QVBoxLayout()
-        line_layout.setContentsMargins(0, 10, 0, 10)
-        line_layout.addWidget(line)
-
-        line_container = QWidget()
-        line_container.setStyleSheet("background-color: #ece6f0;")
-        line_container.setLayout(line_layout)
-
-        stats_layout.addWidget(line_container, 2, 0, 1, 3)
-
-        stats_layout.addWidget(self.min_label, 3, 0)
-        stats_layout.addWidget(self.min_value, 4, 0)
-        stats_layout.addWidget(self.max_label, 3, 1)
-        stats_layout.addWidget(self.max_value, 4, 1)
-        stats_layout.addWidget(self.avg_label, 3, 2)
-        stats_layout.addWidget(self.avg_value, 4, 2)
+        self.p50_label, self.p50_value = stat_item("P50")
+        self.p95_label, self.p95_value = stat_item("P95")
+        self.p99_label, self.p99_value = stat_item("P99")
+        self.jitter_label, self.jitter_value = stat_item("Jitter")
+
+        def divider():
+            line = QFrame()
+            line.setFrameShape(QFrame.Shape.HLine)
+            line.setFrameShadow(QFrame.Shadow.Plain)
+            line.setFixedHeight(1)
+            line.setStyleSheet("background-color: rgba(0, 0, 0, 0.10); border: none;")
+
+            line_layout = QVBoxLayout()
+            line_layout.setContentsMargins(0, 10, 0, 10)
+            line_layout.addWidget(line)
+
+            line_container = QWidget()
+            line_container.setStyleSheet("background-color: #ece6f0;")
+            line_container.setLayout(line_layout)
+            return line_container
+
+        # 12 колонок сітки: рядки по 3 показники займають по 4 колонки, рядок по 4 - по 3
+        stat_rows = [
+            [(self.sent_label, self.sent_value), (self.received_label, self.received_value),
+             (self.loss_label, self.loss_value)],
+            [(self.min_label, self.min_value), (self.max_label, self.max_value),
+             (self.avg_label, self.avg_value)],
+            [(self.p50_label, self.p50_value), (self.p95_label, self.p95_value),
+             (self.p99_label, self.p99_value), (self.jitter_label, self.jitter_value)],
+        ]
+        for index, items in enumerate(stat_rows):
+            row = index * 3
+            if index:
+                stats_layout.addWidget(divider(), row - 1, 0, 1, 12)
+            span = 12 // len(items)
+            for position, (label, value) in enumerate(items):
+                stats_layout.addWidget(label, row, position * span, 1, span)
+                stats_layout.addWidget(value, row + 1, position * span, 1, span)
+        for column in range(12):
+            stats_layout.setColumnStretch(column, 1)
         self.stats_frame.setLayout(stats_layout)
 
+        # Статистика по хостах - показується замість основної, коли хостів кілька
+        self.hosts_frame = QFrame()
+        self.hosts_frame.setStyleSheet("QFrame { background-color: #ECE6F0; border-radius: 16px; padding: 2px; }")
+        self.hosts_layout = QGridLayout()
+        self.hosts_layout.setContentsMargins(8, 8, 8, 8)
+        self.hosts_layout.setHorizontalSpacing(0)
+        self.hosts_layout.setVerticalSpacing(0)
+        for col, name in enumerate(["Host", "Sent", "Loss", "Min", "Avg", "Max", "P95", "P99", "Jitter"]):
+            t = QLabel(name)
+            t.setFont(font_label)
+            t.setStyleSheet("color: #49454F;")
+            t.setAlignment(Qt.AlignmentFlag.AlignLeft if col == 0 else Qt.AlignmentFlag.AlignHCenter)
+            self.hosts_layout.addWidget(t, 0, col)
+        self.hosts_layout.setColumnStretch(0, 1)
+        self.hosts_frame.setLayout(self.hosts_layout)
+        self.hosts_frame.hide()
+        self.host_rows = []
+
         self.status_frame = QFrame()
         self.status_frame.setStyleSheet(
             "QFrame { background-color: #FFF8E1; border: 1px solid #FFECB3; border-radius: 8px; }")
@@ -247,15 +284,56 @@ class Ui_PingTab(object):
         self.plot_scatter_loss = pg.ScatterPlotItem([], [], symbol='x', pen='r', size=9)
         self.chart.addItem(self.plot_scatter_success)
         self.chart.addItem(self.plot_scatter_loss)
+        self.legend = self.chart.addLegend(offset=(-10, 10))
+        self.legend.hide()
 
         layout.addLayout(controls_layout)
         layout.addWidget(self.btn)
         layout.addLayout(result_layout)
         layout.addWidget(self.stats_frame)
+        layout.addWidget(self.hosts_frame)
         layout.addWidget(self.status_frame)
         layout.addLayout(view_controls_layout)
         layout.addWidget(self.chart, 1)
 
+    def add_host_row(self, host, color):
+        """Додає рядок у таблицю хостів; повертає мітки Sent, Loss, Min, Avg, Max, P95, P99, Jitter."""
+        row = len(self.host_rows) + 1
+        name = QLabel(f"● {host}")
+        name.setFont(QFont("Segoe UI Semibold", 9))
+        name.setStyleSheet(f"color: {color};")
+        self.hosts_layout.addWidget(name, row, 0)
+        values = []
+        for col in range(1, 9):
+            v = QLabel("")
+            v.setFont(QFont("Segoe UI Semibold", 9))
+            v.setStyleSheet("color: #1C1B1F;")
+            v.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+            self.hosts_layout.addWidget(v, row, col)
+            values.append(v)
+        self.host_rows.append([name] + values)
+        return values
+
+    def clear_host_rows(self):
+        for labels in self.host_rows:
+            for label in labels:
+                self.hosts_layout.removeWidget(label)
+                label.deleteLater()
+        self.host_rows = []
+
+    def add_host_curves(self, color):
+        """Лінія та маркери для ще одного хоста на спільному графіку."""
+        line = self.chart.plot([], [], pen=pg.mkPen(color, width=2))
+        scatter_success = pg.ScatterPlotItem([], [], brush=color, size=8)
+        scatter_loss = pg.ScatterPlotItem([], [], symbol='x', pen=color, size=9)
+        self.chart.addItem(scatter_success)
+        self.chart.addItem(scatter_loss)
+        return line, scatter_success, scatter_loss
+
+    def remove_host_curves(self, items):
+        for item in items:
+            self.chart.removeItem(item)
+
 
 class Ui_TableTab(object):
     def setupUi(self, TableTab):
@@ -300,11 +378,13 @@ class Ui_TableTab(object):
         """)
         # Стиль кнопки toggle_btn буде встановлено в логіці
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["#", "Time", "Host", "Status", "Delay (ms)"])
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        # Модель над кільцевим буфером: найновіший рядок зверху
+        self.model = HistoryTableModel(parent=TableTab)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.setFont(QFont("Segoe UI", 10))
 
         header = self.table.horizontalHeader()
@@ -315,7 +395,7 @@ class Ui_TableTab(object):
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
 
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #FFFFFF;
                 border: 1px solid #E0E0E0;
                 border-radius: 8px;
@@ -329,7 +409,7 @@ class Ui_TableTab(object):
                 border-bottom: 1px solid #CAC4D0;
                 font-weight: 500;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #EADDFF;
                 color: #21005D;
             }
@@ -429,11 +509,18 @@ class Ui_IPTestTab(object):
         self.export_btn.setFont(btn_font)
         self.export_btn.setStyleSheet(normal_btn_style)
 
+        self.sweep_btn = QPushButton(" Sweep")
+        self.sweep_btn.setIcon(qta.icon("mdi.radar", color="#49454F"))
+        self.sweep_btn.setToolTip("Probe every address of the subnet entered above (e.g. 192.168.1.0/24)")
+        self.sweep_btn.setFont(btn_font)
+        self.sweep_btn.setStyleSheet(normal_btn_style)
+
         # --- Додаємо кнопки в лейаути по рядах ---
 
-        # Ряд 1: Import, Export
+        # Ряд 1: Import, Export, Sweep
         button_row_1.addWidget(self.import_btn)
         button_row_1.addWidget(self.export_btn)
+        button_row_1.addWidget(self.sweep_btn)
 
         # Ряд 2: Copy, Delete, Start
         button_row_2.addWidget(self.copy_btn)
@@ -446,23 +533,42 @@ class Ui_IPTestTab(object):
 
         # --- *** КІНЕЦЬ ЗМІНИ ЛЕЙАУТУ КНОПОК *** ---
 
-        # --- Table setup ---
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Host", "Status", "Latency (ms)", "Loss (%)"])
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        # --- Прогрес сканування підмережі (видно лише під час/після сканування) ---
+        self.sweep_label = QLabel()
+        self.sweep_label.setFont(QFont("Segoe UI", 10))
+        self.sweep_label.setStyleSheet("color: #49454F;")
+        self.sweep_label.hide()
+
+        # --- Table setup (модель/представлення) ---
+        # Модель сортує себе сама (без QSortFilterProxyModel і його порівнянь у Python)
+        self.model = IPTestTableModel(IPTestTab)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.setFont(QFont("Segoe UI", 10))
         self.table.setSortingEnabled(True)
 
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        # Решта колонок - одразу за найширшим можливим значенням: ResizeToContents
+        # перечитував би до 1000 рядків на колонку після кожного оновлення таблиці
+        metrics = QFontMetrics(self.table.font())
+        widest_values = ["", "Unexpected Error", "9999.99", "100.0", "00:00:00", "3600 s",
+                         "9999.99", "9999.99", "9999.99", "9999.99"]
+        for column in range(1, len(COLUMNS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.Interactive)
+            text_width = max(metrics.horizontalAdvance(widest_values[column]),
+                             metrics.horizontalAdvance(COLUMNS[column]))
+            header.resizeSection(column, text_width + 36)  # Відступи та стрілка сортування
+        # Перцентилі та джитер приховані; показати їх можна з контекстного меню заголовка
+        for column in OPTIONAL_COLUMNS:
+            self.table.setColumnHidden(column, True)
+        header.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
 
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #FFFFFF;
                 border: 1px solid #E0E0E0;
                 border-radius: 8px;
@@ -476,7 +582,7 @@ class Ui_IPTestTab(object):
                 border-bottom: 1px solid #CAC4D0;
                 font-weight: 500;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #EADDFF;
                 color: #21005D;
             }
@@ -484,6 +590,7 @@ class Ui_IPTestTab(object):
 
         layout.addLayout(input_layout)
         layout.addLayout(main_button_layout)  # <-- Додаємо новий лейаут з 2-ма рядами
+        layout.addWidget(self.sweep_label)
         layout.addWidget(self.table)
         self.table.sortByColumn(2, Qt.SortOrder.AscendingOrder)
 
@@ -548,4 +655,52 @@ class Ui_CustomNavBar(object):
                  background-color: #EADDFF; /* Фон при наведенні */
             }
         """)
-        return button
\ No newline at end of file
+        return button
+
+
+class Ui_PerfOverlay(object):
+    def setupUi(self, PerfOverlay):
+        PerfOverlay.setObjectName("PerfOverlay")
+        PerfOverlay.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        PerfOverlay.setStyleSheet("""
+            #PerfOverlay { background-color: #ECE6F0; border: 1px solid #CAC4D0; border-radius: 12px; }
+            QLabel { background: transparent; }
+        """)
+        layout = QVBoxLayout(PerfOverlay)
+        layout.setContentsMargins(12, 8, 12, 10)
+        layout.setSpacing(6)
+
+        header_layout = QHBoxLayout()
+        self.title = QLabel("Performance")
+        self.title.setFont(QFont("Segoe UI Semibold", 10))
+        self.title.setStyleSheet("color: #1D1B20;")
+        header_layout.addWidget(self.title)
+        header_layout.addStretch()
+
+        self.save_btn = QPushButton()
+        self.save_btn.setIcon(qta.icon("fa5s.save", color="#49454F"))
+        self.save_btn.setToolTip("Save counters to a JSON file")
+        self.reset_btn = QPushButton()
+        self.reset_btn.setIcon(qta.icon("fa5s.undo", color="#49454F"))
+        self.reset_btn.setToolTip("Reset counters")
+        self.close_btn = QPushButton()
+        self.close_btn.setIcon(qta.icon("fa5s.times", color="#49454F"))
+        self.close_btn.setToolTip("Hide (F12)")
+        for btn in [self.save_btn, self.reset_btn, self.close_btn]:
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.setStyleSheet("""
+                QPushButton { background-color: #EADDFF; border-radius: 8px; padding: 2px; }
+                QPushButton:hover { background-color: #D0BCFF; }
+            """)
+            btn.setFixedSize(24, 24)
+            header_layout.addWidget(btn)
+        layout.addLayout(header_layout)
+
+        # Моноширинний шрифт, щоб стовпці тексту вирівнювались
+        font = QFont("Consolas", 8)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.text = QLabel()
+        self.text.setFont(font)
+        self.text.setStyleSheet("color: #1C1B1F;")
+        self.text.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.text)
\ No newline at end of file